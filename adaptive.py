@@ -0,0 +1,37 @@
+from collections import deque
+
+# Adaptive polling interval for the live sampler.
+#
+# Each sample moves the interval: it shrinks (down to min_ms) while usage is
+# volatile or close to the alert threshold, and grows (up to max_ms) while usage
+# is flat. Volatility is the spread of the last `window` samples, in percentage
+# points. Anything in between drifts back toward base_ms.
+class AdaptiveInterval:
+    def __init__(self, min_ms=250, max_ms=5000, base_ms=1000, window=10,
+                 busy_spread=2.0, quiet_spread=0.2, threshold_margin=5.0,
+                 speedup=0.5, backoff=1.5):
+        if not 0 < min_ms <= base_ms <= max_ms:
+            raise ValueError("Expected 0 < min_ms <= base_ms <= max_ms")
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.base_ms = base_ms
+        self.busy_spread = busy_spread
+        self.quiet_spread = quiet_spread
+        self.threshold_margin = threshold_margin
+        self.speedup = speedup
+        self.backoff = backoff
+        self.recent = deque(maxlen=window)
+        self.interval_ms = base_ms
+
+    def next_interval(self, percent, threshold):
+        self.recent.append(percent)
+        spread = max(self.recent) - min(self.recent)
+        if percent >= threshold - self.threshold_margin or spread >= self.busy_spread:
+            interval = self.interval_ms * self.speedup
+        elif len(self.recent) == self.recent.maxlen and spread <= self.quiet_spread:
+            interval = self.interval_ms * self.backoff
+        else:
+            # Neither busy nor quiet: ease back toward the base rate
+            interval = (self.interval_ms + self.base_ms) / 2
+        self.interval_ms = int(min(self.max_ms, max(self.min_ms, interval)))
+        return self.interval_ms
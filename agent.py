@@ -0,0 +1,152 @@
+import argparse
+import selectors
+import socket
+import time
+
+from collector import LiveSource
+from sample_codec import HostSampleEncoder, write_varint
+
+# Headless sampling agent. Every interval it reads the kernel totals and the top
+# processes once, then streams them to each connected collector as compact binary
+# records (see sample_codec.HostSampleEncoder). A connection starts with a hello:
+# HELLO_MAGIC, then the varint-prefixed UTF-8 hostname.
+HELLO_MAGIC = b"MTA1"
+DEFAULT_PORT = 7070
+# A collector that falls this far behind is dropped rather than buffered forever
+MAX_BACKLOG = 1 << 20
+
+class _Client:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.encoder = HostSampleEncoder()
+        self.outbuf = bytearray()
+
+class Agent:
+    def __init__(self, host="0.0.0.0", port=DEFAULT_PORT, source=None, top=20, hostname=None):
+        # Ticks follow source.next_delay_ms(): the live interval, or a replay's own
+        # frame spacing divided by its speed
+        self.source = source or LiveSource()
+        self.top = top
+        self.hostname = hostname or socket.gethostname()
+        self.selector = selectors.DefaultSelector()
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients = {}
+
+    def _hello(self):
+        buf = bytearray(HELLO_MAGIC)
+        name = self.hostname.encode("utf-8")
+        write_varint(buf, len(name))
+        buf += name
+        return bytes(buf)
+
+    def _accept(self):
+        sock, address = self.listener.accept()
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _Client(sock, address)
+        client.outbuf += self._hello()
+        self.clients[sock] = client
+        self.selector.register(sock, selectors.EVENT_READ)
+        self._flush(client)
+
+    def _drop(self, client):
+        self.selector.unregister(client.sock)
+        client.sock.close()
+        del self.clients[client.sock]
+
+    def _flush(self, client):
+        try:
+            sent = client.sock.send(client.outbuf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(client)
+            return
+        del client.outbuf[:sent]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbuf else 0)
+        self.selector.modify(client.sock, events)
+
+    def _sample(self):
+        if not self.source.advance():
+            return False
+        timestamp_ms = int(self.source.timestamp * 1000)
+        used, total, _ = self.source.read_kernel_memory()
+        top_procs = self.source.get_process_memory_info().top(self.top)
+        for client in list(self.clients.values()):
+            client.outbuf += client.encoder.encode(timestamp_ms, used, total, top_procs)
+            if len(client.outbuf) > MAX_BACKLOG:
+                self._drop(client)
+            else:
+                self._flush(client)
+        return True
+
+    def serve_forever(self):
+        next_tick = time.monotonic()
+        while True:
+            timeout = max(0.0, next_tick - time.monotonic())
+            for key, events in self.selector.select(timeout):
+                if key.fileobj is self.listener:
+                    self._accept()
+                    continue
+                client = self.clients.get(key.fileobj)
+                if client is None:
+                    continue
+                if events & selectors.EVENT_READ:
+                    # Collectors never send data; a readable socket means it closed
+                    try:
+                        data = client.sock.recv(4096)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        self._drop(client)
+                        continue
+                if events & selectors.EVENT_WRITE:
+                    self._flush(client)
+            if time.monotonic() >= next_tick:
+                if not self._sample():
+                    return
+                next_tick += self.source.next_delay_ms() / 1000
+
+    def close(self):
+        for client in list(self.clients.values()):
+            self._drop(client)
+        self.selector.unregister(self.listener)
+        self.listener.close()
+        self.selector.close()
+        self.source.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream memory samples to remote collectors")
+    parser.add_argument("--bind", default="0.0.0.0", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between live samples (a replay keeps its recorded spacing)")
+    parser.add_argument("--top", type=int, default=20, help="number of processes sent per sample")
+    parser.add_argument("--hostname", help="name reported to collectors (default: this host's name)")
+    parser.add_argument("--replay", metavar="CAPTURE", help="stream a capture.py recording instead of /proc")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--proc-root", help="read this procfs tree instead of /proc (see fakeproc.py)")
+    args = parser.parse_args()
+
+    if args.proc_root:
+        from collector import set_proc_root
+        set_proc_root(args.proc_root)
+
+    if args.replay:
+        from capture import ReplaySource
+        source = ReplaySource(args.replay, args.speed)
+    else:
+        source = LiveSource()
+        source.interval_ms = int(args.interval * 1000)
+    agent = Agent(args.bind, args.port, source, args.top, args.hostname)
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        agent.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import timeit
+
+import collector
+from collector import get_process_memory_info, parse_process_status
+from procread import ProcReader, field_int, parse_stat, parse_status
+
+# Microbenchmarks for procread.ProcReader against the open().readlines() path the
+# collectors used before. Each case reads and parses the same file(s) both ways and
+# reports the median time per call. With --proc-root the scan runs over a fakeproc.py
+# tree, e.g. at 50k processes.
+
+def legacy_status(path):
+    with open(path) as f:
+        return parse_process_status(f.readlines())
+
+def legacy_stat(path):
+    with open(path) as f:
+        stat = f.read()
+    fields = stat[stat.rindex(")") + 2:].split()
+    return int(fields[9]), int(fields[19])
+
+def legacy_kernel(path):
+    with open(path) as f:
+        lines = f.readlines()
+    return int(lines[0].split(":")[1].strip()), int(lines[1].split(":")[1].strip())
+
+def legacy_scan():
+    results = []
+    for pid_str in os.listdir(collector.PROC_ROOT):
+        if pid_str.isdigit():
+            try:
+                with open(f"{collector.PROC_ROOT}/{pid_str}/status") as f:
+                    results.append(parse_process_status(f.readlines()))
+            except OSError:
+                pass
+    return results
+
+def median_us(func, number, repeat=7):
+    times = sorted(timeit.repeat(func, number=number, repeat=repeat))
+    return times[len(times) // 2] / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ProcReader with open().readlines()")
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing for single-file cases")
+    parser.add_argument("--proc-root", help="scan this procfs tree instead of /proc (see fakeproc.py)")
+    args = parser.parse_args()
+    if args.proc_root:
+        collector.set_proc_root(args.proc_root)
+
+    reader = ProcReader()
+    # /proc/mem_tracker is only there with the module loaded
+    kernel_path = f"{collector.PROC_ROOT}/mem_tracker"
+    kernel_path = kernel_path if os.path.exists(kernel_path) else None
+    cases = [
+        ("status", lambda: legacy_status("/proc/self/status"),
+         lambda: parse_status(*reader.read("/proc/self/status"))),
+        ("stat", lambda: legacy_stat("/proc/self/stat"),
+         lambda: parse_stat(*reader.read("/proc/self/stat"))),
+    ]
+    if kernel_path:
+        cases.append(("mem_tracker", lambda: legacy_kernel(kernel_path),
+                      lambda: field_int(*reader.read(kernel_path), b"Used:")))
+    n_pids = sum(1 for p in os.listdir(collector.PROC_ROOT) if p.isdigit())
+    number = max(1, args.number // max(n_pids, 1))
+    cases.append((f"scan ({n_pids} pids)", legacy_scan, get_process_memory_info))
+
+    print(f"{'case':20} {'readlines':>12} {'procread':>12} {'speedup':>8}")
+    for name, legacy, new in cases:
+        n = number if name.startswith("scan") else args.number
+        before = median_us(legacy, n)
+        after = median_us(new, n)
+        print(f"{name:20} {before:10.1f}us {after:10.1f}us {before / after:7.2f}x")
+
+if __name__ == "__main__":
+    main()
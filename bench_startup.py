@@ -0,0 +1,56 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold-start benchmark for finalui.py. Each run is a fresh interpreter so imports are
+# not cached; it reports the time until the first numbers are on screen and until the
+# chart is drawn. --eager builds the chart and Process tab up front, as the app used
+# to, for comparison. Needs a display (or Xvfb).
+
+def child(eager):
+    t0 = time.perf_counter()
+    from finalui import MemoryTrackerApp
+    t_import = time.perf_counter()
+
+    app = MemoryTrackerApp()
+    if eager:
+        app.build_chart()
+        app.create_process_memory_tab()
+    while not app.kernel_label_var.get():
+        app.update()
+    t_numbers = time.perf_counter()
+    while app.canvas is None:
+        app.update()
+    app.update()
+    t_chart = time.perf_counter()
+    app.destroy()
+
+    print(json.dumps({"import": t_import - t0, "first_numbers": t_numbers - t0, "chart": t_chart - t0}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure finalui.py cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="build every component up front")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.eager)
+        return
+
+    results = []
+    for _ in range(args.runs):
+        cmd = [sys.executable, __file__, "--child"] + (["--eager"] if args.eager else [])
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    mode = "eager" if args.eager else "lazy"
+    print(f"{mode} startup, median of {args.runs} runs:")
+    for key in ("import", "first_numbers", "chart"):
+        print(f"  {key:14} {statistics.median(r[key] for r in results) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import time
+
+# Load test for webdash.py: starts the server as a subprocess, connects N simulated
+# EventSource clients over localhost, and reports the server's CPU time per tick
+# (from /proc/<pid>/stat) alongside its own /stats numbers. Sampling and encoding
+# happen once per tick, so CPU per tick should grow only by the per-client socket
+# writes as N goes up.
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+def fetch(port, path):
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    return data.split(b"\r\n\r\n", 1)[1]
+
+def run(clients, seconds, interval, proc_root):
+    port = free_port()
+    command = [sys.executable, "webdash.py", "--port", str(port), "--interval", str(interval)]
+    if proc_root:
+        command += ["--proc-root", proc_root]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    selector = selectors.DefaultSelector()
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except ConnectionRefusedError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+        counts = {}
+        for _ in range(clients):
+            sock = socket.create_connection(("127.0.0.1", port))
+            sock.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+            sock.setblocking(False)
+            selector.register(sock, selectors.EVENT_READ)
+            counts[sock] = 0
+
+        # Let every client join before measuring
+        time.sleep(interval * 2)
+        start_cpu = cpu_seconds(server.pid)
+        start_tick = json.loads(fetch(port, "/stats"))["tick"]
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            for key, _ in selector.select(0.1):
+                data = key.fileobj.recv(1 << 20)
+                counts[key.fileobj] += data.count(b"event: delta")
+        stats = json.loads(fetch(port, "/stats"))
+        cpu = cpu_seconds(server.pid) - start_cpu
+        ticks = max(1, stats["tick"] - start_tick)
+        received = sorted(counts.values())
+        print(f"{clients:>6} clients: {cpu / ticks * 1000:7.2f} ms server CPU/tick  "
+              f"(sample {sum(stats['sample_ms'].values()):.2f} ms, encode {stats['encode_ms']:.2f} ms, "
+              f"fan-out {stats['fanout_ms']:.2f} ms, {stats['delta_bytes']:,} B/delta)  "
+              f"deltas per client over {ticks} ticks: min {received[0] if received else 0}, "
+              f"max {received[-1] if received else 0}, dropped {stats['dropped']}")
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure webdash.py's cost per tick against the number of clients")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=10.0, help="measurement time per client count")
+    parser.add_argument("--interval", type=float, default=0.5, help="server tick, in seconds")
+    parser.add_argument("--proc-root", help="serve this procfs tree instead of /proc (see fakeproc.py)")
+    args = parser.parse_args()
+    for clients in args.clients:
+        run(clients, args.seconds, args.interval, args.proc_root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import gzip
+import json
+import os
+import time
+
+import collector
+from collector import parse_kernel_memory, parse_process_status, parse_process_status_swap
+from procread import ProcReader, parse_stat
+from snapshot import NameTable, ProcessSnapshot
+
+# Capture files are gzip-compressed JSON lines: one header, then one frame per tick.
+# Frames are delta-encoded against the previous frame: the kernel text is only stored
+# when it changed, and per-PID status files only carry the lines that changed. Every
+# KEYFRAME_INTERVAL frames a full snapshot is written so a damaged file can be resumed.
+# Process start times ride along the same way, so a reused PID can be told apart;
+# captures made before they were recorded simply have none.
+CAPTURE_FORMAT = "mem_tracker-capture"
+CAPTURE_VERSION = 1
+KEYFRAME_INTERVAL = 60
+
+def snapshot_proc(proc_root=None, reader=None):
+    # Pass the same ProcReader on every call to reuse its buffers
+    proc_root = proc_root or collector.PROC_ROOT
+    reader = reader or ProcReader()
+    try:
+        kernel_text = reader.read_text(os.path.join(proc_root, "mem_tracker"))
+    except OSError:
+        kernel_text = None
+
+    statuses = {}
+    start_times = {}
+    for pid_str in os.listdir(proc_root):
+        if pid_str.isdigit():
+            try:
+                statuses[int(pid_str)] = reader.read_text(os.path.join(proc_root, pid_str, "status"))
+                start_times[int(pid_str)] = parse_stat(*reader.read(os.path.join(proc_root, pid_str, "stat")))[1]
+            except (OSError, ValueError, IndexError):
+                pass
+    return kernel_text, statuses, start_times
+
+class CaptureWriter:
+    def __init__(self, path, interval=1.0):
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.frame_count = 0
+        self.kernel_text = None
+        self.statuses = {}
+        self.start_times = {}
+        self._write({"format": CAPTURE_FORMAT, "version": CAPTURE_VERSION, "interval": interval})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")))
+        self.file.write("\n")
+
+    def write_frame(self, timestamp, kernel_text, statuses, start_times=None):
+        keyframe = self.frame_count % KEYFRAME_INTERVAL == 0
+        frame = {"t": round(timestamp, 3)}
+        if keyframe:
+            frame["key"] = True
+        if keyframe or kernel_text != self.kernel_text:
+            frame["k"] = kernel_text
+
+        changed = {}
+        for pid, text in statuses.items():
+            prev = self.statuses.get(pid)
+            if keyframe or prev is None:
+                changed[pid] = text
+            elif text != prev:
+                lines = text.split("\n")
+                prev_lines = prev.split("\n")
+                if len(lines) != len(prev_lines):
+                    changed[pid] = text
+                else:
+                    changed[pid] = {i: line for i, line in enumerate(lines) if line != prev_lines[i]}
+        if changed:
+            frame["p"] = changed
+        if start_times is not None:
+            # An empty dict is a frame with no processes, not "no start times"
+            started = {pid: start for pid, start in start_times.items()
+                       if keyframe or self.start_times.get(pid) != start}
+            if started:
+                frame["s"] = started
+            self.start_times = dict(start_times)
+        exited = [pid for pid in self.statuses if pid not in statuses]
+        if exited and not keyframe:
+            frame["x"] = exited
+
+        self._write(frame)
+        self.frame_count += 1
+        self.kernel_text = kernel_text
+        self.statuses = dict(statuses)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CaptureReader:
+    def __init__(self, path):
+        self.file = gzip.open(path, "rt", encoding="utf-8")
+        self.header = json.loads(self.file.readline())
+        if self.header.get("format") != CAPTURE_FORMAT:
+            raise ValueError(f"{path} is not a mem_tracker capture file")
+        if self.header.get("version") != CAPTURE_VERSION:
+            raise ValueError(f"Unsupported capture version: {self.header.get('version')}")
+        self.kernel_text = None
+        self.statuses = {}
+        # pid -> start time, for captures that recorded them
+        self.start_times = {}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        frame = json.loads(line)
+        if frame.get("key"):
+            self.statuses = {}
+            self.start_times = {}
+        if "k" in frame:
+            self.kernel_text = frame["k"]
+        for pid_str, delta in frame.get("p", {}).items():
+            pid = int(pid_str)
+            if isinstance(delta, str):
+                self.statuses[pid] = delta
+            else:
+                lines = self.statuses[pid].split("\n")
+                for i, text in delta.items():
+                    lines[int(i)] = text
+                self.statuses[pid] = "\n".join(lines)
+        for pid_str, start in frame.get("s", {}).items():
+            self.start_times[int(pid_str)] = start
+        for pid in frame.get("x", ()):
+            self.statuses.pop(pid, None)
+            self.start_times.pop(pid, None)
+        return frame["t"], self.kernel_text, self.statuses
+
+    def progress(self):
+        # Fraction of the compressed file consumed so far
+        size = os.fstat(self.file.fileobj.fileno()).st_size
+        return self.file.fileobj.tell() / size if size else 1.0
+
+    def close(self):
+        self.file.close()
+
+def build_snapshot(statuses, start_times=None, names=None, fields=()):
+    # ProcessSnapshot from one frame's status texts. Of the optional fields only
+    # swap and (when recorded) start time can be rebuilt from a capture.
+    fields = tuple(f for f in fields if f == "swap" or (f == "start_time" and start_times is not None))
+    snapshot = ProcessSnapshot(names, fields)
+    want_swap = snapshot.swap is not None
+    want_start = snapshot.start_time is not None
+    for pid, text in statuses.items():
+        if want_swap:
+            name, vmrss_kb, swap_kb = parse_process_status_swap(text.splitlines())
+        else:
+            name, vmrss_kb = parse_process_status(text.splitlines())
+            swap_kb = 0
+        if name:
+            start_time = start_times.get(pid, 0) if want_start else 0
+            snapshot.append(pid, name, vmrss_kb, swap_kb, start_time=start_time)
+    return snapshot
+
+class ReplaySource:
+    # Drop-in replacement for LiveSource that plays a capture back at `speed` times
+    # the recorded rate. The app asks for the delay to the next frame, so replay
+    # follows the recorded timing rather than the app's own poll interval.
+    # Captures only hold status files and start times, so the other optional process
+    # fields are left out of the snapshot (see build_snapshot).
+    fields = ()
+
+    def __init__(self, path, speed=1.0):
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.path = path
+        self.reader = CaptureReader(path)
+        self.speed = speed
+        self.interval_ms = int(self.reader.header.get("interval", 1.0) * 1000)
+        self.timestamp = None
+        self.kernel_text = None
+        self.statuses = {}
+        self.start_times = {}
+        self.names = NameTable()
+        self.finished = False
+        self._pending = self._read_next()
+
+    def _read_next(self):
+        try:
+            timestamp, kernel_text, statuses = next(self.reader)
+        except StopIteration:
+            return None
+        # The reader mutates its state in place, so keep a copy for this frame
+        return timestamp, kernel_text, dict(statuses), dict(self.reader.start_times)
+
+    def advance(self):
+        if self._pending is None:
+            self.finished = True
+            return False
+        self.timestamp, self.kernel_text, self.statuses, self.start_times = self._pending
+        self._pending = self._read_next()
+        return True
+
+    def next_delay_ms(self):
+        if self._pending is None or self.timestamp is None:
+            return self.interval_ms
+        return max(1, int((self._pending[0] - self.timestamp) * 1000 / self.speed))
+
+    def read_kernel_memory(self):
+        if self.kernel_text is None:
+            return 0, 1, 0
+        try:
+            return parse_kernel_memory(self.kernel_text.splitlines())
+        except (ValueError, IndexError):
+            return 0, 1, 0
+
+    def get_process_memory_info(self, fields=None):
+        fields = self.fields if fields is None else fields
+        return build_snapshot(self.statuses, self.start_times, self.names, fields)
+
+    def read_memory_pressure(self):
+        # PSI is not part of the capture format
+        return None
+
+    def read_numa_zones(self):
+        # Neither is the NUMA breakdown
+        return None
+
+    def read_kernel_samples(self):
+        # Replays use the recorded /proc/mem_tracker text instead of the ring buffer
+        return None
+
+    def kernel_samples_lost(self):
+        return None
+
+    def read_cgroup_memory(self):
+        # Cgroups are not part of the capture format either
+        return None
+
+    def read_lifecycle(self):
+        # Nor are process lifecycle events
+        return None
+
+    def read_process_rss(self, pid):
+        text = self.statuses.get(pid)
+        if not text:
+            return None
+        name, vmrss_kb = parse_process_status(text.splitlines())
+        return vmrss_kb if name else None
+
+    def close(self):
+        self.reader.close()
+
+def record(path, interval=1.0, duration=None):
+    start = time.time()
+    reader = ProcReader()
+    with CaptureWriter(path, interval) as writer:
+        try:
+            while duration is None or time.time() - start < duration:
+                tick = time.time()
+                kernel_text, statuses, start_times = snapshot_proc(reader=reader)
+                writer.write_frame(tick, kernel_text, statuses, start_times)
+                time.sleep(max(0.0, interval - (time.time() - tick)))
+        except KeyboardInterrupt:
+            pass
+    return writer.frame_count
+
+def main():
+    parser = argparse.ArgumentParser(description="Record /proc snapshots for offline replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="capture /proc/mem_tracker and per-PID status")
+    rec.add_argument("path")
+    rec.add_argument("--interval", type=float, default=1.0, help="seconds between snapshots")
+    rec.add_argument("--duration", type=float, help="stop after this many seconds (default: until Ctrl-C)")
+    rec.add_argument("--proc-root", help="read this procfs tree instead of /proc (see fakeproc.py)")
+    info = sub.add_parser("info", help="summarize a capture file")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if args.proc_root:
+            collector.set_proc_root(args.proc_root)
+        frames = record(args.path, args.interval, args.duration)
+        print(f"Recorded {frames} frames to {args.path}")
+    else:
+        reader = CaptureReader(args.path)
+        frames = 0
+        first = last = None
+        max_procs = 0
+        for timestamp, _, statuses in reader:
+            frames += 1
+            first = timestamp if first is None else first
+            last = timestamp
+            max_procs = max(max_procs, len(statuses))
+        reader.close()
+        span = (last - first) if frames else 0
+        print(f"{args.path}: {frames} frames over {span:.1f}s, up to {max_procs} processes, "
+              f"{os.path.getsize(args.path):,} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Chart layer built on matplotlib.figure.Figure rather than pyplot, so figures are
+# never registered with pyplot's global figure manager and go away with their owner.
+#
+# All panels (kernel, PSI, per-process, ...) are stacked axes of a single Figure on a
+# single Tk canvas, so they share one Agg renderer and are redrawn in one pass.
+# Adding or removing a panel relayouts the same Figure instead of creating a new one.
+class ChartHost:
+    def __init__(self, master, width=7, panel_height=3, dpi=100):
+        self.width = width
+        self.panel_height = panel_height
+        self.dpi = dpi
+        self.figure = Figure(figsize=(width, panel_height), dpi=dpi)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        # name -> setup(ax) callback, in display order
+        self.panels = {}
+        self.axes = {}
+
+    def widget(self):
+        return self.canvas.get_tk_widget()
+
+    def add_panel(self, name, setup):
+        if name in self.panels:
+            return
+        self.panels[name] = setup
+        self._layout()
+
+    def remove_panel(self, name):
+        if self.panels.pop(name, None) is not None:
+            self._layout()
+
+    def has_panel(self, name):
+        return name in self.panels
+
+    def _layout(self):
+        # Drop the old axes (and every artist on them) before building the new ones
+        self.figure.clear()
+        self.axes = {}
+        count = max(len(self.panels), 1)
+        grid = self.figure.add_gridspec(count, 1, hspace=0.6)
+        for index, (name, setup) in enumerate(self.panels.items()):
+            ax = self.figure.add_subplot(grid[index])
+            self.axes[name] = ax
+            setup(ax)
+        self.widget().configure(height=int(self.panel_height * self.dpi * count))
+
+    def draw(self):
+        self.canvas.draw()
+
+    def draw_idle(self):
+        self.canvas.draw_idle()
+
+    def close(self):
+        self.panels.clear()
+        self.axes = {}
+        self.figure.clear()
+        self.widget().destroy()
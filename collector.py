@@ -0,0 +1,362 @@
+import os
+import struct
+import time
+from itertools import repeat
+
+from procread import ProcReader, field_int, parse_int, parse_stat, parse_status
+from snapshot import ProcessSnapshot
+
+# One reader, and so one buffer pool, shared by every collector in the UI thread
+_reader = ProcReader()
+
+# Where procfs is read from. Point it at a tree built by fakeproc.py to run the
+# collectors against synthetic processes; /proc/self (self-monitoring) is unaffected.
+PROC_ROOT = "/proc"
+
+def set_proc_root(path):
+    global PROC_ROOT
+    PROC_ROOT = path.rstrip("/") or "/"
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+def parse_kernel_memory(lines):
+    used = int(lines[0].split(":")[1].strip())
+    total = int(lines[1].split(":")[1].strip())
+    percent = (used / total) * 100 if total > 0 else 0
+    return used, total, percent
+
+def read_kernel_memory():
+    try:
+        buf, n = _reader.read(f"{PROC_ROOT}/mem_tracker")
+    except OSError:
+        return 0, 1, 0
+    used = field_int(buf, n, b"Used:")
+    total = field_int(buf, n, b"Total:", 1)
+    percent = (used / total) * 100 if total > 0 else 0
+    return used, total, percent
+
+# /proc/mem_tracker_numa is packed binary (see mem_tracker.c): a header, then one
+# record per populated zone with page counts
+NUMA_MAGIC = b"MTN1"
+NUMA_HEADER = struct.Struct("<4sHHI")
+NUMA_RECORD = struct.Struct("<HH8s4xQQ")
+
+def parse_numa_zones(data):
+    # [(node, zone name, total_kb, free_kb)], one entry per populated zone
+    magic, version, count, page_size = NUMA_HEADER.unpack_from(data)
+    if magic != NUMA_MAGIC or version != 1:
+        raise ValueError("Unrecognized mem_tracker_numa data")
+    page_kb = page_size // 1024
+    end = NUMA_HEADER.size + count * NUMA_RECORD.size
+    zones = []
+    for node, _, name, managed, free in NUMA_RECORD.iter_unpack(data[NUMA_HEADER.size:end]):
+        zones.append((node, name.rstrip(b"\0").decode("ascii", "replace"), managed * page_kb, free * page_kb))
+    return zones
+
+def read_numa_zones():
+    # None when the loaded module predates the NUMA file
+    try:
+        buf, n = _reader.read(f"{PROC_ROOT}/mem_tracker_numa")
+        return parse_numa_zones(memoryview(buf)[:n])
+    except (OSError, ValueError, struct.error):
+        return None
+
+# /proc/mem_tracker_samples drains the module's ring buffer of timer-driven samples
+# (see mem_tracker.c): 32-byte records, as many per read() as fit in the buffer
+SAMPLE_RECORD = struct.Struct("<QI4xQQ")
+
+class KernelSampleReader:
+    # Keeps the file open and reads into one preallocated buffer, so a tick's worth
+    # of samples costs a read() or two however high the module's sampling rate is
+    def __init__(self, path=None, batch=1024):
+        self.fd = os.open(path or f"{PROC_ROOT}/mem_tracker_samples", os.O_RDONLY)
+        self.buffer = bytearray(batch * SAMPLE_RECORD.size)
+        self.view = memoryview(self.buffer)
+        self.last_seq = None
+        # Samples overwritten in the ring before they were read
+        self.lost = 0
+
+    def drain(self):
+        # [(timestamp, used_kb, total_kb, percent)] taken since the last call, oldest first
+        samples = []
+        while True:
+            n = os.readv(self.fd, [self.buffer])
+            for time_ns, seq, used, total in SAMPLE_RECORD.iter_unpack(self.view[:n - n % SAMPLE_RECORD.size]):
+                if self.last_seq is not None:
+                    self.lost += (seq - self.last_seq - 1) & 0xFFFFFFFF
+                self.last_seq = seq
+                samples.append((time_ns / 1e9, used, total, (used / total) * 100 if total > 0 else 0))
+            if n < len(self.buffer):
+                return samples
+
+    def close(self):
+        os.close(self.fd)
+
+def parse_process_status(lines):
+    # (name, VmRSS in kB); name is "" if the status text had no Name line
+    name = ""
+    vmrss_kb = 0
+    for line in lines:
+        if line.startswith("Name:"):
+            name = line.split(":")[1].strip()
+        elif line.startswith("VmRSS:"):
+            vmrss_str = line.split(":")[1].strip()
+            vmrss_kb_str = vmrss_str.replace(" kB", "")
+            try:
+                vmrss_kb = int(vmrss_kb_str)
+            except ValueError:
+                vmrss_kb = 0
+            break
+    return name, vmrss_kb
+
+def parse_process_status_swap(lines):
+    # (name, VmRSS, VmSwap in kB); like parse_process_status but reads on to VmSwap,
+    # which the kernel prints a few lines after VmRSS
+    name = ""
+    vmrss_kb = 0
+    vmswap_kb = 0
+    for line in lines:
+        if line.startswith("Name:"):
+            name = line.split(":")[1].strip()
+        elif line.startswith("VmRSS:"):
+            try:
+                vmrss_kb = int(line.split()[1])
+            except (IndexError, ValueError):
+                vmrss_kb = 0
+        elif line.startswith("VmSwap:"):
+            try:
+                vmswap_kb = int(line.split()[1])
+            except (IndexError, ValueError):
+                vmswap_kb = 0
+            break
+    return name, vmrss_kb, vmswap_kb
+
+def read_stat_fields(pid):
+    try:
+        return parse_stat(*_reader.read(f"{PROC_ROOT}/{pid}/stat"))
+    except (OSError, ValueError, IndexError):
+        return 0, 0
+
+def read_oom_score(pid):
+    try:
+        return parse_int(*_reader.read(f"{PROC_ROOT}/{pid}/oom_score"))
+    except (OSError, ValueError):
+        return 0
+
+def get_process_memory_info(names=None, fields=(), start_times=None):
+    # Unsorted ProcessSnapshot; use .top(k) for the largest processes.
+    # Pass the previous snapshot's NameTable to keep interning names across ticks.
+    #
+    # `fields` picks optional columns from snapshot.FIELDS. Swap comes out of the
+    # status file that is read anyway; major faults and start time share one extra
+    # small read of stat, OOM score costs one more, and none of them cost anything
+    # when not asked for.
+    #
+    # `start_times` ({pid: start time}, from a lifecycle tracker) replaces listing
+    # /proc, and spares the stat read when only start times were wanted.
+    snapshot = ProcessSnapshot(names, fields)
+    want_swap = snapshot.swap is not None
+    want_stat = snapshot.major_faults is not None or (snapshot.start_time is not None and start_times is None)
+    want_oom = snapshot.oom_score is not None
+    if start_times is None:
+        pids = [int(pid_str) for pid_str in os.listdir(PROC_ROOT) if pid_str.isdigit()]
+    else:
+        pids = start_times
+    for pid in pids:
+        try:
+            name, vmrss_kb, swap_kb = parse_status(*_reader.read(f"{PROC_ROOT}/{pid}/status"), want_swap)
+            if name:
+                major_faults, start_time = read_stat_fields(pid) if want_stat else (0, 0)
+                if start_times is not None:
+                    start_time = start_times[pid]
+                oom_score = read_oom_score(pid) if want_oom else 0
+                snapshot.append(pid, name, vmrss_kb, swap_kb, major_faults, oom_score, start_time)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error reading {PROC_ROOT}/{pid}/status: {e}")
+    return snapshot
+
+def read_memory_pressure():
+    # (some avg10, full avg10) from PSI, or None on kernels without CONFIG_PSI
+    try:
+        lines = _reader.read_text(f"{PROC_ROOT}/pressure/memory").splitlines()
+        some = float(lines[0].split()[1].split("=")[1])
+        full = float(lines[1].split()[1].split("=")[1])
+        return some, full
+    except (OSError, IndexError, ValueError):
+        return None
+
+def read_cgroup_memory(root=None):
+    # [(cgroup path, usage_kb)] for every memory cgroup: memory.current on cgroup v2,
+    # memory.usage_in_bytes under the memory controller on v1
+    root = root or CGROUP_ROOT
+    if os.path.exists(os.path.join(root, "cgroup.controllers")):
+        base, filename = root, "memory.current"
+    else:
+        base, filename = os.path.join(root, "memory"), "memory.usage_in_bytes"
+    groups = []
+    for dirpath, _, filenames in os.walk(base):
+        if filename in filenames:
+            try:
+                usage = parse_int(*_reader.read(os.path.join(dirpath, filename)))
+            except (OSError, ValueError):
+                continue
+            groups.append(("/" + os.path.relpath(dirpath, base).lstrip("."), usage // 1024))
+    return groups
+
+def read_process_rss(pid):
+    try:
+        name, vmrss_kb, _ = parse_status(*_reader.read(f"{PROC_ROOT}/{pid}/status"))
+    except OSError:
+        return None
+    return vmrss_kb if name else None
+
+class LiveSource:
+    # Reads the running system; the app polls it once per interval.
+    # `fields` lists the optional per-process columns to collect (snapshot.FIELDS).
+    interval_ms = 1000
+    timestamp = None
+    fields = ()
+
+    def advance(self):
+        self.timestamp = time.time()
+        if self.lifecycle is not None:
+            self.lifecycle.poll()
+        return True
+
+    def next_delay_ms(self):
+        return self.interval_ms
+
+    def read_kernel_memory(self):
+        return read_kernel_memory()
+
+    def __init__(self, kernel_ring=False, lifecycle=False):
+        self.names = None
+        # Bulk samples from the module's ring buffer, when asked for and available
+        self.sampler = None
+        if kernel_ring:
+            try:
+                self.sampler = KernelSampleReader()
+            except OSError:
+                pass
+        # Incrementally tracked PID set (see lifecycle.py) instead of listing /proc
+        self.lifecycle = None
+        if lifecycle:
+            from lifecycle import open_lifecycle
+            self.lifecycle = open_lifecycle()
+
+    def read_kernel_samples(self):
+        # None means no ring buffer: fall back to read_kernel_memory()
+        return self.sampler.drain() if self.sampler is not None else None
+
+    def kernel_samples_lost(self):
+        # Ring buffer samples overwritten before they were drained, or None without one
+        return self.sampler.lost if self.sampler is not None else None
+
+    def get_process_memory_info(self, fields=None):
+        # `fields` overrides self.fields for this one call
+        start_times = self.lifecycle.live() if self.lifecycle is not None else None
+        snapshot = get_process_memory_info(self.names, self.fields if fields is None else fields, start_times)
+        self.names = snapshot.names
+        return snapshot
+
+    def read_memory_pressure(self):
+        return read_memory_pressure()
+
+    def read_numa_zones(self):
+        return read_numa_zones()
+
+    def read_cgroup_memory(self):
+        return read_cgroup_memory()
+
+    def read_lifecycle(self):
+        # LifecycleEvents since the last call, or None without lifecycle tracking
+        return self.lifecycle.drain() if self.lifecycle is not None else None
+
+    def read_process_rss(self, pid):
+        return read_process_rss(pid)
+
+    def close(self):
+        # Unsubscribes the netlink socket and closes the ring buffer file
+        if self.lifecycle is not None:
+            self.lifecycle.close()
+            self.lifecycle = None
+        if self.sampler is not None:
+            self.sampler.close()
+            self.sampler = None
+
+def read_start_time(pid):
+    try:
+        return parse_stat(*_reader.read(f"{PROC_ROOT}/{pid}/stat"))[1]
+    except (OSError, ValueError, IndexError):
+        return None
+
+class ProcessIdentityCache:
+    # cmdline and exe never change for the lifetime of a process (exec aside), so they
+    # are read once per (pid, start_time) and reused on every tick after that.
+    def __init__(self):
+        self.entries = {}
+
+    def lookup(self, pid, start_time=None):
+        # Pass the start time from the snapshot when it has one; reading stat here
+        # for every PID on every tick would double the scan's syscalls
+        if start_time is None:
+            start_time = read_start_time(pid)
+        key = (pid, start_time)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = {"cmdline": self._read_cmdline(pid), "exe": self._read_exe(pid)}
+            self.entries[key] = entry
+        return key, entry
+
+    def prune(self, live_keys):
+        for key in list(self.entries):
+            if key not in live_keys:
+                del self.entries[key]
+
+    def _read_cmdline(self, pid):
+        try:
+            return _reader.read_text(f"{PROC_ROOT}/{pid}/cmdline").replace("\0", " ").strip()
+        except OSError:
+            return ""
+
+    def _read_exe(self, pid):
+        try:
+            return os.readlink(f"{PROC_ROOT}/{pid}/exe")
+        except OSError:
+            return ""
+
+def group_processes(snapshot, mode, cache=None, pattern=None):
+    # Reads the snapshot's columns directly; no per-process objects are created.
+    # Exe and cmdline modes want a snapshot taken with the "start_time" field.
+    groups = {}
+    live_keys = set()
+    names = snapshot.names.names
+    start_times = snapshot.start_time if snapshot.start_time is not None else repeat(None)
+    for pid, name_id, memory_kb, start_time in zip(snapshot.pids, snapshot.name_ids, snapshot.rss, start_times):
+        if mode == "Name":
+            key = names[name_id]
+        else:
+            cache_key, entry = cache.lookup(pid, start_time)
+            live_keys.add(cache_key)
+            if mode == "Exe":
+                # Kernel threads and other users' processes have no readable exe
+                key = entry['exe'] or f"[{names[name_id]}]"
+            else:
+                match = pattern.search(entry['cmdline']) if pattern else None
+                if match is None:
+                    key = "(no match)"
+                else:
+                    key = match.group(1) if match.groups() else match.group(0)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"key": key, "count": 0, "memory_kb": 0}
+        group['count'] += 1
+        group['memory_kb'] += memory_kb
+    if cache is not None and mode != "Name":
+        cache.prune(live_keys)
+
+    grouped = list(groups.values())
+    grouped.sort(key=lambda x: x['memory_kb'], reverse=True)
+    return grouped
@@ -0,0 +1,260 @@
+import tkinter as tk
+from tkinter import ttk
+import argparse
+from collections import deque
+
+from collector import LiveSource
+from render import RenderScheduler
+from sampler import EventBus, SharedSampler
+
+# Dashboard mode: any number of views, in any number of windows, fed by one
+# SharedSampler. Views subscribe to the bus and redraw through one RenderScheduler,
+# so each data source is read once per tick however many views are open, and a
+# minimized window's views are not redrawn until it is restored.
+#
+# --layout lists windows separated by ',' and the views in each window by '+':
+#   python3 dashboard.py --layout "kernel+processes,cgroups,processes"
+
+class View:
+    # Base class: owns a frame, its bus subscriptions and its render panel
+    title = ""
+
+    def __init__(self, master, app):
+        self.app = app
+        self.name = f"{type(self).__name__}-{id(self)}"
+        self.frame = ttk.LabelFrame(master, text=self.title)
+        self.tokens = []
+        app.renderer.add_panel(self.name, self.render,
+                               lambda: self.frame.winfo_toplevel().state() != 'iconic')
+
+    def subscribe(self, topic, callback):
+        self.tokens.append(self.app.bus.subscribe(topic, callback))
+
+    def mark_dirty(self):
+        self.app.renderer.mark_dirty(self.name)
+
+    def render(self):
+        pass
+
+    def close(self):
+        for token in self.tokens:
+            self.app.bus.unsubscribe(token)
+        self.tokens = []
+        self.app.renderer.remove_panel(self.name)
+
+class KernelView(View):
+    title = "Kernel Memory"
+    # Seconds of history on the chart
+    SPAN = 300
+
+    def __init__(self, master, app):
+        super().__init__(master, app)
+        from charts import ChartHost
+        self.label_var = tk.StringVar(value="Waiting for data…")
+        ttk.Label(self.frame, textvariable=self.label_var).pack(pady=(5, 0))
+        self.progress = ttk.Progressbar(self.frame, orient="horizontal", mode="determinate", length=400)
+        self.progress.pack(fill='x', padx=10, pady=5)
+        self.charts = ChartHost(self.frame, width=6, panel_height=2.2)
+        self.charts.add_panel('kernel', self._setup_axes)
+        self.charts.widget().pack(fill='x', padx=10, pady=(0, 10))
+        # (timestamp, percent) for the last SPAN seconds; trimmed by age rather than
+        # count, since the ring buffer may deliver anywhere from 1 to 100+ samples a second
+        self.log = deque()
+        self.latest = None
+        self.subscribe("kernel", self.on_kernel)
+
+    def _setup_axes(self, ax):
+        ax.set_ylim(0, 100)
+        ax.set_xlim(-self.SPAN, 0)
+        ax.grid(linestyle='--', linewidth=0.5)
+        self.line, = ax.plot([], [], color="#FF6F61", linewidth=2)
+
+    def on_kernel(self, samples):
+        if not samples:
+            return
+        self.log.extend((timestamp, percent) for timestamp, _, _, percent in samples)
+        oldest = self.log[-1][0] - self.SPAN
+        while self.log[0][0] < oldest:
+            self.log.popleft()
+        self.latest = samples[-1]
+        self.mark_dirty()
+
+    def render(self):
+        if self.latest is None:
+            return
+        _, used, total, percent = self.latest
+        self.label_var.set(f"Used: {used:,} KB / Total: {total:,} KB ({percent:.2f}%)")
+        self.progress['value'] = percent
+        newest = self.log[-1][0]
+        self.line.set_data([t - newest for t, _ in self.log], [p for _, p in self.log])
+        self.charts.draw()
+
+    def close(self):
+        super().close()
+        self.charts.close()
+
+class ProcessView(View):
+    title = "Top Processes"
+
+    def __init__(self, master, app, rows=20):
+        super().__init__(master, app)
+        self.rows = rows
+        self.tree = ttk.Treeview(self.frame, columns=('PID', 'Name', 'Memory'), show='headings', height=rows)
+        for column, text, width, anchor in (('PID', 'PID', 80, 'center'), ('Name', 'Name', 220, 'w'),
+                                            ('Memory', 'Memory (KB)', 120, 'e')):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=anchor)
+        self.tree.pack(fill='both', expand=True, padx=10, pady=10)
+        self.snapshot = None
+        self.subscribe("processes", self.on_processes)
+
+    def on_processes(self, snapshot):
+        self.snapshot = snapshot
+        self.mark_dirty()
+
+    def render(self):
+        if self.snapshot is None:
+            return
+        fill_tree(self.tree, [(p.pid, p.name, f"{p.memory_kb:,}") for p in self.snapshot.top(self.rows)])
+
+class CgroupView(View):
+    title = "Memory by Cgroup"
+
+    def __init__(self, master, app, rows=20):
+        super().__init__(master, app)
+        self.rows = rows
+        self.tree = ttk.Treeview(self.frame, columns=('Cgroup', 'Memory'), show='headings', height=rows)
+        self.tree.heading('Cgroup', text='Cgroup')
+        self.tree.heading('Memory', text='Memory (KB)')
+        self.tree.column('Cgroup', width=320, anchor='w')
+        self.tree.column('Memory', width=120, anchor='e')
+        self.tree.pack(fill='both', expand=True, padx=10, pady=10)
+        self.groups = None
+        self.subscribe("cgroups", self.on_cgroups)
+
+    def on_cgroups(self, groups):
+        self.groups = groups
+        self.mark_dirty()
+
+    def render(self):
+        if self.groups is None:
+            fill_tree(self.tree, [("(no cgroup data for this source)", "")])
+            return
+        groups = sorted(self.groups, key=lambda g: g[1], reverse=True)[:self.rows]
+        fill_tree(self.tree, [(path, f"{usage_kb:,}") for path, usage_kb in groups])
+
+VIEWS = {"kernel": KernelView, "processes": ProcessView, "cgroups": CgroupView}
+
+def fill_tree(tree, rows):
+    # Update existing rows in place instead of rebuilding the tree
+    items = tree.get_children()
+    for index, values in enumerate(rows):
+        if index < len(items):
+            tree.item(items[index], values=values)
+        else:
+            tree.insert('', tk.END, values=values)
+    if len(items) > len(rows):
+        tree.delete(*items[len(rows):])
+
+def parse_layout(text):
+    windows = [[name.strip() for name in window.split("+") if name.strip()] for window in text.split(",")]
+    for window in windows:
+        for name in window:
+            if name not in VIEWS:
+                raise ValueError(f"Unknown view {name!r}; choose from {', '.join(VIEWS)}")
+    return [window for window in windows if window]
+
+class Dashboard(tk.Tk):
+    def __init__(self, source=None, layout=(("kernel", "processes"),), fields=()):
+        super().__init__()
+        self.title("🧠 Memory Dashboard")
+        ttk.Style(self).theme_use('clam')
+        self.source = source or LiveSource()
+        self.bus = EventBus()
+        self.renderer = RenderScheduler(self)
+        self.sampler = SharedSampler(self, self.source, self.bus, fields)
+        self.views = {}  # window -> [views]
+
+        menu = tk.Menu(self)
+        window_menu = tk.Menu(menu, tearoff=0)
+        for name, view_class in VIEWS.items():
+            window_menu.add_command(label=f"New {view_class.title} Window",
+                                    command=lambda name=name: self.open_window([name]))
+        menu.add_cascade(label="Window", menu=window_menu)
+        self.config(menu=menu)
+
+        # Reads per tick and subscribers per topic, to show the sharing at work
+        self.status_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.status_var, anchor='w', font=("Consolas", 10)).pack(
+            side=tk.BOTTOM, fill='x', padx=10, pady=(0, 5))
+        self.bus.subscribe("tick", self.on_tick)
+
+        for index, window in enumerate(layout):
+            self.open_window(window, main=index == 0)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.sampler.start()
+
+    def open_window(self, names, main=False):
+        window = self if main else tk.Toplevel(self)
+        if not main:
+            window.title(" + ".join(VIEWS[name].title for name in names))
+            window.protocol("WM_DELETE_WINDOW", lambda: self.close_window(window))
+        views = self.views.setdefault(window, [])
+        for name in names:
+            view = VIEWS[name](window, self)
+            view.frame.pack(fill='both', expand=True, padx=10, pady=5)
+            views.append(view)
+
+    def close_window(self, window):
+        for view in self.views.pop(window, ()):
+            view.close()
+        window.destroy()
+
+    def on_tick(self, stats):
+        if stats is None:
+            self.status_var.set("Replay finished")
+            return
+        parts = [f"tick {stats['tick']}"]
+        for topic, ms in stats["ms"].items():
+            parts.append(f"{topic}: {stats['reads'][topic]} read, {ms:.1f} ms, "
+                         f"{self.bus.subscriber_count(topic)} view(s)")
+        self.status_var.set("  |  ".join(parts))
+
+    def on_close(self):
+        self.sampler.stop()
+        for window in list(self.views):
+            for view in self.views.pop(window):
+                view.close()
+        self.source.close()
+        self.destroy()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-window memory dashboard with one shared sampler")
+    parser.add_argument("--layout", default="kernel+processes",
+                        help="windows separated by ',', views in a window by '+' (views: kernel, processes, cgroups)")
+    parser.add_argument("--replay", metavar="CAPTURE", help="play back a file recorded with capture.py")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (1-100)")
+    parser.add_argument("--proc-root", help="read this procfs tree instead of /proc (see fakeproc.py)")
+    parser.add_argument("--kernel-ring", action="store_true",
+                        help="drain high-rate samples from /proc/mem_tracker_samples instead of one read per tick")
+    args = parser.parse_args()
+
+    try:
+        layout = parse_layout(args.layout)
+    except ValueError as e:
+        parser.error(str(e))
+    if not layout:
+        parser.error("--layout needs at least one view")
+    if args.proc_root:
+        from collector import set_proc_root
+        set_proc_root(args.proc_root)
+    if args.replay:
+        from capture import ReplaySource
+        if not 1 <= args.speed <= 100:
+            parser.error("--speed must be between 1 and 100")
+        source = ReplaySource(args.replay, args.speed)
+    else:
+        source = LiveSource(kernel_ring=args.kernel_ring)
+
+    app = Dashboard(source, layout)
+    app.mainloop()
@@ -0,0 +1,74 @@
+import numpy as np
+
+# Level-of-detail reduction for the kernel memory chart.
+#
+# min/max-per-pixel keeps the lowest and highest sample in every pixel column, so
+# spikes survive no matter how far the chart is zoomed out, and the number of
+# points handed to matplotlib is bounded by the canvas width rather than by the
+# number of samples in the viewport. Everything runs as whole-array NumPy ops.
+
+def _first_per_bin(hits, bin_of_sample):
+    hit_bins = bin_of_sample[hits]
+    return hits[np.r_[True, hit_bins[1:] != hit_bins[:-1]]]
+
+def minmax_downsample(x, y, n_pixels):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if n_pixels < 1 or len(x) <= 2 * n_pixels:
+        return x, y
+
+    # Assign each sample to a pixel column; x is sorted, so columns are contiguous runs
+    span = x[-1] - x[0]
+    if span <= 0:
+        return x[[0, -1]], y[[0, -1]]
+    bins = ((x - x[0]) * (n_pixels / span)).astype(np.intp)
+    np.minimum(bins, n_pixels - 1, out=bins)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    counts = np.diff(np.r_[starts, len(x)])
+    bin_of_sample = np.repeat(np.arange(len(starts)), counts)
+
+    # First sample in each column equal to the column's min (resp. max)
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    min_idx = _first_per_bin(np.flatnonzero(y == mins[bin_of_sample]), bin_of_sample)
+    max_idx = _first_per_bin(np.flatnonzero(y == maxs[bin_of_sample]), bin_of_sample)
+
+    # Emit both points per column in time order
+    lo = np.minimum(min_idx, max_idx)
+    hi = np.maximum(min_idx, max_idx)
+    idx = np.empty(2 * len(lo), dtype=np.intp)
+    idx[0::2] = lo
+    idx[1::2] = hi
+    return x[idx], y[idx]
+
+def viewport_points(history, t0, t1, n_pixels):
+    # Points for the time window [t0, t1] of a RollupHistory, at most ~2 per pixel.
+    # When a pixel spans at least one rollup bucket and that tier covers t0 (or goes
+    # back as far as the raw samples do, as when the window starts before the
+    # tracker did), the tier's min/max buckets are used: cost is bounded by the
+    # tier size, well under a millisecond even for the 7-day range. Otherwise raw
+    # samples are reduced, which only happens below the 10 s buckets of the first
+    # tier used, i.e. for at most ~10 s per pixel of samples.
+    seconds_per_pixel = (t1 - t0) / max(n_pixels, 1)
+    raw_start = history.raw.times[0] if len(history.raw) else float("inf")
+    for tier in reversed(history.tiers[1:]):
+        if (tier.bucket_seconds <= seconds_per_pixel and tier.buckets
+                and tier.buckets[0][0] <= max(t0, raw_start)):
+            buckets = np.array(tier.points(t0 - tier.bucket_seconds), dtype=float).reshape(-1, 4)
+            buckets = buckets[buckets[:, 0] <= t1]
+            x = np.repeat(buckets[:, 0], 2)
+            y = np.empty(len(x))
+            y[0::2] = buckets[:, 1]
+            y[1::2] = buckets[:, 2]
+            return minmax_downsample(x, y, n_pixels)
+
+    if not len(history.raw):
+        return np.empty(0), np.empty(0)
+    # Views over the raw arrays must not outlive this call: array('d') cannot grow
+    # while a buffer is exported, so every path below returns fresh arrays.
+    times = np.frombuffer(history.raw.times, dtype=float)
+    values = np.frombuffer(history.raw.values, dtype=float)
+    lo = max(np.searchsorted(times, t0, side="left") - 1, 0)
+    hi = np.searchsorted(times, t1, side="right") + 1
+    x, y = minmax_downsample(times[lo:hi], values[lo:hi], n_pixels)
+    return np.array(x), np.array(y)
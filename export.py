@@ -0,0 +1,290 @@
+import argparse
+import csv
+import json
+import os
+import struct
+import threading
+import time
+
+from sample_codec import TimestampCodec, read_varint, unzigzag, write_varint, zigzag
+
+# Streaming export of recorded history. Rows are produced and written CHUNK_ROWS at a
+# time, so memory use stays flat however long the history is.
+#
+# Datasets:
+#   kernel    - (timestamp, percent) from the app's RollupHistory raw series
+#   processes - (timestamp, pid, name, memory_kb) from a capture.py recording
+#
+# Formats, picked from the file extension:
+#   .csv / .jsonl - one row per line
+#   .mtc          - chunked columnar binary: the magic, a length-prefixed JSON schema,
+#                   then chunks of varint-encoded columns. Timestamps are stored as
+#                   delta-of-delta ms, numbers as zigzag deltas, strings through a
+#                   dictionary extended chunk by chunk. Floats are fixed-point
+#                   hundredths, so they come back rounded to 0.01 (enough for a
+#                   percentage); timestamps are rounded to the millisecond.
+#                   read_columnar() reads a file back.
+CHUNK_ROWS = 8192
+COLUMNAR_MAGIC = b"MTC1"
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".mtc": "columnar"}
+
+KERNEL_COLUMNS = (("timestamp", "time"), ("percent", "float"))
+PROCESS_COLUMNS = (("timestamp", "time"), ("pid", "int"), ("name", "str"), ("memory_kb", "int"))
+
+def kernel_history_chunks(history, chunk_rows=CHUNK_ROWS):
+    # Reads the raw series in slices while the app keeps appending to it. The row
+    # count is fixed at the start; rows trimmed away meanwhile are skipped.
+    raw = history.raw
+    while True:
+        generation = raw.generation
+        start = raw.dropped
+        end = start + len(raw)
+        if generation % 2 == 0 and raw.generation == generation:
+            break
+    yield end - start
+    position = start
+    while position < end:
+        generation = raw.generation
+        if generation % 2:
+            # A trim is in progress on the UI thread
+            time.sleep(0)
+            continue
+        dropped = raw.dropped
+        # Skip rows trimmed since the last chunk before slicing
+        position = max(position, dropped)
+        if position >= end:
+            break
+        stop = min(end, position + chunk_rows)
+        times = raw.times[position - dropped:stop - dropped]
+        values = raw.values[position - dropped:stop - dropped]
+        if raw.generation != generation:
+            # Trimmed while slicing, so times and values may not line up; redo this chunk
+            continue
+        yield list(zip(times, values))
+        position = stop
+
+def capture_chunks(path, dataset, chunk_rows=CHUNK_ROWS, progress=None):
+    from capture import CaptureReader
+    from collector import parse_kernel_memory, parse_process_status
+    reader = CaptureReader(path)
+    yield None  # total unknown up front; progress comes from the file position
+    chunk = []
+    try:
+        for timestamp, kernel_text, statuses in reader:
+            if dataset == "kernel":
+                try:
+                    _, _, percent = parse_kernel_memory(kernel_text.splitlines())
+                except (AttributeError, ValueError, IndexError):
+                    percent = 0.0
+                chunk.append((timestamp, percent))
+            else:
+                for pid, text in statuses.items():
+                    name, memory_kb = parse_process_status(text.splitlines())
+                    if name:
+                        chunk.append((timestamp, pid, name, memory_kb))
+            if len(chunk) >= chunk_rows:
+                if progress:
+                    progress(reader.progress())
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        reader.close()
+
+class CsvWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write_chunk(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class JsonLinesWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w")
+        self.names = [name for name, _ in columns]
+
+    def write_chunk(self, rows):
+        names = self.names
+        self.file.write("".join(json.dumps(dict(zip(names, row))) + "\n" for row in rows))
+
+    def close(self):
+        self.file.close()
+
+class ColumnarWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "wb")
+        self.columns = columns
+        self.state = [TimestampCodec() if kind == "time" else 0 for _, kind in columns]
+        self.dictionary = {}
+        schema = json.dumps({"columns": [list(c) for c in columns]}).encode("utf-8")
+        header = bytearray(COLUMNAR_MAGIC)
+        write_varint(header, len(schema))
+        self.file.write(header + schema)
+
+    def write_chunk(self, rows):
+        if not rows:
+            # zip(*rows) would yield no columns at all, which read_columnar cannot parse
+            return
+        chunk = bytearray()
+        write_varint(chunk, len(rows))
+        new_names = []
+        encoded_columns = []
+        for index, ((_, kind), values) in enumerate(zip(self.columns, zip(*rows))):
+            buf = bytearray()
+            if kind == "time":
+                codec = self.state[index]
+                for value in values:
+                    codec.encode(buf, int(round(value * 1000)))
+            elif kind == "str":
+                for value in values:
+                    name_id = self.dictionary.get(value)
+                    if name_id is None:
+                        name_id = self.dictionary[value] = len(self.dictionary)
+                        new_names.append(value)
+                    write_varint(buf, name_id)
+            else:
+                scale = 100 if kind == "float" else 1
+                prev = self.state[index]
+                for value in values:
+                    value = int(round(value * scale))
+                    write_varint(buf, zigzag(value - prev))
+                    prev = value
+                self.state[index] = prev
+            encoded_columns.append(buf)
+
+        write_varint(chunk, len(new_names))
+        for name in new_names:
+            encoded = name.encode("utf-8")
+            write_varint(chunk, len(encoded))
+            chunk += encoded
+        for buf in encoded_columns:
+            write_varint(chunk, len(buf))
+            chunk += buf
+        self.file.write(struct.pack("<I", len(chunk)))
+        self.file.write(chunk)
+
+    def close(self):
+        self.file.close()
+
+def read_columnar(path):
+    # Yields rows back from a .mtc file, one chunk in memory at a time
+    with open(path, "rb") as f:
+        head = f.read(len(COLUMNAR_MAGIC) + 10)
+        if head[:len(COLUMNAR_MAGIC)] != COLUMNAR_MAGIC:
+            raise ValueError(f"{path} is not a columnar export")
+        length, pos = read_varint(head, len(COLUMNAR_MAGIC))
+        f.seek(pos)
+        columns = json.loads(f.read(length))["columns"]
+        state = [TimestampCodec() if kind == "time" else 0 for _, kind in columns]
+        dictionary = []
+        while True:
+            size = f.read(4)
+            if not size:
+                return
+            chunk = f.read(struct.unpack("<I", size)[0])
+            count, pos = read_varint(chunk, 0)
+            new_count, pos = read_varint(chunk, pos)
+            for _ in range(new_count):
+                n, pos = read_varint(chunk, pos)
+                dictionary.append(chunk[pos:pos + n].decode("utf-8"))
+                pos += n
+            decoded = []
+            for index, (_, kind) in enumerate(columns):
+                n, pos = read_varint(chunk, pos)
+                end = pos + n
+                values = []
+                if kind == "time":
+                    codec = state[index]
+                    for _ in range(count):
+                        value, pos = codec.decode(chunk, pos)
+                        values.append(value / 1000)
+                elif kind == "str":
+                    for _ in range(count):
+                        name_id, pos = read_varint(chunk, pos)
+                        values.append(dictionary[name_id])
+                else:
+                    prev = state[index]
+                    for _ in range(count):
+                        delta, pos = read_varint(chunk, pos)
+                        prev += unzigzag(delta)
+                        values.append(prev / 100 if kind == "float" else prev)
+                    state[index] = prev
+                pos = end
+                decoded.append(values)
+            yield from zip(*decoded)
+
+WRITERS = {"csv": CsvWriter, "jsonl": JsonLinesWriter, "columnar": ColumnarWriter}
+
+def format_for_path(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unknown export format for {path}; use one of {', '.join(FORMATS)}")
+    return fmt
+
+class ExportJob(threading.Thread):
+    # Runs an export on a background thread. The UI polls `fraction`, `finished`
+    # and `error`; cancel() stops at the next chunk boundary.
+    def __init__(self, chunks, path, columns):
+        super().__init__(daemon=True)
+        self.chunks = chunks
+        self.path = path
+        self.writer_class = WRITERS[format_for_path(path)]
+        self.columns = columns
+        self.rows = 0
+        self.total = None
+        self.fraction = 0.0
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+
+    def set_fraction(self, fraction):
+        self.fraction = fraction
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        writer = None
+        try:
+            writer = self.writer_class(self.path, self.columns)
+            self.total = next(self.chunks)
+            for rows in self.chunks:
+                if self.cancelled:
+                    break
+                writer.write_chunk(rows)
+                self.rows += len(rows)
+                if self.total:
+                    self.fraction = self.rows / self.total
+            else:
+                self.fraction = 1.0
+        except Exception as e:
+            self.error = e
+        finally:
+            if writer is not None:
+                writer.close()
+            self.chunks.close()
+            self.finished = True
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a capture.py recording")
+    parser.add_argument("capture")
+    parser.add_argument("output", help="output file; format from extension (.csv, .jsonl, .mtc)")
+    parser.add_argument("--dataset", choices=("kernel", "processes"), default="processes")
+    args = parser.parse_args()
+
+    columns = KERNEL_COLUMNS if args.dataset == "kernel" else PROCESS_COLUMNS
+    job = ExportJob(None, args.output, columns)
+    job.chunks = capture_chunks(args.capture, args.dataset, progress=job.set_fraction)
+    job.run()
+    if job.error:
+        raise SystemExit(f"Export failed: {job.error}")
+    print(f"Wrote {job.rows:,} rows to {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+if __name__ == "__main__":
+    main()
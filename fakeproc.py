@@ -0,0 +1,216 @@
+import argparse
+import math
+import os
+import random
+import time
+
+from collector import NUMA_HEADER, NUMA_MAGIC, NUMA_RECORD, SAMPLE_RECORD
+
+# Synthetic procfs tree for load testing without root or a kernel module.
+#
+# Builds a directory that looks like /proc to the collectors (mem_tracker and its
+# NUMA and sample files, pressure/memory, and per-PID status, stat, oom_score,
+# cmdline and exe) and then evolves it: every step a fraction of the processes
+# change RSS, some exit and new ones start, with PIDs wrapping at PID_MAX so reuse
+# happens the way it does on a busy box. Everything comes from one seeded RNG, so a
+# given seed always produces the same sequence.
+#
+# Run it, then point any tool at the tree:
+#   python3 fakeproc.py /dev/shm/fakeproc --processes 50000
+#   python3 finalui.py --proc-root /dev/shm/fakeproc
+PID_MAX = 99999
+CLOCK_TICKS = 100
+PAGE_SIZE = 4096
+SAMPLE_HZ = 100
+# Process sizes are log-normal (mostly a few MB, with a long tail of large ones)
+RSS_MU = 9
+RSS_SIGMA = 1.5
+NAMES = ("postgres", "nginx", "java", "python3", "node", "redis-server", "chrome", "sshd",
+         "systemd", "containerd-shim", "php-fpm", "ruby", "mysqld", "envoy", "bash", "cron")
+
+class FakeProcess:
+    __slots__ = ("pid", "name", "rss_kb", "swap_kb", "major_faults", "start_time", "drift")
+
+    def __init__(self, pid, name, rss_kb, swap_kb, start_time, drift):
+        self.pid = pid
+        self.name = name
+        self.rss_kb = rss_kb
+        self.swap_kb = swap_kb
+        self.major_faults = 0
+        self.start_time = start_time
+        # KB per second; a few processes leak steadily, most wander around zero
+        self.drift = drift
+
+class FakeProcTree:
+    def __init__(self, root, processes=1000, seed=0, churn=0.01, active=0.1,
+                 total_kb=None, base_kb=2 * 1024 * 1024, nodes=2):
+        self.root = root
+        self.target = processes
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.active = active
+        # By default sized so the processes start out using about 60% of memory
+        mean_rss_kb = math.exp(RSS_MU + RSS_SIGMA ** 2 / 2)
+        self.total_kb = total_kb or int(base_kb + processes * mean_rss_kb / 0.6)
+        self.base_kb = base_kb
+        self.nodes = nodes
+        self.processes = {}
+        self.next_pid = 300
+        self.now = time.time()
+        # Seconds since the fake boot, for stat's starttime
+        self.uptime = 1000.0
+        self.seq = 0
+
+    def build(self):
+        os.makedirs(os.path.join(self.root, "pressure"), exist_ok=True)
+        with open(os.path.join(self.root, "mem_tracker_samples"), "wb"):
+            pass
+        for _ in range(self.target):
+            self._spawn()
+        self._write_system(0.0)
+
+    def step(self, seconds=1.0):
+        # Advance the tree by `seconds`: RSS changes, exits and starts
+        self.now += seconds
+        self.uptime += seconds
+        rng = self.rng
+        pids = list(self.processes)
+        for pid in rng.sample(pids, int(len(pids) * self.active)):
+            proc = self.processes[pid]
+            proc.rss_kb = max(100, int(proc.rss_kb + proc.drift * seconds + rng.gauss(0, proc.rss_kb * 0.02)))
+            if rng.random() < 0.05:
+                proc.major_faults += rng.randint(1, 50)
+            self._write_process(proc)
+        exits = int(len(pids) * self.churn)
+        for pid in rng.sample(pids, exits):
+            self._exit(pid)
+        while len(self.processes) < self.target:
+            self._spawn()
+        self._write_system(seconds)
+
+    def used_kb(self):
+        return min(self.total_kb, self.base_kb + sum(p.rss_kb for p in self.processes.values()))
+
+    def _allocate_pid(self):
+        while True:
+            pid = self.next_pid
+            self.next_pid = pid + 1 if pid < PID_MAX else 300
+            if pid not in self.processes:
+                return pid
+
+    def _spawn(self):
+        rng = self.rng
+        name = rng.choice(NAMES)
+        rss_kb = int(min(rng.lognormvariate(RSS_MU, RSS_SIGMA), 8 * 1024 * 1024))
+        swap_kb = int(rss_kb * rng.random() * 0.2) if rng.random() < 0.1 else 0
+        drift = rng.uniform(50, 500) if rng.random() < 0.01 else rng.gauss(0, 5)
+        proc = FakeProcess(self._allocate_pid(), name, rss_kb, swap_kb, int(self.uptime * CLOCK_TICKS), drift)
+        self.processes[proc.pid] = proc
+        directory = os.path.join(self.root, str(proc.pid))
+        os.makedirs(directory, exist_ok=True)
+        self._write(os.path.join(directory, "cmdline"), f"/usr/bin/{name}\0--worker\0{proc.pid}\0")
+        exe = os.path.join(directory, "exe")
+        if os.path.lexists(exe):
+            os.remove(exe)
+        os.symlink(f"/usr/bin/{name}", exe)
+        self._write_process(proc)
+
+    def _exit(self, pid):
+        del self.processes[pid]
+        directory = os.path.join(self.root, str(pid))
+        for entry in ("status", "stat", "oom_score", "cmdline", "exe"):
+            try:
+                os.remove(os.path.join(directory, entry))
+            except FileNotFoundError:
+                pass
+        os.rmdir(directory)
+
+    def _write_process(self, proc):
+        directory = os.path.join(self.root, str(proc.pid))
+        self._write(os.path.join(directory, "status"),
+                    f"Name:\t{proc.name}\nUmask:\t0022\nState:\tS (sleeping)\nTgid:\t{proc.pid}\n"
+                    f"Pid:\t{proc.pid}\nPPid:\t1\nVmPeak:\t{proc.rss_kb * 2} kB\nVmSize:\t{proc.rss_kb * 2} kB\n"
+                    f"VmRSS:\t{proc.rss_kb} kB\nVmData:\t{proc.rss_kb} kB\nVmSwap:\t{proc.swap_kb} kB\n"
+                    f"Threads:\t1\n")
+        self._write(os.path.join(directory, "stat"),
+                    f"{proc.pid} ({proc.name}) S 1 {proc.pid} {proc.pid} 0 -1 4194304 0 0 {proc.major_faults} 0 "
+                    f"0 0 0 0 20 0 1 0 {proc.start_time} {proc.rss_kb * 2048} {proc.rss_kb // 4}\n")
+        self._write(os.path.join(directory, "oom_score"), f"{proc.rss_kb * 1000 // self.total_kb}\n")
+
+    def _write_system(self, seconds):
+        used = self.used_kb()
+        percent = used / self.total_kb * 100
+        self._write(os.path.join(self.root, "mem_tracker"), f"Used: {used}\nTotal: {self.total_kb}\n")
+        some = max(0.0, (percent - 80) * 2)
+        self._write(os.path.join(self.root, "pressure", "memory"),
+                    f"some avg10={some:.2f} avg60={some:.2f} avg300={some:.2f} total=0\n"
+                    f"full avg10={some / 4:.2f} avg60={some / 4:.2f} avg300={some / 4:.2f} total=0\n")
+
+        # One Normal zone per node, plus DMA32 on node 0; processes live on pid % nodes
+        page_kb = PAGE_SIZE // 1024
+        per_node_used = [0] * self.nodes
+        for proc in self.processes.values():
+            per_node_used[proc.pid % self.nodes] += proc.rss_kb
+        node_pages = self.total_kb // page_kb // self.nodes
+        dma_pages = min(node_pages // 16, 1 << 20)
+        records = [NUMA_RECORD.pack(0, 1, b"DMA32", dma_pages, dma_pages // 2)]
+        for node in range(self.nodes):
+            managed = node_pages - (dma_pages if node == 0 else 0)
+            used_pages = min(managed, (per_node_used[node] + self.base_kb // self.nodes) // page_kb)
+            records.append(NUMA_RECORD.pack(node, 2, b"Normal", managed, managed - used_pages))
+        self._write(os.path.join(self.root, "mem_tracker_numa"),
+                    NUMA_HEADER.pack(NUMA_MAGIC, 1, len(records), PAGE_SIZE) + b"".join(records))
+
+        # The sample "ring" is a plain file that only grows, which reads the same way
+        # to KernelSampleReader: each read returns whatever was appended since the last
+        samples = []
+        count = int(seconds * SAMPLE_HZ)
+        for i in range(count):
+            timestamp_ns = int((self.now - seconds + (i + 1) / SAMPLE_HZ) * 1e9)
+            samples.append(SAMPLE_RECORD.pack(timestamp_ns, self.seq & 0xFFFFFFFF, used, self.total_kb))
+            self.seq += 1
+        if samples:
+            with open(os.path.join(self.root, "mem_tracker_samples"), "ab") as f:
+                f.write(b"".join(samples))
+
+    def _write(self, path, data):
+        # Write-then-rename, so a collector never reads a half-written file
+        tmp = path + ".tmp"
+        with open(tmp, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and evolve a synthetic /proc tree for load testing")
+    parser.add_argument("root", help="directory to build the tree in (tmpfs such as /dev/shm is fastest)")
+    parser.add_argument("--processes", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--churn", type=float, default=0.01, help="fraction of processes replaced per step")
+    parser.add_argument("--active", type=float, default=0.1, help="fraction of processes whose RSS changes per step")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between steps")
+    parser.add_argument("--steps", type=int, help="stop after this many steps (default: until Ctrl-C)")
+    args = parser.parse_args()
+
+    if os.path.exists(args.root) and os.listdir(args.root):
+        parser.error(f"{args.root} is not empty")
+    if args.processes >= PID_MAX - 300:
+        parser.error(f"--processes must be below {PID_MAX - 300}")
+    tree = FakeProcTree(args.root, args.processes, args.seed, args.churn, args.active)
+    start = time.perf_counter()
+    tree.build()
+    print(f"Built {args.processes:,} processes in {args.root} in {time.perf_counter() - start:.1f}s")
+
+    steps = 0
+    try:
+        while args.steps is None or steps < args.steps:
+            tick = time.perf_counter()
+            tree.step(args.interval)
+            steps += 1
+            elapsed = time.perf_counter() - tick
+            print(f"step {steps}: {len(tree.processes):,} processes, used {tree.used_kb():,} KB, {elapsed:.2f}s")
+            time.sleep(max(0.0, args.interval - elapsed))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
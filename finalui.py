@@ -1,55 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import argparse
 import os
+import re
+import threading
+import time
+from collections import deque
 
-def read_kernel_memory():
-    try:
-        with open("/proc/mem_tracker") as f:
-            lines = f.readlines()
-            used = int(lines[0].split(":")[1].strip())
-            total = int(lines[1].split(":")[1].strip())
-            percent = (used / total) * 100 if total > 0 else 0
-            return used, total, percent
-    except Exception:
-        return 0, 1, 0
-
-def get_process_memory_info():
-    process_info = []
-    for pid_str in os.listdir("/proc"):
-        if pid_str.isdigit():
-            pid = int(pid_str)
-            try:
-                with open(f"/proc/{pid}/status", 'r') as f:
-                    lines = f.readlines()
-                    name = ""
-                    vmrss_kb = 0
-                    for line in lines:
-                        if line.startswith("Name:"):
-                            name = line.split(":")[1].strip()
-                        elif line.startswith("VmRSS:"):
-                            vmrss_str = line.split(":")[1].strip()
-                            vmrss_kb_str = vmrss_str.replace(" kB", "")
-                            try:
-                                vmrss_kb = int(vmrss_kb_str)
-                            except ValueError:
-                                vmrss_kb = 0
-                            break
-                    if name:
-                        process_info.append({"pid": pid, "name": name, "memory_kb": vmrss_kb})
-            except FileNotFoundError:
-                pass
-            except Exception as e:
-                print(f"Error reading /proc/{pid}/status: {e}")
-
-    process_info.sort(key=lambda x: x['memory_kb'], reverse=True)
-    return process_info
+from collector import LiveSource, ProcessIdentityCache, group_processes, read_start_time
+from forecast import HoltForecaster, format_duration
+from history import RANGES, RollupHistory
+from render import RenderScheduler
+from selfmon import SelfMonitor
+
+# matplotlib/NumPy (the chart) and the Process tab are imported and built lazily:
+# the window and the first numbers show up before any of that work is done.
+
+# Rows listed per group in the memory map pane (files are grouped by path, so this
+# is distinct files, not mappings)
+MAP_ROWS = 500
+
+def _optional(value):
+    # Blank cell for a field that was not collected (or cannot be replayed)
+    return "" if value is None else f"{value:,}"
 
 class MemoryTrackerApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, source=None, fleet=None, profile=None, profile_ticks=30, profile_dir=".", poll_policy=None):
         super().__init__()
 
+        self.source = source or LiveSource()
+        self.fleet = fleet
+        # Optional AdaptiveInterval; replays always follow the recorded timing
+        self.poll_policy = poll_policy
         self.title("🧠 System Memory Tracker")
         self.geometry("980x750")
         self.dark_mode = True
@@ -68,16 +50,40 @@ class MemoryTrackerApp(tk.Tk):
         # Notebook (Tabbed Interface)
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(pady=15, padx=15, fill='both', expand=True)
+        self.renderer = RenderScheduler(self)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.on_tab_changed())
+        self.bind("<Map>", lambda e: self.renderer.refresh())
 
         # Kernel Memory Tab
         self.kernel_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.kernel_tab, text='Kernel Memory')
         self.create_kernel_memory_tab()
 
-        # Process Memory Tab
+        # Process Memory Tab, filled in the first time it is selected
         self.process_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.process_tab, text='Process Memory')
-        self.create_process_memory_tab()
+        self.process_tree = None
+
+        # Snapshot Diff Tab, also built on first selection
+        self.diff_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.diff_tab, text='Snapshot Diff')
+        self.diff_tree = None
+
+        # Fleet Tab, only when connected to remote agents
+        if self.fleet is not None:
+            self.fleet_tab = ttk.Frame(self.notebook)
+            self.notebook.add(self.fleet_tab, text='Fleet')
+            self.create_fleet_tab()
+
+        # Widget updates are batched per frame and skipped for hidden tabs
+        self.renderer.add_panel('kernel', self.render_kernel, lambda: self._tab_visible(self.kernel_tab))
+        self.renderer.add_panel('chart', self.render_chart, lambda: self._tab_visible(self.kernel_tab))
+        self.renderer.add_panel('numa', self.render_numa, lambda: self._tab_visible(self.kernel_tab))
+        self.renderer.add_panel('processes', self.render_processes,
+                                lambda: self.process_tree is not None and self._tab_visible(self.process_tab))
+        if self.fleet is not None:
+            self.renderer.add_panel('fleet', self.render_fleet, lambda: self._tab_visible(self.fleet_tab))
+        self.kernel_sample = (0, 1, 0)
 
         # Buttons frame (moved to the main window)
         btn_frame = tk.Frame(self, bg=self._get_bg_color())
@@ -96,13 +102,57 @@ class MemoryTrackerApp(tk.Tk):
         self.theme_button = ttk.Button(btn_frame, text="Toggle Theme", command=self.toggle_theme)
         self.theme_button.grid(row=0, column=2, padx=10)
 
+        # Export self-monitoring stats button
+        self.stats_button = ttk.Button(btn_frame, text="Export Stats", command=self.export_stats)
+        self.stats_button.grid(row=0, column=3, padx=10)
+
+        # Export history button; the export runs on a background thread
+        self.export_button = ttk.Button(btn_frame, text="Export History", command=self.export_history)
+        self.export_button.grid(row=0, column=4, padx=10)
+        self.export_progress = ttk.Progressbar(btn_frame, orient="horizontal", mode="determinate", length=120)
+        self.export_job = None
+
+        # Status bar with the tracker's own cost: per-stage timings, RSS and CPU
+        self.monitor = SelfMonitor()
+        self.status_var = tk.StringVar()
+        self.status_bar = ttk.Label(self, textvariable=self.status_var, style="Status.TLabel", anchor='w')
+        self.status_bar.pack(fill='x', padx=15, pady=(0, 8))
+        self.renderer.add_panel('status', self.render_status)
+        self.next_tick_due = None
+
+        # F9 captures cProfile, F10 tracemalloc, for profile_ticks ticks of every stage
+        self.profile_session = None
+        self.profile_ticks = profile_ticks
+        self.profile_dir = profile_dir
+        self.bind("<F9>", lambda e: self.start_profile("cprofile"))
+        self.bind("<F10>", lambda e: self.start_profile("tracemalloc"))
+        if profile:
+            self.start_profile(profile)
+
         # Data storage for kernel memory
-        self.memory_log = []
+        self.history = RollupHistory()
         self.threshold = 80
         self.alert_shown = False
+        self.forecaster = HoltForecaster()
+
+        # Process starts/exits per tick and recent short-lived processes, with --lifecycle
+        self.lifecycle_counts = None
+        self.short_lived = deque(maxlen=200)
 
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.update_ui()
 
+    def on_close(self):
+        # Release the figure explicitly rather than relying on interpreter teardown
+        if self.canvas is not None:
+            self.charts.close()
+            self.canvas = None
+        # Release the sources' sockets and file descriptors rather than leaving them to exit
+        if self.fleet is not None:
+            self.fleet.close()
+        self.source.close()
+        self.destroy()
+
     def create_kernel_memory_tab(self):
         # Header
         self.kernel_header = ttk.Label(self.kernel_tab, text="🧠 Kernel Memory Overview", style="Title.TLabel")
@@ -113,6 +163,11 @@ class MemoryTrackerApp(tk.Tk):
         self.kernel_info_label = ttk.Label(self.kernel_tab, textvariable=self.kernel_label_var, style="TLabel")
         self.kernel_info_label.pack(pady=(0, 10))
 
+        # Projected time until the alert threshold (or, past it, until memory runs out)
+        self.forecast_var = tk.StringVar()
+        self.forecast_label = ttk.Label(self.kernel_tab, textvariable=self.forecast_var, style="TLabel")
+        self.forecast_label.pack(pady=(0, 10))
+
         # Progress bar frame
         pb_frame = tk.Frame(self.kernel_tab, bg=self._get_axis_bg())
         pb_frame.pack(pady=(0, 20), padx=30, fill='x')
@@ -122,40 +177,789 @@ class MemoryTrackerApp(tk.Tk):
                                          style="TProgressbar")
         self.progress.pack(fill='x')
 
-        # Matplotlib figure and canvas
-        self.fig, self.ax = plt.subplots(figsize=(7, 3), dpi=100)
-        self.fig.patch.set_facecolor(self._get_bg_color())
-        self.ax.set_facecolor(self._get_axis_bg())
-        self.ax.tick_params(axis='x', colors=self._get_fg_color())
-        self.ax.tick_params(axis='y', colors=self._get_fg_color())
-        self.ax.spines['bottom'].set_color(self._get_fg_color())
-        self.ax.spines['left'].set_color(self._get_fg_color())
-        self.ax.grid(color='#444444', linestyle='--', linewidth=0.5)
-        self.ax.set_ylim(0, 100)
-        self.ax.set_title("Kernel Memory Usage (Last 30 seconds)", color=self._get_teal_color(), fontsize=17, pad=15)
-        self.line, = self.ax.plot([], [], color=self._get_coral_color(), linewidth=3, alpha=0.9)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.kernel_tab)
-        self.canvas.get_tk_widget().pack(pady=(0, 15), padx=15, fill='x')
+        # History range selector
+        range_frame = ttk.Frame(self.kernel_tab)
+        range_frame.pack(pady=(0, 5))
+        ttk.Label(range_frame, text="Range:").pack(side=tk.LEFT)
+        self.range_var = tk.StringVar(value="30 s")
+        range_combo = ttk.Combobox(range_frame, textvariable=self.range_var, state="readonly", width=8,
+                                   values=tuple(RANGES))
+        range_combo.pack(side=tk.LEFT, padx=10)
+        range_combo.bind("<<ComboboxSelected>>", lambda e: self.on_range_changed())
+        self.show_psi_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(range_frame, text="Pressure (PSI)", variable=self.show_psi_var,
+                        command=lambda: self.toggle_panel('psi', self.show_psi_var.get())).pack(side=tk.LEFT, padx=10)
+        self.show_tracked_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(range_frame, text="Selected process", variable=self.show_tracked_var,
+                        command=lambda: self.toggle_panel('process', self.show_tracked_var.get())).pack(side=tk.LEFT)
+        self.show_forecast_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(range_frame, text="Forecast", variable=self.show_forecast_var,
+                        command=lambda: self.renderer.mark_dirty('kernel', 'chart')).pack(side=tk.LEFT, padx=10)
+        self.show_numa_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(range_frame, text="NUMA nodes", variable=self.show_numa_var,
+                        command=self.toggle_numa).pack(side=tk.LEFT)
+
+        # Per-node bars, one row per NUMA node, filled from one read of /proc/mem_tracker_numa per tick
+        self.numa_frame = ttk.Frame(self.kernel_tab)
+        self.numa_frame.pack(padx=30, fill='x')
+        self.numa_zones = None
+        self.numa_rows = {}
+        self.numa_status_var = tk.StringVar()
+        self.numa_status = ttk.Label(self.numa_frame, textvariable=self.numa_status_var, style="TLabel")
+
+        # Extra panels only collect data while shown: (timestamp, some, full) and (timestamp, rss_kb)
+        self.psi_log = deque(maxlen=300)
+        self.tracked_pid = None
+        self.tracked_name = ""
+        self.tracked_log = deque(maxlen=300)
+
+        # Zoom with the scroll wheel, pan by dragging, double-click to follow live data again.
+        # self.view holds the zoomed window as absolute (start, end) timestamps.
+        self.view = None
+        self.pan_start = None
+
+        # The chart is built by build_chart() after the first frame
+        self.canvas = None
+        self.chart_pending = False
+
+    def build_chart(self):
+        if self.canvas is not None:
+            return
+        from charts import ChartHost
+
+        # Matplotlib figure and canvas; every panel is an axes on this one figure
+        self.charts = ChartHost(self.kernel_tab)
+        self.fig = self.charts.figure
+        self.canvas = self.charts.canvas
+        self.charts.add_panel('kernel', self._setup_kernel_axes)
+        if self.show_psi_var.get():
+            self.charts.add_panel('psi', self._setup_psi_axes)
+        if self.show_tracked_var.get():
+            self.charts.add_panel('process', self._setup_process_axes)
+        self.charts.widget().pack(pady=(0, 15), padx=15, fill='x')
+
+        self.canvas.mpl_connect('scroll_event', self.on_chart_scroll)
+        self.canvas.mpl_connect('button_press_event', self.on_chart_press)
+        self.canvas.mpl_connect('motion_notify_event', self.on_chart_drag)
+        self.canvas.mpl_connect('button_release_event', self.on_chart_release)
         self._configure_plot_colors()
+        self.chart_pending = False
+        self.renderer.mark_dirty('chart')
+
+    def _style_axes(self, ax, title):
+        ax.set_facecolor(self._get_axis_bg())
+        ax.tick_params(axis='x', colors=self._get_fg_color())
+        ax.tick_params(axis='y', colors=self._get_fg_color())
+        ax.spines['bottom'].set_color(self._get_fg_color())
+        ax.spines['left'].set_color(self._get_fg_color())
+        ax.grid(color='#444444', linestyle='--', linewidth=0.5)
+        ax.set_title(title, color=self._get_teal_color(), fontsize=17, pad=15)
+
+    def _setup_kernel_axes(self, ax):
+        self.ax = ax
+        self._style_axes(ax, self._chart_title())
+        ax.set_ylim(0, 100)
+        self.line, = ax.plot([], [], color=self._get_coral_color(), linewidth=3, alpha=0.9)
+        self.band = None
+        self.forecast_line, = ax.plot([], [], color=self._get_teal_color(), linewidth=2, linestyle='--')
+        self.threshold_line = ax.axhline(self.threshold, color=self._get_teal_color(), linewidth=1,
+                                         linestyle=':', alpha=0.6, visible=False)
+
+    def _setup_psi_axes(self, ax):
+        self._style_axes(ax, "Memory Pressure, avg10 % (some / full)")
+        ax.set_ylim(0, 100)
+        self.psi_lines = (ax.plot([], [], color=self._get_coral_color(), linewidth=2, label="some")[0],
+                          ax.plot([], [], color=self._get_teal_color(), linewidth=2, label="full")[0])
+
+    def _setup_process_axes(self, ax):
+        self._style_axes(ax, self._tracked_title())
+        self.tracked_line, = ax.plot([], [], color=self._get_coral_color(), linewidth=2)
+
+    def toggle_numa(self):
+        self.numa_zones = None
+        if self.show_numa_var.get():
+            self.numa_status_var.set("Waiting for NUMA data…")
+            self.numa_status.grid(row=0, column=0, columnspan=3, sticky='w')
+        else:
+            self.numa_status.grid_remove()
+            for row in self.numa_rows.values():
+                for widget in row[:3]:
+                    widget.destroy()
+            self.numa_rows.clear()
+        self.renderer.mark_dirty('numa')
+
+    def render_numa(self):
+        if not self.show_numa_var.get():
+            return
+        if self.numa_zones is None:
+            self.numa_status_var.set("No NUMA data (needs a mem_tracker module with /proc/mem_tracker_numa)")
+            return
+        # Zones summed per node; the zone split goes in the row's text
+        nodes = {}
+        for node, zone, total_kb, free_kb in self.numa_zones:
+            entry = nodes.setdefault(node, [0, 0, []])
+            entry[0] += total_kb
+            entry[1] += free_kb
+            entry[2].append(f"{zone} {(total_kb - free_kb) / 1048576:.1f}/{total_kb / 1048576:.1f}")
+        percents = []
+        for index, node in enumerate(sorted(nodes)):
+            total_kb, free_kb, zones = nodes[node]
+            percent = (total_kb - free_kb) / total_kb * 100 if total_kb else 0
+            percents.append(percent)
+            row = self.numa_rows.get(node)
+            if row is None:
+                text_var = tk.StringVar()
+                row = self.numa_rows[node] = (
+                    ttk.Label(self.numa_frame, text=f"Node {node}", style="TLabel"),
+                    ttk.Progressbar(self.numa_frame, orient="horizontal", mode="determinate", length=300,
+                                    style="Node.Horizontal.TProgressbar"),
+                    ttk.Label(self.numa_frame, textvariable=text_var, style="Status.TLabel"),
+                    text_var)
+                for column, widget in enumerate(row[:3]):
+                    widget.grid(row=index + 1, column=column, sticky='w', padx=(0, 10), pady=2)
+            row[1]['value'] = percent
+            row[3].set(f"{percent:.1f}%  ({', '.join(zones)} GB)")
+        for node in [n for n in self.numa_rows if n not in nodes]:
+            for widget in self.numa_rows.pop(node)[:3]:
+                widget.destroy()
+        if len(percents) > 1:
+            self.numa_status_var.set(f"Node imbalance: {max(percents) - min(percents):.1f} points")
+        else:
+            self.numa_status_var.set("Single NUMA node")
+
+    def _tracked_title(self):
+        if self.tracked_pid is None:
+            return "Selected Process RSS (select a row in Process Memory)"
+        return f"{self.tracked_name} ({self.tracked_pid}) RSS (KB)"
+
+    def toggle_panel(self, name, show):
+        if name == 'psi':
+            self.psi_log.clear()
+        else:
+            self.tracked_log.clear()
+        if self.canvas is not None:
+            if show:
+                setup = self._setup_psi_axes if name == 'psi' else self._setup_process_axes
+                self.charts.add_panel(name, setup)
+            else:
+                self.charts.remove_panel(name)
+        self.renderer.mark_dirty('chart')
+
+    def on_process_selected(self):
+        selection = self.process_tree.selection()
+        if not selection or self.group_mode_var.get() != "None":
+            return
+        pid, name = self.process_tree.item(selection[0], 'values')[:2]
+        self.tracked_pid = int(pid)
+        self.tracked_name = name
+        self.tracked_log.clear()
+        if self.canvas is not None and self.charts.has_panel('process'):
+            self.charts.axes['process'].title.set_text(self._tracked_title())
+            self.renderer.mark_dirty('chart')
+
+    def render_chart(self):
+        if self.canvas is None:
+            # Build one event-loop turn later so the first numbers get painted first
+            if not self.chart_pending:
+                self.chart_pending = True
+                self.after(10, self.build_chart)
+            return
+        with self.monitor.span('render_chart'):
+            self.draw_history()
+            if self.charts.has_panel('psi'):
+                self._draw_recent(self.charts.axes['psi'], self.psi_log, self.psi_lines)
+            if self.charts.has_panel('process'):
+                self._draw_recent(self.charts.axes['process'], self.tracked_log, (self.tracked_line,))
+            # Draw now rather than on idle: this already runs inside the coalesced frame,
+            # and it keeps the Agg render inside the timed span
+            self.charts.draw()
+
+    def _draw_recent(self, ax, log, lines):
+        # Last few minutes of (timestamp, value, ...) rows, one line per value column
+        latest = log[-1][0] if log else 0
+        xs = [row[0] - latest for row in log]
+        for column, line in enumerate(lines, start=1):
+            line.set_data(xs, [row[column] for row in log])
+        ax.set_xlim(-300, 0)
+        if lines is not self.psi_lines and log:
+            ax.set_ylim(0, max(row[1] for row in log) * 1.2 or 1)
+
+    def on_tab_changed(self):
+        if self.process_tree is None and self._tab_visible(self.process_tab):
+            self.create_process_memory_tab()
+        if self.diff_tree is None and self._tab_visible(self.diff_tab):
+            self.create_diff_tab()
+        self.renderer.refresh()
 
     def create_process_memory_tab(self):
-        self.process_tree = ttk.Treeview(self.process_tab, columns=('PID', 'Name', 'Memory'), show='headings')
+        # Group-by controls
+        group_frame = ttk.Frame(self.process_tab)
+        group_frame.pack(side=tk.TOP, fill='x', padx=15, pady=(15, 0))
+        ttk.Label(group_frame, text="Group by:").pack(side=tk.LEFT)
+        self.group_mode_var = tk.StringVar(value="None")
+        if getattr(self.source, "path", None):
+            # Exe and cmdline are read from /proc on this machine, not from the replay's
+            group_modes = ("None", "Name")
+        else:
+            group_modes = ("None", "Name", "Exe", "Cmdline regex")
+        group_combo = ttk.Combobox(group_frame, textvariable=self.group_mode_var, state="readonly", width=14,
+                                   values=group_modes)
+        group_combo.pack(side=tk.LEFT, padx=10)
+        group_combo.bind("<<ComboboxSelected>>", lambda e: self.on_group_mode_changed())
+        ttk.Label(group_frame, text="Regex:").pack(side=tk.LEFT)
+        self.group_regex_var = tk.StringVar()
+        regex_entry = ttk.Entry(group_frame, textvariable=self.group_regex_var, width=30)
+        regex_entry.pack(side=tk.LEFT, padx=10)
+        regex_entry.bind("<Return>", lambda e: self.on_group_mode_changed())
+        self.identity_cache = ProcessIdentityCache()
+        self.group_pattern = None
+
+        # Optional columns; the scanner only reads the files for the ones shown
+        self.field_vars = {}
+        for field, text in (("swap", "Swap"), ("major_faults", "Major faults"), ("oom_score", "OOM score")):
+            self.field_vars[field] = tk.BooleanVar(value=field in self.source.fields)
+            ttk.Checkbutton(group_frame, text=text, variable=self.field_vars[field],
+                            command=self.on_fields_changed).pack(side=tk.LEFT, padx=(0, 10))
+
+        # Starts, exits and short-lived processes, when lifecycle tracking is on
+        self.lifecycle_var = tk.StringVar()
+        ttk.Label(self.process_tab, textvariable=self.lifecycle_var, style="TLabel").pack(
+            side=tk.TOP, anchor='w', padx=15, pady=(5, 0))
+
+        # Process table on top; the memory map pane is added below on first double-click
+        self.process_panes = ttk.PanedWindow(self.process_tab, orient=tk.VERTICAL)
+        self.process_panes.pack(padx=15, pady=15, fill='both', expand=True)
+        table = ttk.Frame(self.process_panes)
+        self.process_panes.add(table, weight=3)
+        self.map_tree = None
+
+        self.process_tree = ttk.Treeview(table, columns=('PID', 'Name', 'Memory', 'Swap', 'Faults', 'OOM'),
+                                         show='headings')
         self.process_tree.heading('PID', text='PID')
         self.process_tree.heading('Name', text='Name')
         self.process_tree.heading('Memory', text='Memory (KB)')
+        self.process_tree.heading('Swap', text='Swap (KB)')
+        self.process_tree.heading('Faults', text='Major Faults')
+        self.process_tree.heading('OOM', text='OOM Score')
 
         self.process_tree.column('PID', width=80, anchor='center')
         self.process_tree.column('Name', width=250, anchor='w')
         self.process_tree.column('Memory', width=120, anchor='e')
-
-        self.process_tree.pack(padx=15, pady=15, fill='both', expand=True)
+        self.process_tree.column('Swap', width=110, anchor='e')
+        self.process_tree.column('Faults', width=110, anchor='e')
+        self.process_tree.column('OOM', width=90, anchor='e')
+        self._show_field_columns()
+        self.process_tree.bind("<<TreeviewSelect>>", lambda e: self.on_process_selected())
+        self.process_tree.bind("<Double-1>", self.on_process_double_click)
 
         # Scrollbar for the treeview
-        scrollbar = ttk.Scrollbar(self.process_tab, orient=tk.VERTICAL, command=self.process_tree.yview)
+        scrollbar = ttk.Scrollbar(table, orient=tk.VERTICAL, command=self.process_tree.yview)
         self.process_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.process_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
+    def create_map_pane(self):
+        from smaps import MemoryMapCache
+        pane = ttk.Frame(self.process_panes)
+        self.process_panes.add(pane, weight=2)
+        self.map_summary_var = tk.StringVar()
+        ttk.Label(pane, textvariable=self.map_summary_var, style="TLabel").pack(anchor='w', pady=(5, 0))
+
+        self.map_tree = ttk.Treeview(pane, columns=('Mappings', 'RSS', 'PSS'), show='tree headings')
+        self.map_tree.heading('#0', text='Mapping')
+        self.map_tree.column('#0', width=420, anchor='w')
+        for column, text in (('Mappings', 'Mappings'), ('RSS', 'RSS (KB)'), ('PSS', 'PSS (KB)')):
+            self.map_tree.heading(column, text=text)
+            self.map_tree.column(column, width=110, anchor='e')
+        self.map_tree.bind("<<TreeviewOpen>>", lambda e: self.on_map_group_opened())
+        scrollbar = ttk.Scrollbar(pane, orient=tk.VERTICAL, command=self.map_tree.yview)
+        self.map_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.map_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=5)
+
+        self.map_cache = MemoryMapCache()
+        self.map_job = None
+        # Group node -> (MemoryMap, kind) whose rows are inserted when it is first opened
+        self.map_groups = {}
+
+    def on_process_double_click(self, event):
+        row = self.process_tree.identify_row(event.y)
+        if not row or self.group_mode_var.get() != "None":
+            return
+        pid, name = self.process_tree.item(row, 'values')[:2]
+        self.show_memory_map(int(pid), name)
+
+    def show_memory_map(self, pid, name):
+        from smaps import SmapsLoader
+        if self.map_tree is None:
+            self.create_map_pane()
+        if self.map_job is not None:
+            self.map_job.cancel()
+            self.map_job = None
+        self._clear_map_tree()
+        if getattr(self.source, "path", None):
+            self.map_summary_var.set("Memory maps are only read from live processes, not from a replay")
+            return
+        start_time = read_start_time(pid)
+        if start_time is None:
+            self.map_summary_var.set(f"{name} ({pid}) has exited")
+            return
+        memory_map = self.map_cache.get((pid, start_time))
+        if memory_map is not None:
+            self._show_memory_map(memory_map, name)
+            return
+        # smaps can be 100+ MB for a process with many mappings; stream it on a worker
+        job = SmapsLoader(pid, start_time)
+        self.map_job = job
+        self.map_summary_var.set(f"Reading memory maps of {name} ({pid})…")
+        job.start()
+        self.after(100, lambda: self.poll_memory_map(job, name))
+
+    def poll_memory_map(self, job, name):
+        if job is not self.map_job:
+            # Cancelled in favour of another process
+            return
+        if not job.finished:
+            self.map_summary_var.set(f"Reading memory maps of {name} ({job.pid})… {job.mappings:,} mappings")
+            self.after(100, lambda: self.poll_memory_map(job, name))
+            return
+        self.map_job = None
+        if job.error:
+            self.map_summary_var.set(f"Could not read memory maps of {name} ({job.pid}): {job.error}")
+            return
+        self.map_cache.put(job.key, job.result)
+        self._show_memory_map(job.result, name)
+
+    def _clear_map_tree(self):
+        self.map_tree.delete(*self.map_tree.get_children())
+        self.map_groups.clear()
+
+    def _show_memory_map(self, memory_map, name):
+        from smaps import KINDS, KIND_TITLES
+        self._clear_map_tree()
+        totals = {kind: memory_map.totals(kind) for kind in KINDS}
+        self.map_summary_var.set(f"{name} ({memory_map.pid}): {memory_map.mappings:,} mappings, "
+                                 f"RSS {sum(t[1] for t in totals.values()):,} KB, "
+                                 f"PSS {sum(t[2] for t in totals.values()):,} KB "
+                                 f"(read in {memory_map.elapsed * 1000:.0f} ms)")
+        for kind in KINDS:
+            count, rss_kb, pss_kb = totals[kind]
+            if not count:
+                continue
+            node = self.map_tree.insert('', tk.END, text=KIND_TITLES[kind],
+                                        values=(f"{count:,}", f"{rss_kb:,}", f"{pss_kb:,}"))
+            # Placeholder so the group can be expanded; the real rows come on open
+            self.map_tree.insert(node, tk.END, text="…")
+            self.map_groups[node] = (memory_map, kind)
+
+    def on_map_group_opened(self):
+        node = self.map_tree.focus()
+        if node not in self.map_groups:
+            return
+        memory_map, kind = self.map_groups.pop(node)
+        self.map_tree.delete(*self.map_tree.get_children(node))
+        rows = memory_map.groups[kind]
+        for text, count, rss_kb, pss_kb in rows[:MAP_ROWS]:
+            self.map_tree.insert(node, tk.END, text=text, values=(f"{count:,}", f"{rss_kb:,}", f"{pss_kb:,}"))
+        if len(rows) > MAP_ROWS:
+            self.map_tree.insert(node, tk.END, text=f"… {len(rows) - MAP_ROWS:,} more")
+
+    def on_fields_changed(self):
+        self.source.fields = tuple(field for field, var in self.field_vars.items() if var.get())
+        self._show_field_columns()
+        self.renderer.mark_dirty('processes')
+
+    def _show_field_columns(self):
+        columns = {"swap": 'Swap', "major_faults": 'Faults', "oom_score": 'OOM'}
+        self.process_tree['displaycolumns'] = ('PID', 'Name', 'Memory') + tuple(
+            columns[field] for field in self.source.fields)
+
+    def create_diff_tab(self):
+        # Live: mark a baseline, then compare against the current processes.
+        # Replay: compare two points of the capture being replayed.
+        controls = ttk.Frame(self.diff_tab)
+        controls.pack(side=tk.TOP, fill='x', padx=15, pady=(15, 0))
+        ttk.Button(controls, text="Mark Baseline", command=self.mark_diff_baseline).pack(side=tk.LEFT)
+        self.diff_compare_button = ttk.Button(controls, text="Compare with Now", command=self.compare_with_baseline,
+                                              state=tk.DISABLED)
+        self.diff_compare_button.pack(side=tk.LEFT, padx=10)
+        self.diff_baseline = None
+
+        self.diff_capture = getattr(self.source, "path", None)
+        if self.diff_capture:
+            ttk.Label(controls, text="From:").pack(side=tk.LEFT, padx=(10, 0))
+            self.diff_from_var = tk.StringVar(value="+0")
+            ttk.Entry(controls, textvariable=self.diff_from_var, width=10).pack(side=tk.LEFT, padx=5)
+            ttk.Label(controls, text="To:").pack(side=tk.LEFT)
+            self.diff_to_var = tk.StringVar(value="+300")
+            ttk.Entry(controls, textvariable=self.diff_to_var, width=10).pack(side=tk.LEFT, padx=5)
+            ttk.Button(controls, text="Compare Capture", command=self.compare_capture_times).pack(side=tk.LEFT)
+
+        self.diff_summary_var = tk.StringVar(value="Mark a baseline to compare against later")
+        ttk.Label(self.diff_tab, textvariable=self.diff_summary_var, style="TLabel").pack(anchor='w', padx=15, pady=5)
+
+        self.diff_tree = ttk.Treeview(self.diff_tab, columns=('PID', 'Name', 'Before', 'After', 'Change'),
+                                      show='tree headings')
+        self.diff_tree.column('#0', width=140, anchor='w')
+        for column, text, width, anchor in (('PID', 'PID', 80, 'center'), ('Name', 'Name', 220, 'w'),
+                                            ('Before', 'Before (KB)', 120, 'e'), ('After', 'After (KB)', 120, 'e'),
+                                            ('Change', 'Change (KB)', 120, 'e')):
+            self.diff_tree.heading(column, text=text)
+            self.diff_tree.column(column, width=width, anchor=anchor)
+        scrollbar = ttk.Scrollbar(self.diff_tab, orient=tk.VERTICAL, command=self.diff_tree.yview)
+        self.diff_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.diff_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=15, pady=15)
+
+    def mark_diff_baseline(self):
+        self.diff_baseline = (self.source.timestamp or time.time(),
+                              self.source.get_process_memory_info(fields=("start_time",)))
+        self.diff_compare_button.config(state=tk.NORMAL)
+        self.diff_summary_var.set(f"Baseline marked at {time.strftime('%H:%M:%S', time.localtime(self.diff_baseline[0]))}"
+                                  f" ({len(self.diff_baseline[1]):,} processes)")
+
+    def compare_with_baseline(self):
+        from snapdiff import diff_snapshots
+        before_time, before = self.diff_baseline
+        after = self.source.get_process_memory_info(fields=("start_time",))
+        self._show_diff(diff_snapshots(before, after), before_time, self.source.timestamp or time.time())
+
+    def compare_capture_times(self):
+        from snapdiff import capture_snapshots
+        times = [self.diff_from_var.get().strip(), self.diff_to_var.get().strip()]
+        self.diff_summary_var.set("Reading capture…")
+        result = {}
+
+        # The capture is read on a worker thread; the diff itself is only milliseconds
+        def work():
+            try:
+                result['snapshots'] = capture_snapshots(self.diff_capture, times)
+            except (OSError, ValueError) as e:
+                result['error'] = e
+
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        self.after(100, lambda: self._poll_capture_diff(worker, result))
+
+    def _poll_capture_diff(self, worker, result):
+        from snapdiff import diff_snapshots
+        if worker.is_alive():
+            self.after(100, lambda: self._poll_capture_diff(worker, result))
+            return
+        if 'error' in result:
+            self.diff_summary_var.set("")
+            messagebox.showerror("Error", f"Failed to read capture:\n{result['error']}")
+            return
+        (before_time, before), (after_time, after) = result['snapshots']
+        self._show_diff(diff_snapshots(before, after), before_time, after_time)
+
+    def _show_diff(self, diff, before_time, after_time):
+        self.diff_summary_var.set(f"{time.strftime('%H:%M:%S', time.localtime(before_time))} → "
+                                  f"{time.strftime('%H:%M:%S', time.localtime(after_time))}:  "
+                                  f"{diff.total_delta_kb:+,} KB total, {diff.new_count} new, "
+                                  f"{diff.exited_count} exited")
+        self.diff_tree.delete(*self.diff_tree.get_children())
+        for title, rows in (("Top growers", diff.grown), ("New", diff.new), ("Exited", diff.exited)):
+            parent = self.diff_tree.insert('', tk.END, text=title, open=True)
+            for pid, name, before_kb, after_kb, delta_kb in rows:
+                self.diff_tree.insert(parent, tk.END, values=(
+                    pid, name, _optional(before_kb), _optional(after_kb), f"{delta_kb:+,}"))
+
+    def create_fleet_tab(self):
+        self.fleet_tree = ttk.Treeview(self.fleet_tab, columns=('Host', 'Usage', 'Used', 'Top'), show='headings')
+        self.fleet_tree.heading('Host', text='Host')
+        self.fleet_tree.heading('Usage', text='Usage')
+        self.fleet_tree.heading('Used', text='Used (KB)')
+        self.fleet_tree.heading('Top', text='Top Process')
+
+        self.fleet_tree.column('Host', width=220, anchor='w')
+        self.fleet_tree.column('Usage', width=160, anchor='e')
+        self.fleet_tree.column('Used', width=140, anchor='e')
+        self.fleet_tree.column('Top', width=260, anchor='w')
+
+        scrollbar = ttk.Scrollbar(self.fleet_tab, orient=tk.VERTICAL, command=self.fleet_tree.yview)
+        self.fleet_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.fleet_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=15, pady=15)
+
+        # One row per host, updated in place
+        for index, host in enumerate(self.fleet.hosts):
+            self.fleet_tree.insert('', tk.END, iid=str(index), values=(host.name, "connecting", "", ""))
+        self.after(250, self.poll_fleet)
+
+    def poll_fleet(self):
+        # Non-blocking: drain whatever the agents have sent since the last poll
+        self.fleet.poll(0)
+        if not self.is_paused:
+            self.renderer.mark_dirty('fleet')
+        self.after(250, self.poll_fleet)
+
+    def render_fleet(self):
+        for index, host in enumerate(self.fleet.hosts):
+            if host.error:
+                usage = host.error
+            elif host.last_seen is None:
+                usage = "connecting"
+            else:
+                usage = f"{host.percent:.1f}%"
+            top = f"{host.top[0]['name']} ({host.top[0]['memory_kb']:,} KB)" if host.top else ""
+            self.fleet_tree.item(str(index), values=(host.name, usage, f"{host.used:,}", top))
+
+    def render_status(self):
+        text = self.monitor.status_text()
+        lost = self.source.kernel_samples_lost()
+        if lost is not None:
+            # Sequence gaps in the ring buffer: the module sampled faster than ticks drained it
+            text = f"ring {lost:,} lost  |  {text}"
+        if self.poll_policy is not None:
+            text = f"poll {self.poll_policy.interval_ms} ms  |  {text}"
+        if self.profile_session is not None:
+            session = self.profile_session
+            text = f"[{session.mode} {session.ticks_seen}/{session.ticks}]  {text}"
+        self.status_var.set(text)
+
+    def start_profile(self, mode):
+        from profiling import ProfileSession
+        if self.profile_session is not None:
+            return
+        self.profile_session = ProfileSession(self.monitor, mode, self.profile_ticks, self.profile_dir,
+                                              on_finish=self.on_profile_finished)
+        self.profile_session.start()
+
+    def on_profile_finished(self, session):
+        self.profile_session = None
+        # Called from the tick hook; show the dialog once the tick has finished
+        path = os.path.abspath(session.path)
+        self.after_idle(lambda: messagebox.showinfo("Profile Saved", f"{session.mode} results written to:\n{path}"))
+
+    def export_stats(self):
+        try:
+            filename = filedialog.asksaveasfilename(defaultextension=".json",
+                                                    filetypes=[("JSON files", "*.json"),
+                                                               ("All files", "*.*")])
+            if filename:
+                self.monitor.export(filename)
+                messagebox.showinfo("Saved", f"Stats saved to:\n{filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export stats:\n{e}")
+
+    def export_history(self):
+        from export import ExportJob, KERNEL_COLUMNS, PROCESS_COLUMNS, capture_chunks, kernel_history_chunks
+        if self.export_job is not None:
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                filetypes=[("CSV files", "*.csv"),
+                                                           ("JSON lines", "*.jsonl"),
+                                                           ("Columnar binary", "*.mtc")])
+        if not filename:
+            return
+        capture_path = getattr(self.source, "path", None)
+        try:
+            if capture_path and messagebox.askyesno("Export History",
+                                                    "Export per-process history from the replayed capture?\n"
+                                                    "(No exports kernel memory history)"):
+                job = ExportJob(None, filename, PROCESS_COLUMNS)
+                job.chunks = capture_chunks(capture_path, "processes", progress=job.set_fraction)
+            else:
+                job = ExportJob(kernel_history_chunks(self.history), filename, KERNEL_COLUMNS)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Failed to export history:\n{e}")
+            return
+        self.export_job = job
+        self.export_button.config(text="Cancel Export", command=job.cancel)
+        self.export_progress['value'] = 0
+        self.export_progress.grid(row=0, column=5, padx=10)
+        job.start()
+        self.after(100, self.poll_export)
+
+    def poll_export(self):
+        job = self.export_job
+        self.export_progress['value'] = job.fraction * 100
+        if not job.finished:
+            self.after(100, self.poll_export)
+            return
+        self.export_job = None
+        self.export_progress.grid_remove()
+        self.export_button.config(text="Export History", command=self.export_history)
+        if job.error:
+            messagebox.showerror("Error", f"Failed to export history:\n{job.error}")
+        elif not job.cancelled:
+            messagebox.showinfo("Saved", f"Exported {job.rows:,} rows to:\n{job.path}")
+
+    def _tab_visible(self, tab):
+        return self.notebook.select() == str(tab)
+
+    def render_kernel(self):
+        used, total, percent = self.kernel_sample
+        self.kernel_label_var.set(f"Used: {used:,} KB / Total: {total:,} KB ({percent:.2f}%)")
+        self.progress['value'] = percent
+        self.forecast_var.set(self._forecast_text(percent) if self.show_forecast_var.get() else "")
+
+    def _forecast_text(self, percent):
+        if not self.forecaster.ready:
+            return "Forecast: collecting samples…"
+        if percent < self.threshold:
+            target, what = self.threshold, f"{self.threshold}% threshold"
+        else:
+            target, what = 100, "100% (out of memory)"
+        seconds = self.forecaster.time_to(target)
+        if seconds is None:
+            return f"Forecast: not heading for {what} (trend {self.forecaster.trend * 60:+.2f}%/min)"
+        return f"Forecast: {what} in ~{format_duration(seconds)} (trend {self.forecaster.trend * 60:+.2f}%/min)"
+
+    def render_processes(self):
+        # The /proc scan itself only runs while the Process tab is visible
+        mode = self.group_mode_var.get()
+        fields = self.source.fields
+        if mode in ("Exe", "Cmdline regex") and "start_time" not in fields:
+            # Identity cache keys; free with --lifecycle, else shares the stat read with major faults
+            fields += ("start_time",)
+        with self.monitor.span('scan_procs'):
+            process_memory = self.source.get_process_memory_info(fields=fields)
+        with self.monitor.span('top_k'):
+            if mode == "None":
+                rows = [(proc.pid, proc.name, f"{proc.memory_kb:,}", _optional(proc.swap_kb),
+                         _optional(proc.major_faults), _optional(proc.oom_score))
+                        for proc in process_memory.top(20)]  # Show top 20 processes
+            else:
+                groups = group_processes(process_memory, mode, self.identity_cache, self.group_pattern)
+                rows = [(group['count'], group['key'], f"{group['memory_kb']:,}") for group in groups[:20]]
+        with self.monitor.span('render_table'):
+            self._fill_process_tree(rows)
+            self.lifecycle_var.set(self._lifecycle_text())
+
+    def _lifecycle_text(self):
+        if self.lifecycle_counts is None:
+            return ""
+        started, exited = self.lifecycle_counts
+        text = f"Last update ({self.source.lifecycle.method}): {started} started, {exited} exited"
+        if self.short_lived:
+            # Processes that came and went between ticks, which the table never shows
+            pid, name, peak_kb, lifetime = max(self.short_lived, key=lambda row: row[2])
+            text += (f"  ·  {len(self.short_lived)} recent short-lived, largest {name} ({pid}) "
+                     f"peaked at {peak_kb:,} KB in {lifetime:.2f}s")
+        return text
+
+    def _fill_process_tree(self, rows):
+        # Update existing rows in place instead of rebuilding the tree
+        items = self.process_tree.get_children()
+        for index, values in enumerate(rows):
+            if index < len(items):
+                self.process_tree.item(items[index], values=values)
+            else:
+                self.process_tree.insert('', tk.END, values=values)
+        if len(items) > len(rows):
+            self.process_tree.delete(*items[len(rows):])
+
+    def on_group_mode_changed(self):
+        mode = self.group_mode_var.get()
+        self.group_pattern = None
+        if mode == "Cmdline regex":
+            try:
+                self.group_pattern = re.compile(self.group_regex_var.get())
+            except re.error as e:
+                messagebox.showerror("Invalid Regex", f"Could not compile pattern:\n{e}")
+                self.group_mode_var.set("None")
+                mode = "None"
+        if mode == "None":
+            self.process_tree.heading('PID', text='PID')
+            self.process_tree.heading('Name', text='Name')
+        else:
+            self.process_tree.heading('PID', text='Processes')
+            self.process_tree.heading('Name', text=mode)
+        self.renderer.mark_dirty('processes')
+
+    def _chart_title(self):
+        return f"Kernel Memory Usage (Last {self.range_var.get()})"
+
+    def on_range_changed(self):
+        self.view = None
+        if self.canvas is not None:
+            self.ax.title.set_text(self._chart_title())
+        self.renderer.mark_dirty('chart')
+
+    def _current_view(self):
+        latest = self.history.latest or 0
+        if self.view is not None:
+            return self.view
+        span, _ = RANGES[self.range_var.get()]
+        return latest - span, latest
+
+    def on_chart_scroll(self, event):
+        if event.inaxes is not self.ax or self.history.latest is None:
+            return
+        latest = self.history.latest
+        t0, t1 = self._current_view()
+        center = event.xdata + latest
+        factor = 0.8 if event.button == 'up' else 1.25
+        self.view = (center - (center - t0) * factor, center + (t1 - center) * factor)
+        self.renderer.mark_dirty('chart')
+
+    def on_chart_press(self, event):
+        if event.inaxes is not self.ax or self.history.latest is None:
+            return
+        if event.dblclick:
+            self.view = None
+            self.renderer.mark_dirty('chart')
+        elif event.button == 1:
+            self.pan_start = (event.x, self._current_view())
+
+    def on_chart_drag(self, event):
+        if self.pan_start is None or event.x is None:
+            return
+        start_x, (t0, t1) = self.pan_start
+        bbox = self.ax.get_window_extent()
+        shift = (event.x - start_x) * (t1 - t0) / bbox.width
+        self.view = (t0 - shift, t1 - shift)
+        self.renderer.mark_dirty('chart')
+
+    def on_chart_release(self, event):
+        self.pan_start = None
+
+    def draw_history(self):
+        if self.view is not None:
+            self._draw_viewport()
+            return
+        # Rollup buckets as (start, min, max, avg); x is seconds relative to the newest sample
+        span, _ = RANGES[self.range_var.get()]
+        points = self.history.query(self.range_var.get())
+        latest = self.history.latest or 0
+        xs = [p[0] - latest for p in points]
+        self.line.set_data(xs, [p[3] for p in points])
+        if self.band is not None:
+            self.band.remove()
+            self.band = None
+        if span > 30 and points:
+            self.band = self.ax.fill_between(xs, [p[1] for p in points], [p[2] for p in points],
+                                             color=self._get_coral_color(), alpha=0.25, linewidth=0)
+        # Leave a quarter of the range on the right for the projection
+        self.ax.set_xlim(-span, self._draw_forecast(span / 4))
+
+    def _draw_forecast(self, horizon):
+        # Dashed projection from the newest sample out to `horizon` seconds; returns
+        # how far right the x axis should reach
+        show = self.show_forecast_var.get() and self.forecaster.ready
+        self.threshold_line.set_visible(show)
+        if not show:
+            self.forecast_line.set_data([], [])
+            return 0
+        self.forecast_line.set_data([0, horizon], [self.forecaster.forecast(0), self.forecaster.forecast(horizon)])
+        return horizon
+
+    def _draw_viewport(self):
+        # Zoomed view: at most two points per pixel column, whatever the sample count
+        from downsample import viewport_points
+        latest = self.history.latest or 0
+        t0, t1 = self.view
+        n_pixels = int(self.ax.get_window_extent().width)
+        xs, ys = viewport_points(self.history, t0, t1, n_pixels)
+        self.line.set_data(xs - latest, ys)
+        if self.band is not None:
+            self.band.remove()
+            self.band = None
+        self._draw_forecast(max(t1 - latest, 0))
+        self.ax.set_xlim(t0 - latest, t1 - latest)
+
     def _get_bg_color(self):
         return "#121212" if self.dark_mode else "#f0f0f0"
 
@@ -188,7 +992,10 @@ class MemoryTrackerApp(tk.Tk):
 
         self.style.configure("TLabel", background=bg, foreground=fg, font=self.base_font)
         self.style.configure("Title.TLabel", background=bg, foreground=teal, font=self.title_font)
+        self.style.configure("Status.TLabel", background=bg, foreground=fg, font=("Consolas", 10))
         self.style.configure("TProgressbar", troughcolor=axis_bg, bordercolor=axis_bg, background=coral, thickness=28)
+        self.style.configure("Node.Horizontal.TProgressbar", troughcolor=axis_bg, bordercolor=axis_bg,
+                             background=teal, thickness=14)
         self.style.configure("TButton", font=self.button_font, padding=10)
         self.style.map("TButton",
                        background=[('active', coral), ('!active', teal)],
@@ -205,21 +1012,10 @@ class MemoryTrackerApp(tk.Tk):
         self.style.configure("TScrollbar", background=bg, troughcolor=axis_bg)
 
     def _configure_plot_colors(self):
-        coral = self._get_coral_color()
-        teal = self._get_teal_color()
-        bg = self._get_bg_color()
-        axis_bg = self._get_axis_bg()
-        fg = self._get_fg_color()
-
-        self.fig.patch.set_facecolor(bg)
-        self.ax.set_facecolor(axis_bg)
-        self.ax.tick_params(axis='x', colors=fg)
-        self.ax.tick_params(axis='y', colors=fg)
-        self.ax.spines['bottom'].set_color(fg)
-        self.ax.spines['left'].set_color(fg)
-        self.ax.grid(color='#444444', linestyle='--', linewidth=0.5)
-        self.ax.set_title("Kernel Memory Usage (Last 30 seconds)", color=teal, fontsize=17, pad=15)
-        self.line.set_color(coral)
+        # Line colors are the same in both themes; only backgrounds and text change
+        self.fig.patch.set_facecolor(self._get_bg_color())
+        for ax in self.charts.axes.values():
+            self._style_axes(ax, ax.get_title())
         self.canvas.draw_idle()
 
     def toggle_pause(self):
@@ -229,7 +1025,8 @@ class MemoryTrackerApp(tk.Tk):
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
         self.configure_styles()
-        self._configure_plot_colors()
+        if self.canvas is not None:
+            self._configure_plot_colors()
 
         # Configure Treeview style for background and foreground
         style = ttk.Style(self)
@@ -249,24 +1046,49 @@ class MemoryTrackerApp(tk.Tk):
                                                        filetypes=[("PNG files", "*.png"),
                                                                   ("All files", "*.*")])
             if filename:
+                self.build_chart()
                 self.fig.savefig(filename)
                 messagebox.showinfo("Saved", f"Graph saved to:\n{filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save graph:\n{e}")
 
     def update_ui(self):
+        tick_start = time.perf_counter()
+        if self.next_tick_due is not None:
+            # How late the Tk timer fired; large values mean the event loop is saturated
+            self.monitor.record('lag', max(0.0, time.monotonic() - self.next_tick_due))
         if not self.is_paused:
-            used, total, percent = read_kernel_memory()
-            self.kernel_label_var.set(f"Used: {used:,} KB / Total: {total:,} KB ({percent:.2f}%)")
-            self.progress['value'] = percent
-
-            self.memory_log.append(percent)
-            if len(self.memory_log) > 30:
-                self.memory_log.pop(0)
-
-            self.line.set_data(range(len(self.memory_log)), self.memory_log)
-            self.ax.set_xlim(0, 30)
-            self.canvas.draw_idle()
+            if not self.source.advance():
+                # Replay reached the end of the capture
+                self.pause_button.config(text="Replay Finished", state=tk.DISABLED)
+                return
+            with self.monitor.span('read_kernel'):
+                samples = self.source.read_kernel_samples()
+                if samples is None:
+                    used, total, percent = self.source.read_kernel_memory()
+                    samples = [(self.source.timestamp, used, total, percent)]
+                # With the module's ring buffer this is every sample since the last tick
+                for timestamp, used, total, percent in samples:
+                    self.history.add(timestamp, percent)
+                    self.forecaster.update(timestamp, percent)
+                if samples:
+                    self.kernel_sample = samples[-1][1:]
+                used, total, percent = self.kernel_sample
+                if self.show_psi_var.get():
+                    pressure = self.source.read_memory_pressure()
+                    if pressure is not None:
+                        self.psi_log.append((self.source.timestamp,) + pressure)
+                if self.show_numa_var.get():
+                    self.numa_zones = self.source.read_numa_zones()
+                if self.show_tracked_var.get() and self.tracked_pid is not None:
+                    rss = self.source.read_process_rss(self.tracked_pid)
+                    if rss is not None:
+                        self.tracked_log.append((self.source.timestamp, rss))
+            events = self.source.read_lifecycle()
+            if events is not None:
+                self.lifecycle_counts = (len(events.started), len(events.exited))
+                self.short_lived.extend(events.short_lived)
+            self.renderer.mark_dirty('kernel', 'chart', 'numa', 'processes')
 
             if percent >= self.threshold and not self.alert_shown:
                 self.alert_shown = True
@@ -275,16 +1097,62 @@ class MemoryTrackerApp(tk.Tk):
             elif percent < self.threshold:
                 self.alert_shown = False
 
-            process_memory = get_process_memory_info()
-            # Clear previous items in the treeview
-            for item in self.process_tree.get_children():
-                self.process_tree.delete(item)
-            # Insert new process memory info
-            for proc in process_memory[:20]:  # Show top 20 processes
-                self.process_tree.insert('', tk.END, values=(proc['pid'], proc['name'], f"{proc['memory_kb']:,}"))
-
-        self.after(1000, self.update_ui)
+        self.monitor.sample_process()
+        self.monitor.record('tick', time.perf_counter() - tick_start)
+        self.renderer.mark_dirty('status')
+        delay_ms = self.source.next_delay_ms()
+        if self.poll_policy is not None and not self.is_paused:
+            delay_ms = self.poll_policy.next_interval(self.kernel_sample[2], self.threshold)
+        self.next_tick_due = time.monotonic() + delay_ms / 1000
+        self.after(delay_ms, self.update_ui)
 
 if __name__ == "__main__":
-    app = MemoryTrackerApp()
+    parser = argparse.ArgumentParser(description="System memory tracker")
+    parser.add_argument("--replay", metavar="CAPTURE", help="play back a file recorded with capture.py")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier (1-100)")
+    parser.add_argument("--agents", nargs="+", metavar="HOST[:PORT]", help="also show remote agent.py hosts")
+    parser.add_argument("--fields", nargs="+", choices=("swap", "major_faults", "oom_score"), default=(),
+                        help="extra per-process columns to collect from the start (also toggled in the Process tab)")
+    parser.add_argument("--kernel-ring", action="store_true",
+                        help="drain high-rate samples from /proc/mem_tracker_samples instead of one read per tick")
+    parser.add_argument("--proc-root", help="read this procfs tree instead of /proc (see fakeproc.py)")
+    parser.add_argument("--lifecycle", action="store_true",
+                        help="track process starts and exits (netlink proc connector as root, else /proc diffs) "
+                             "and report short-lived processes")
+    parser.add_argument("--fixed-interval", action="store_true",
+                        help="poll every second instead of adapting to how fast memory changes")
+    parser.add_argument("--min-interval", type=int, default=250, help="fastest adaptive poll, in ms")
+    parser.add_argument("--max-interval", type=int, default=5000, help="slowest adaptive poll, in ms")
+    parser.add_argument("--profile", choices=("cprofile", "tracemalloc"),
+                        help="profile every stage for the first --profile-ticks ticks (also F9/F10 at runtime)")
+    parser.add_argument("--profile-ticks", type=int, default=30)
+    parser.add_argument("--profile-dir", default=".", help="where profiling results are written")
+    args = parser.parse_args()
+
+    if args.proc_root:
+        from collector import set_proc_root
+        set_proc_root(args.proc_root)
+
+    source = None
+    if args.replay:
+        from capture import ReplaySource
+        if not 1 <= args.speed <= 100:
+            parser.error("--speed must be between 1 and 100")
+        source = ReplaySource(args.replay, args.speed)
+    source = source or LiveSource(kernel_ring=args.kernel_ring, lifecycle=args.lifecycle)
+    source.fields = tuple(args.fields)
+
+    poll_policy = None
+    if not args.replay and not args.fixed_interval:
+        from adaptive import AdaptiveInterval
+        if not 0 < args.min_interval <= 1000 <= args.max_interval:
+            parser.error("--min-interval must be 1-1000 ms and --max-interval at least 1000 ms")
+        poll_policy = AdaptiveInterval(args.min_interval, args.max_interval)
+
+    fleet = None
+    if args.agents:
+        from fleet import FleetCollector, parse_address
+        fleet = FleetCollector([parse_address(a) for a in args.agents])
+
+    app = MemoryTrackerApp(source, fleet, args.profile, args.profile_ticks, args.profile_dir, poll_policy)
     app.mainloop()
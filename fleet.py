@@ -0,0 +1,215 @@
+import argparse
+import errno
+import selectors
+import socket
+import threading
+import time
+
+from agent import DEFAULT_PORT, HELLO_MAGIC
+from sample_codec import HostSampleDecoder, read_varint
+
+# Collector side of agent.py: one selector multiplexes non-blocking connections to
+# every agent, so the GUI can poll it from its Tk timer. Only name lookups, which
+# block for as long as the resolver takes, run on short-lived threads of their own.
+# Hosts that drop or refuse the connection, or fail to resolve, are retried every
+# RECONNECT_SECONDS.
+RECONNECT_SECONDS = 5.0
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    if not host:
+        return text, DEFAULT_PORT
+    return host, int(port)
+
+class _Resolver(threading.Thread):
+    # getaddrinfo for one host; poll() picks up `result` or `error` once `finished`
+    def __init__(self, address):
+        super().__init__(daemon=True)
+        self.address = address
+        self.result = None
+        self.error = None
+        self.finished = False
+
+    def run(self):
+        try:
+            family, _, _, _, sockaddr = socket.getaddrinfo(*self.address, type=socket.SOCK_STREAM)[0]
+            self.result = (family, sockaddr)
+        except OSError as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+class HostState:
+    def __init__(self, address):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        # (family, sockaddr) once a _Resolver has looked the name up
+        self.resolved = None
+        self.resolver = None
+        self.sock = None
+        self.connected = False
+        self.handshake = bytearray()
+        self.decoder = None
+        self.retry_at = 0.0
+        self.error = None
+        self.last_seen = None
+        self.timestamp = None
+        self.used = 0
+        self.total = 0
+        self.top = []
+
+    @property
+    def percent(self):
+        return (self.used / self.total) * 100 if self.total > 0 else 0
+
+class FleetCollector:
+    def __init__(self, addresses):
+        self.selector = selectors.DefaultSelector()
+        self.hosts = [HostState(address) for address in addresses]
+        # Start every lookup now; the first polls connect as they complete
+        for host in self.hosts:
+            self._resolve(host)
+
+    def _resolve(self, host):
+        host.resolver = _Resolver(host.address)
+        host.resolver.start()
+
+    def _connect(self, host):
+        # Never blocks: a name is looked up on a _Resolver thread and only the
+        # stored address is connected to here
+        if host.resolved is None:
+            resolver = host.resolver
+            if resolver is None:
+                self._resolve(host)
+                return
+            if not resolver.finished:
+                return
+            host.resolver = None
+            if resolver.error is not None:
+                self._fail(host, f"cannot resolve: {resolver.error}")
+                return
+            host.resolved = resolver.result
+        family, sockaddr = host.resolved
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        err = sock.connect_ex(sockaddr)
+        if err not in (0, errno.EINPROGRESS):
+            sock.close()
+            self._fail(host, os_error_text(err))
+            return
+        host.sock = sock
+        host.handshake = bytearray()
+        host.decoder = None
+        self.selector.register(sock, selectors.EVENT_WRITE, host)
+
+    def _fail(self, host, message):
+        if host.sock is not None:
+            self.selector.unregister(host.sock)
+            host.sock.close()
+            host.sock = None
+        host.connected = False
+        host.error = message
+        host.retry_at = time.monotonic() + RECONNECT_SECONDS
+
+    def _on_connected(self, host):
+        err = host.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self._fail(host, os_error_text(err))
+            return
+        host.connected = True
+        host.error = None
+        self.selector.modify(host.sock, selectors.EVENT_READ, host)
+
+    def _on_readable(self, host):
+        try:
+            data = host.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(host, str(e))
+            return
+        if not data:
+            self._fail(host, "connection closed")
+            return
+
+        if host.decoder is None:
+            # Hello: magic, then the varint-prefixed hostname
+            host.handshake += data
+            if len(host.handshake) < len(HELLO_MAGIC):
+                return
+            if host.handshake[:len(HELLO_MAGIC)] != HELLO_MAGIC:
+                self._fail(host, "not a mem_tracker agent")
+                return
+            try:
+                length, pos = read_varint(host.handshake, len(HELLO_MAGIC))
+            except IndexError:
+                return
+            if pos + length > len(host.handshake):
+                return
+            host.name = host.handshake[pos:pos + length].decode("utf-8", errors="replace")
+            data = bytes(host.handshake[pos + length:])
+            host.decoder = HostSampleDecoder()
+
+        samples = host.decoder.feed(data)
+        if samples:
+            host.timestamp, host.used, host.total, process_info = samples[-1]
+            process_info.sort(key=lambda x: x['memory_kb'], reverse=True)
+            host.top = process_info
+            host.last_seen = time.monotonic()
+
+    def poll(self, timeout=0):
+        now = time.monotonic()
+        for host in self.hosts:
+            if host.sock is None and now >= host.retry_at:
+                self._connect(host)
+        for key, events in self.selector.select(timeout):
+            host = key.data
+            if not host.connected:
+                self._on_connected(host)
+            elif events & selectors.EVENT_READ:
+                self._on_readable(host)
+
+    def close(self):
+        for host in self.hosts:
+            if host.sock is not None:
+                self.selector.unregister(host.sock)
+                host.sock.close()
+                host.sock = None
+        self.selector.close()
+
+def os_error_text(err):
+    return errno.errorcode.get(err, str(err))
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect samples from several agents")
+    parser.add_argument("agents", nargs="+", metavar="HOST[:PORT]")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between overview prints")
+    args = parser.parse_args()
+
+    collector = FleetCollector([parse_address(a) for a in args.agents])
+    next_print = time.monotonic() + args.interval
+    last_wall = time.monotonic()
+    last_cpu = time.process_time()
+    try:
+        while True:
+            collector.poll(max(0.0, next_print - time.monotonic()))
+            if time.monotonic() < next_print:
+                continue
+            # Collector CPU over the interval just ended, as a share of one core
+            wall, cpu = time.monotonic(), time.process_time()
+            busy = (cpu - last_cpu) / (wall - last_wall) * 100 if wall > last_wall else 0.0
+            last_wall, last_cpu = wall, cpu
+            live = sum(1 for h in collector.hosts if h.last_seen and time.monotonic() - h.last_seen < 3)
+            print(f"--- {live}/{len(collector.hosts)} hosts live, collector CPU {busy:.1f}%")
+            for host in sorted(collector.hosts, key=lambda h: h.percent, reverse=True)[:20]:
+                top = host.top[0]['name'] if host.top else "-"
+                status = host.error or f"{host.percent:5.1f}%"
+                print(f"{host.name:30} {status:>22} {host.used:>12,} KB  top: {top}")
+            next_print += args.interval
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Online Holt (double exponential) smoothing of kernel memory usage.
+#
+# Each sample updates a level and a per-second trend in O(1), so the forecaster can
+# be fed every tick. The trend is scaled by the time between samples, which keeps it
+# meaningful when the adaptive poller changes the interval or a replay skips frames.
+# Projections are straight lines: level + trend * seconds ahead.
+class HoltForecaster:
+    def __init__(self, alpha=0.3, beta=0.05, warmup=10):
+        if not (0 < alpha <= 1 and 0 < beta <= 1):
+            raise ValueError("Expected 0 < alpha, beta <= 1")
+        self.alpha = alpha
+        self.beta = beta
+        # Samples needed before forecasts are reported; the first trend is a guess
+        self.warmup = warmup
+        self.level = None
+        self.trend = 0.0
+        self.last_time = None
+        self.samples = 0
+
+    def update(self, timestamp, value):
+        if self.level is None:
+            self.level = value
+            self.last_time = timestamp
+            self.samples = 1
+            return
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            # Same or earlier timestamp: only refresh the level
+            self.level = self.alpha * value + (1 - self.alpha) * self.level
+            return
+        previous = self.level
+        self.level = self.alpha * value + (1 - self.alpha) * (previous + self.trend * dt)
+        self.trend = self.beta * (self.level - previous) / dt + (1 - self.beta) * self.trend
+        self.last_time = timestamp
+        self.samples += 1
+
+    @property
+    def ready(self):
+        return self.samples >= self.warmup
+
+    def forecast(self, seconds):
+        return self.level + self.trend * seconds
+
+    def time_to(self, target):
+        # Seconds until the projection reaches target; 0 if already there, None if never
+        if not self.ready:
+            return None
+        if self.level >= target:
+            return 0.0
+        if self.trend <= 0:
+            return None
+        return (target - self.level) / self.trend
+
+def format_duration(seconds):
+    if seconds is None:
+        return "never"
+    if seconds < 90:
+        return f"{seconds:.0f} s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 48 * 3600:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} d"
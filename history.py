@@ -0,0 +1,116 @@
+from array import array
+from collections import deque
+
+# Multi-resolution history for the kernel memory chart.
+#
+# Every sample is folded into each tier's open bucket as it arrives, and a bucket is
+# closed into the tier's ring buffer once time moves past its end. Each tier keeps
+# about one screen-width of buckets, so drawing any range reads at most that many
+# points, however long the tracker has been running.
+TIERS = (
+    # (bucket seconds, buckets kept)
+    (1, 300),      # 5 min
+    (10, 360),     # 1 h
+    (60, 1440),    # 24 h
+    (600, 1008),   # 7 d
+)
+
+RANGES = {
+    # label: (span seconds, tier index)
+    "30 s": (30, 0),
+    "5 min": (300, 0),
+    "1 h": (3600, 1),
+    "24 h": (86400, 2),
+    "7 d": (604800, 3),
+}
+
+class RollupTier:
+    def __init__(self, bucket_seconds, capacity):
+        self.bucket_seconds = bucket_seconds
+        # Closed buckets as (start, min, max, avg)
+        self.buckets = deque(maxlen=capacity)
+        self.start = None
+        self.min = self.max = self.sum = 0.0
+        self.count = 0
+
+    def add(self, timestamp, value):
+        start = timestamp - timestamp % self.bucket_seconds
+        if self.start is not None and start != self.start:
+            self.close()
+        if self.count == 0:
+            self.start = start
+            self.min = self.max = value
+            self.sum = 0.0
+        else:
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+        self.sum += value
+        self.count += 1
+
+    def close(self):
+        if self.count:
+            self.buckets.append((self.start, self.min, self.max, self.sum / self.count))
+        self.start = None
+        self.count = 0
+
+    def points(self, since):
+        # Closed buckets plus the open one, oldest first
+        points = [b for b in self.buckets if b[0] >= since]
+        if self.count:
+            points.append((self.start, self.min, self.max, self.sum / self.count))
+        return points
+
+# Raw samples kept for zooming in below the finest tier. This is a sample count, not
+# a duration: a week at the default 1 Hz, but with --kernel-ring feeding the module's
+# timer samples only about 17 h at 10 Hz and 1.7 h at 100 Hz (~10 MB either way).
+# Older data is still drawn from the rollup tiers, which are time-based; raw detail
+# (sub-10 s per pixel zoom) is what runs out first.
+RAW_CAPACITY = 7 * 86400
+
+class RawSeries:
+    # Parallel array('d') columns so the chart can wrap them with NumPy without copying.
+    # Old samples are trimmed in blocks once the buffer reaches twice its capacity;
+    # `dropped` counts trimmed samples so readers can keep stable sample numbers.
+    #
+    # Readers on other threads (the history export) use `generation` as a seqlock: it
+    # is odd while a trim is in progress, so a slice taken with the same even value
+    # before and after never sees times and values trimmed by different amounts.
+    def __init__(self, capacity=RAW_CAPACITY):
+        self.capacity = capacity
+        self.times = array('d')
+        self.values = array('d')
+        self.dropped = 0
+        self.generation = 0
+
+    def add(self, timestamp, value):
+        self.times.append(timestamp)
+        self.values.append(value)
+        if len(self.times) >= 2 * self.capacity:
+            trim = len(self.times) - self.capacity
+            self.generation += 1
+            del self.times[:trim]
+            del self.values[:trim]
+            self.dropped += trim
+            self.generation += 1
+
+    def __len__(self):
+        return len(self.times)
+
+class RollupHistory:
+    def __init__(self, tiers=TIERS, raw_capacity=RAW_CAPACITY):
+        self.tiers = [RollupTier(seconds, capacity) for seconds, capacity in tiers]
+        self.raw = RawSeries(raw_capacity)
+        self.latest = None
+
+    def add(self, timestamp, value):
+        for tier in self.tiers:
+            tier.add(timestamp, value)
+        self.raw.add(timestamp, value)
+        self.latest = timestamp
+
+    def query(self, range_label):
+        # Returns (start, min, max, avg) points covering the requested range
+        span, tier_index = RANGES[range_label]
+        if self.latest is None:
+            return []
+        return self.tiers[tier_index].points(self.latest - span)
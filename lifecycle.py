@@ -0,0 +1,290 @@
+import argparse
+import errno
+import os
+import select
+import socket
+import struct
+import threading
+import time
+
+import collector
+from procread import ProcReader, field_int, field_text, parse_stat
+
+# Process lifecycle tracking: the set of live PIDs (with their start times), kept up
+# to date as processes come and go instead of being rebuilt from a /proc listing on
+# every tick.
+#
+# NetlinkLifecycle subscribes to the kernel's proc connector, which multicasts a
+# message on every fork, exec and exit (root / CAP_NET_ADMIN only). A thread applies
+# the events as they arrive, so the work done per new process (reading its start
+# time) follows the actual churn. The same thread also catches what a per-tick scan
+# never sees: processes that start and exit between two ticks. Every YOUNG_POLL
+# seconds it reads the peak RSS (VmHWM) of processes younger than YOUNG_AGE, and when
+# one of them exits it is reported as short-lived, with its name, peak and lifetime.
+#
+# ProcDirLifecycle is the fallback (no privileges, or a fake procfs from fakeproc.py):
+# the same interface, fed by diffing the /proc listing. The listing is only taken when
+# live() is asked for the PID set, at most once per tick, so it replaces the process
+# scan's own listing instead of adding one, and nothing is listed on ticks where no
+# scan runs (Process tab hidden). It cannot see processes that live less than a tick.
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+NLMSG_DONE = 3
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+
+# Kernel structs, native byte order: nlmsghdr, cn_msg, the proc_event header
+# (what, cpu, timestamp_ns) and the fork/exec/exit payloads' leading PID fields
+NLMSG = struct.Struct("=IHHII")
+CN_MSG = struct.Struct("=IIIIHH")
+PROC_EVENT = struct.Struct("=IIQ")
+FORK_EVENT = struct.Struct("=IIII")   # parent pid, parent tgid, child pid, child tgid
+PID_EVENT = struct.Struct("=II")      # pid, tgid (exec and exit)
+EVENT_OFFSET = NLMSG.size + CN_MSG.size
+
+YOUNG_POLL = 0.05
+YOUNG_AGE = 2.0
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+class LifecycleEvents:
+    def __init__(self, started, exited, short_lived):
+        # PIDs that started and exited since the last drain(); a process can be in
+        # both. short_lived rows are (pid, name, peak_kb, lifetime_seconds).
+        self.started = started
+        self.exited = exited
+        self.short_lived = short_lived
+
+class ProcDirLifecycle:
+    method = "/proc listing"
+
+    def __init__(self):
+        self.reader = ProcReader()
+        # Live PID -> start time (clock ticks since boot)
+        self.start_times = {}
+        self.started = []
+        self.exited = []
+        self.short_lived = []
+        self.rescan()
+        # What is already running at startup has not "started"
+        self.started = []
+        self.stale = False
+
+    def poll(self):
+        # Called once per tick by the source; the listing waits until live() needs it
+        self.stale = True
+
+    def rescan(self):
+        listed = {int(entry) for entry in os.listdir(collector.PROC_ROOT) if entry.isdigit()}
+        start_times = self.start_times
+        for pid in listed.difference(start_times):
+            start_time = self._read_start_time(pid)
+            if start_time is not None:
+                start_times[pid] = start_time
+                self.started.append(pid)
+        for pid in set(start_times).difference(listed):
+            del start_times[pid]
+            self.exited.append(pid)
+
+    def live(self):
+        # Copy of the live PID -> start time map
+        if self.stale:
+            self.stale = False
+            self.rescan()
+        return dict(self.start_times)
+
+    def drain(self):
+        # Changes found by the listings taken since the last drain
+        events = LifecycleEvents(self.started, self.exited, self.short_lived)
+        self.started = []
+        self.exited = []
+        self.short_lived = []
+        return events
+
+    def close(self):
+        pass
+
+    def _read_start_time(self, pid):
+        try:
+            return parse_stat(*self.reader.read(f"{collector.PROC_ROOT}/{pid}/stat"))[1]
+        except (OSError, ValueError, IndexError):
+            return None
+
+class NetlinkLifecycle(ProcDirLifecycle):
+    method = "netlink"
+
+    def __init__(self):
+        # Raises OSError (EPERM) without CAP_NET_ADMIN
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+            self.sock.bind((0, CN_IDX_PROC))
+            self._send_op(PROC_CN_MCAST_LISTEN)
+        except OSError:
+            self.sock.close()
+            raise
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.running = True
+        # Young PID -> [name, first seen (monotonic), peak RSS kB]
+        self.young = {}
+        # Times the socket overflowed and the PID set was rebuilt from /proc
+        self.resyncs = 0
+        # Subscribed first, listed second: nothing falls between the two
+        ProcDirLifecycle.__init__(self)
+
+    def poll(self):
+        # Events are applied by the thread as they arrive
+        pass
+
+    def start(self):
+        self.thread.start()
+
+    def live(self):
+        with self.lock:
+            return dict(self.start_times)
+
+    def drain(self):
+        with self.lock:
+            return ProcDirLifecycle.drain(self)
+
+    def close(self):
+        self.running = False
+        if self.thread.is_alive():
+            self.thread.join()
+        try:
+            self._send_op(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def run(self):
+        while self.running:
+            ready = select.select([self.sock], [], [], YOUNG_POLL)[0]
+            with self.lock:
+                if ready:
+                    self._receive()
+                self._poll_young()
+
+    def _send_op(self, op):
+        body = CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, 4, 0) + struct.pack("=I", op)
+        self.sock.send(NLMSG.pack(NLMSG.size + len(body), NLMSG_DONE, 0, 0, 0) + body)
+
+    def _receive(self):
+        while True:
+            try:
+                data = self.sock.recv(65536, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                # The kernel dropped events; rebuild the set from /proc
+                self.resyncs += 1
+                self.rescan()
+                continue
+            self._handle(data)
+
+    def _handle(self, data):
+        offset = 0
+        while offset + EVENT_OFFSET + PROC_EVENT.size <= len(data):
+            length = NLMSG.unpack_from(data, offset)[0]
+            if length < NLMSG.size:
+                return
+            what = PROC_EVENT.unpack_from(data, offset + EVENT_OFFSET)[0]
+            body = offset + EVENT_OFFSET + PROC_EVENT.size
+            # Thread creation and exit show up too; only thread group leaders count
+            if what == PROC_EVENT_FORK:
+                _, _, pid, tgid = FORK_EVENT.unpack_from(data, body)
+                if pid == tgid:
+                    self._on_fork(pid)
+            elif what == PROC_EVENT_EXEC:
+                pid, tgid = PID_EVENT.unpack_from(data, body)
+                if pid in self.young:
+                    # New program, new name
+                    self._sample_young(pid, self.young[pid])
+            elif what == PROC_EVENT_EXIT:
+                pid, tgid = PID_EVENT.unpack_from(data, body)
+                if pid == tgid:
+                    self._on_exit(pid)
+            offset += (length + 3) & ~3
+
+    def _on_fork(self, pid):
+        start_time = self._read_start_time(pid)
+        if start_time is None:
+            # Gone already; its exit event follows
+            return
+        self.start_times[pid] = start_time
+        self.started.append(pid)
+        entry = self.young[pid] = ["", time.monotonic(), 0]
+        self._sample_young(pid, entry)
+
+    def _on_exit(self, pid):
+        if self.start_times.pop(pid, None) is not None:
+            self.exited.append(pid)
+        entry = self.young.pop(pid, None)
+        if entry is not None and entry[0]:
+            name, born, peak_kb = entry
+            self.short_lived.append((pid, name, peak_kb, time.monotonic() - born))
+
+    def _poll_young(self):
+        now = time.monotonic()
+        for pid, entry in list(self.young.items()):
+            if now - entry[1] > YOUNG_AGE:
+                del self.young[pid]
+            else:
+                self._sample_young(pid, entry)
+
+    def _sample_young(self, pid, entry):
+        try:
+            buf, n = self.reader.read(f"{collector.PROC_ROOT}/{pid}/status")
+        except OSError:
+            return
+        # Zombies have no VmHWM line; keep what was seen while the process was alive
+        peak_kb = field_int(buf, n, b"VmHWM:")
+        if peak_kb:
+            entry[0] = field_text(buf, n, b"Name:")
+            entry[2] = max(entry[2], peak_kb)
+
+def open_lifecycle():
+    # The proc connector only describes the real /proc, and needs privileges
+    if collector.PROC_ROOT == "/proc":
+        try:
+            tracker = NetlinkLifecycle()
+        except OSError:
+            pass
+        else:
+            tracker.start()
+            return tracker
+    return ProcDirLifecycle()
+
+def main():
+    parser = argparse.ArgumentParser(description="Print process starts, exits and short-lived processes")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--proc-root", help="read this procfs tree instead of /proc")
+    args = parser.parse_args()
+
+    if args.proc_root:
+        collector.set_proc_root(args.proc_root)
+    tracker = open_lifecycle()
+    print(f"Tracking {len(tracker.live()):,} processes via {tracker.method}")
+    try:
+        while True:
+            time.sleep(args.interval)
+            tracker.poll()
+            live = tracker.live()
+            events = tracker.drain()
+            print(f"{time.strftime('%H:%M:%S')}  +{len(events.started)} -{len(events.exited)}  "
+                  f"{len(live):,} live, {len(events.short_lived)} short-lived")
+            for pid, name, peak_kb, lifetime in sorted(events.short_lived, key=lambda row: row[2], reverse=True)[:5]:
+                print(f"    {pid:>7}  {name:20} peak {peak_kb:>10,} KB  lived {lifetime * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tracker.close()
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,110 @@
 #include <linux/proc_fs.h>
 #include <linux/seq_file.h>
 #include <linux/mm.h>
+#include <linux/mmzone.h>
+#include <linux/nodemask.h>
+#include <linux/vmstat.h>
+#include <linux/hrtimer.h>
+#include <linux/ktime.h>
+#include <linux/slab.h>
+#include <linux/spinlock.h>
+#include <linux/uaccess.h>
 
 #define PROC_NAME "mem_tracker"
+#define NUMA_PROC_NAME "mem_tracker_numa"
+#define SAMPLES_PROC_NAME "mem_tracker_samples"
+
+// Pages to KB for any page size
+#define PAGES_TO_KB(pages) ((pages) << (PAGE_SHIFT - 10))
 
 static int mem_show(struct seq_file *m, void *v) {
     struct sysinfo info;
     si_meminfo(&info);
 
-    unsigned long total = info.totalram * 4 / 1024;  // in KB
-    unsigned long free = info.freeram * 4 / 1024;
+    unsigned long total = PAGES_TO_KB(info.totalram);  // in KB
+    unsigned long free = PAGES_TO_KB(info.freeram);
     unsigned long used = total - free;
 
     seq_printf(m, "Used: %lu\nTotal: %lu\n", used, total);
     return 0;
 }
 
+/*
+ * /proc/mem_tracker_numa: per-node, per-zone page counts as packed little-endian
+ * binary, so userspace gets every node in one read and does no text parsing.
+ *
+ *   header:  char magic[4] = "MTN1", u16 version, u16 record count, u32 page size
+ *   records: u16 node, u16 zone index, char zone name[8] (NUL padded), u32 reserved,
+ *            u64 managed pages, u64 free pages
+ *
+ * Counts are in pages; multiply by the header's page size for bytes.
+ */
+#define NUMA_MAGIC "MTN1"
+#define NUMA_VERSION 1
+
+struct numa_header {
+    char magic[4];
+    __le16 version;
+    __le16 count;
+    __le32 page_size;
+} __packed;
+
+struct numa_record {
+    __le16 node;
+    __le16 zone;
+    char name[8];
+    __le32 reserved;
+    __le64 managed;
+    __le64 free;
+} __packed;
+
+static int numa_show(struct seq_file *m, void *v) {
+    struct numa_header header;
+    struct numa_record record;
+    int nid, i;
+    u16 count = 0;
+
+    for_each_online_node(nid) {
+        for (i = 0; i < MAX_NR_ZONES; i++) {
+            if (populated_zone(&NODE_DATA(nid)->node_zones[i]))
+                count++;
+        }
+    }
+
+    memcpy(header.magic, NUMA_MAGIC, sizeof(header.magic));
+    header.version = cpu_to_le16(NUMA_VERSION);
+    header.count = cpu_to_le16(count);
+    header.page_size = cpu_to_le32(PAGE_SIZE);
+    seq_write(m, &header, sizeof(header));
+
+    for_each_online_node(nid) {
+        for (i = 0; i < MAX_NR_ZONES; i++) {
+            struct zone *zone = &NODE_DATA(nid)->node_zones[i];
+            if (!populated_zone(zone))
+                continue;
+            memset(&record, 0, sizeof(record));
+            record.node = cpu_to_le16(nid);
+            record.zone = cpu_to_le16(i);
+            strscpy(record.name, zone->name, sizeof(record.name));
+            record.managed = cpu_to_le64(zone_managed_pages(zone));
+            record.free = cpu_to_le64(zone_page_state(zone, NR_FREE_PAGES));
+            seq_write(m, &record, sizeof(record));
+        }
+    }
+    return 0;
+}
+
+static int numa_open(struct inode *inode, struct file *file) {
+    return single_open(file, numa_show, NULL);
+}
+
+static const struct proc_ops numa_fops = {
+    .proc_open = numa_open,
+    .proc_read = seq_read,
+    .proc_lseek = seq_lseek,
+    .proc_release = single_release,
+};
+
 static int mem_open(struct inode *inode, struct file *file) {
     return single_open(file, mem_show, NULL);
 }
@@ -30,14 +119,123 @@ static const struct proc_ops mem_fops = {
     .proc_release = single_release,
 };
 
+/*
+ * /proc/mem_tracker_samples: an hrtimer samples used/total memory every
+ * sample_interval_us into a ring buffer, and each read() drains as many whole
+ * records as fit in the caller's buffer, oldest first. Userspace gets many samples
+ * per syscall instead of one. Reads never block; an empty ring reads as 0 bytes.
+ *
+ *   record: u64 wall-clock time (ns), u32 sequence number, u32 reserved,
+ *           u64 used KB, u64 total KB                  (32 bytes, little-endian)
+ *
+ * When the ring is full the oldest record is overwritten; readers see the loss as
+ * a gap in the sequence numbers. Only totalram and the free-page counter are read
+ * in the timer, both lock-free counters that are safe in interrupt context.
+ */
+#define RING_SIZE 4096  /* records, power of two */
+#define READ_BATCH 1024 /* records copied out per read() */
+
+static unsigned int sample_interval_us = 100000;
+module_param(sample_interval_us, uint, 0644);
+MODULE_PARM_DESC(sample_interval_us, "Ring buffer sampling interval in microseconds (min 1000)");
+
+struct sample_record {
+    __le64 time_ns;
+    __le32 seq;
+    __le32 reserved;
+    __le64 used_kb;
+    __le64 total_kb;
+} __packed;
+
+static struct sample_record *ring;
+static unsigned int ring_head;  /* next slot to write */
+static unsigned int ring_count;
+static u32 ring_seq;
+static DEFINE_SPINLOCK(ring_lock);
+static struct hrtimer sample_timer;
+
+static ktime_t sample_period(void) {
+    return us_to_ktime(max(READ_ONCE(sample_interval_us), 1000U));
+}
+
+static enum hrtimer_restart sample_tick(struct hrtimer *timer) {
+    unsigned long total = PAGES_TO_KB(totalram_pages());
+    unsigned long free = PAGES_TO_KB(global_zone_page_state(NR_FREE_PAGES));
+    struct sample_record *record;
+    unsigned long flags;
+
+    spin_lock_irqsave(&ring_lock, flags);
+    record = &ring[ring_head];
+    record->time_ns = cpu_to_le64(ktime_get_real_ns());
+    record->seq = cpu_to_le32(ring_seq++);
+    record->reserved = 0;
+    record->used_kb = cpu_to_le64(total - free);
+    record->total_kb = cpu_to_le64(total);
+    ring_head = (ring_head + 1) & (RING_SIZE - 1);
+    if (ring_count < RING_SIZE)
+        ring_count++;
+    spin_unlock_irqrestore(&ring_lock, flags);
+
+    hrtimer_forward_now(timer, sample_period());
+    return HRTIMER_RESTART;
+}
+
+static ssize_t samples_read(struct file *file, char __user *buf, size_t count, loff_t *ppos) {
+    struct sample_record *batch;
+    unsigned int n, tail, i;
+    unsigned long flags;
+    ssize_t ret;
+
+    n = min_t(size_t, count / sizeof(*batch), READ_BATCH);
+    if (n == 0)
+        return count ? -EINVAL : 0;
+    batch = kmalloc_array(n, sizeof(*batch), GFP_KERNEL);
+    if (!batch)
+        return -ENOMEM;
+
+    // Copy out under the lock, then to userspace (which may fault) without it
+    spin_lock_irqsave(&ring_lock, flags);
+    n = min(n, ring_count);
+    tail = (ring_head - ring_count) & (RING_SIZE - 1);
+    for (i = 0; i < n; i++)
+        batch[i] = ring[(tail + i) & (RING_SIZE - 1)];
+    ring_count -= n;
+    spin_unlock_irqrestore(&ring_lock, flags);
+
+    ret = n * sizeof(*batch);
+    if (n && copy_to_user(buf, batch, ret))
+        ret = -EFAULT;
+    kfree(batch);
+    return ret;
+}
+
+static const struct proc_ops samples_fops = {
+    .proc_read = samples_read,
+    .proc_lseek = noop_llseek,
+};
+
 static int __init my_memtracker_init(void) {
+    ring = kcalloc(RING_SIZE, sizeof(*ring), GFP_KERNEL);
+    if (!ring)
+        return -ENOMEM;
+
     proc_create(PROC_NAME, 0, NULL, &mem_fops);
+    proc_create(NUMA_PROC_NAME, 0, NULL, &numa_fops);
+    proc_create(SAMPLES_PROC_NAME, 0, NULL, &samples_fops);
+
+    hrtimer_init(&sample_timer, CLOCK_MONOTONIC, HRTIMER_MODE_REL);
+    sample_timer.function = sample_tick;
+    hrtimer_start(&sample_timer, sample_period(), HRTIMER_MODE_REL);
     printk(KERN_INFO "mem_tracker loaded\n");
     return 0;
 }
 
 static void __exit my_memtracker_exit(void) {
+    hrtimer_cancel(&sample_timer);
+    remove_proc_entry(SAMPLES_PROC_NAME, NULL);
+    remove_proc_entry(NUMA_PROC_NAME, NULL);
     remove_proc_entry(PROC_NAME, NULL);
+    kfree(ring);
     printk(KERN_INFO "mem_tracker removed\n");
 }
 
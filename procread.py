@@ -0,0 +1,90 @@
+import os
+
+# Low-level /proc reading shared by the collectors.
+#
+# open().readlines() builds a file object, a text decoder and a list of line strings
+# for every file, which adds up over thousands of PIDs per tick. ProcReader instead
+# reads with os.open/os.readv into a small pool of preallocated bytearrays that are
+# reused on every call, and the parsers below pick fields straight out of the bytes.
+# A buffer grows (and stays grown) if a file does not fit, so steady state allocates
+# nothing but the parsed values.
+#
+# Results are (buffer, length) pairs that stay valid until the pool wraps around, so
+# up to `pool_size` reads can be looked at together (e.g. a PID's status and stat).
+# Not thread-safe: give each thread its own ProcReader.
+class BufferPool:
+    def __init__(self, count=4, size=4096):
+        self.buffers = [bytearray(size) for _ in range(count)]
+        self.next = 0
+
+    def take(self):
+        buf = self.buffers[self.next]
+        self.next = (self.next + 1) % len(self.buffers)
+        return buf
+
+class ProcReader:
+    def __init__(self, pool_size=4, buffer_size=4096):
+        self.pool = BufferPool(pool_size, buffer_size)
+
+    def read(self, path):
+        # (buffer, length) for files the kernel renders in one go (status, stat,
+        # oom_score, mem_tracker, ...): a read that does not fill the buffer got the
+        # whole file, so this is one readv() per file. Raises OSError like open().
+        # Multi-record files such as smaps are streamed instead (see smaps.py).
+        buf = self.pool.take()
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            n = os.readv(fd, [buf])
+            while n == len(buf):
+                # Did not fit: double the buffer, which stays grown for next time
+                buf.extend(bytes(len(buf)))
+                more = os.readv(fd, [memoryview(buf)[n:]])
+                if more == 0:
+                    break
+                n += more
+        finally:
+            os.close(fd)
+        return buf, n
+
+    def read_text(self, path):
+        buf, n = self.read(path)
+        return buf[:n].decode(errors="replace")
+
+def find_field(buf, n, key):
+    # Offset just past "key" at the start of a line, or -1
+    pos = buf.find(key, 0, n)
+    while pos > 0 and buf[pos - 1] != 10:  # not preceded by a newline
+        pos = buf.find(key, pos + 1, n)
+    return -1 if pos < 0 else pos + len(key)
+
+def field_int(buf, n, key, default=0):
+    # First number after "key", e.g. field_int(buf, n, b"VmRSS:") on a status file
+    start = find_field(buf, n, key)
+    if start < 0:
+        return default
+    end = buf.find(b"\n", start, n)
+    try:
+        return int(buf[start:end if end >= 0 else n].split()[0])
+    except (IndexError, ValueError):
+        return default
+
+def field_text(buf, n, key):
+    start = find_field(buf, n, key)
+    if start < 0:
+        return ""
+    end = buf.find(b"\n", start, n)
+    return buf[start:end if end >= 0 else n].strip().decode(errors="replace")
+
+def parse_status(buf, n, swap=False):
+    # (name, VmRSS kB, VmSwap kB) from /proc/<pid>/status; swap is 0 unless asked for
+    return (field_text(buf, n, b"Name:"), field_int(buf, n, b"VmRSS:"),
+            field_int(buf, n, b"VmSwap:") if swap else 0)
+
+def parse_stat(buf, n):
+    # (majflt, starttime): fields 12 and 22 of /proc/<pid>/stat, split after the
+    # ')' that ends comm since comm may contain spaces
+    fields = buf[buf.rindex(b")", 0, n) + 2:n].split()
+    return int(fields[9]), int(fields[19])
+
+def parse_int(buf, n):
+    return int(buf[:n])
@@ -0,0 +1,91 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+# Per-stage profiling built on SelfMonitor's hook API. A session installs pre/post
+# hooks on every stage, captures N ticks, writes its results to files and removes
+# itself. With no session running no hooks are installed, so the stages only pay
+# SelfMonitor's usual dict lookup.
+STAGES = ("read_kernel", "scan_procs", "top_k", "render_table", "render_chart")
+MODES = ("cprofile", "tracemalloc")
+
+class ProfileSession:
+    def __init__(self, monitor, mode="cprofile", ticks=30, out_dir=".", on_finish=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.monitor = monitor
+        self.mode = mode
+        self.ticks = ticks
+        self.out_dir = out_dir
+        self.on_finish = on_finish
+        self.ticks_seen = 0
+        self.stage_stats = {stage: {"calls": 0, "seconds": 0.0, "peak_bytes": 0} for stage in STAGES}
+        self.profiler = None
+        self.path = None
+
+    def start(self):
+        if self.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+        else:
+            tracemalloc.start(25)
+        for stage in STAGES:
+            self.monitor.add_hook(stage, self._pre, self._post)
+        self.monitor.add_hook("tick", None, self._tick_done)
+
+    def _pre(self, stage):
+        if self.profiler is not None:
+            self.profiler.enable()
+        else:
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+
+    def _post(self, stage, seconds):
+        stats = self.stage_stats[stage]
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        if self.profiler is not None:
+            self.profiler.disable()
+        else:
+            peak = tracemalloc.get_traced_memory()[1] - self._base
+            stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+
+    def _tick_done(self, stage, seconds):
+        self.ticks_seen += 1
+        if self.ticks_seen >= self.ticks:
+            self.finish()
+
+    def finish(self):
+        for stage in STAGES:
+            self.monitor.remove_hook(stage, self._pre, self._post)
+        self.monitor.remove_hook("tick", None, self._tick_done)
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        summary = io.StringIO()
+        summary.write(f"{self.mode} capture over {self.ticks_seen} ticks\n\n")
+        summary.write(f"{'stage':14} {'calls':>6} {'total ms':>10} {'peak alloc':>12}\n")
+        for stage, stats in self.stage_stats.items():
+            summary.write(f"{stage:14} {stats['calls']:>6} {stats['seconds'] * 1000:>10.2f} "
+                          f"{stats['peak_bytes']:>12,}\n")
+        summary.write("\n")
+
+        if self.profiler is not None:
+            # Raw stats for snakeviz/pstats, plus a readable top-30 in the summary
+            self.profiler.dump_stats(os.path.join(self.out_dir, f"profile-{stamp}.prof"))
+            pstats.Stats(self.profiler, stream=summary).sort_stats("cumulative").print_stats(30)
+            self.path = os.path.join(self.out_dir, f"profile-{stamp}.txt")
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            snapshot.dump(os.path.join(self.out_dir, f"tracemalloc-{stamp}.snapshot"))
+            for stat in snapshot.statistics("lineno")[:30]:
+                summary.write(f"{stat}\n")
+            self.path = os.path.join(self.out_dir, f"tracemalloc-{stamp}.txt")
+
+        with open(self.path, "w") as f:
+            f.write(summary.getvalue())
+        if self.on_finish:
+            self.on_finish(self)
@@ -0,0 +1,47 @@
+import time
+
+# Coalesces widget updates into at most one batch per frame.
+#
+# Data producers only call mark_dirty(); the scheduler later calls each dirty
+# panel's render function in one pass. Panels whose notebook tab is not selected
+# (or everything, while the window is minimized) stay dirty and are rendered once
+# they become visible again, so background tabs cost nothing in the meantime.
+class RenderScheduler:
+    def __init__(self, root, max_fps=30):
+        self.root = root
+        self.frame_seconds = 1.0 / max_fps
+        self.panels = {}
+        self.dirty = set()
+        self.pending = None
+        self.last_flush = 0.0
+
+    def add_panel(self, name, render, is_visible=None):
+        self.panels[name] = (render, is_visible)
+
+    def remove_panel(self, name):
+        self.panels.pop(name, None)
+        self.dirty.discard(name)
+
+    def mark_dirty(self, *names):
+        self.dirty.update(names)
+        self._schedule()
+
+    def refresh(self):
+        # Call when visibility changes (tab switch, window restored)
+        self._schedule()
+
+    def _schedule(self):
+        if self.pending is not None or not self.dirty:
+            return
+        wait = self.frame_seconds - (time.monotonic() - self.last_flush)
+        self.pending = self.root.after(max(0, int(wait * 1000)), self.flush)
+
+    def flush(self):
+        self.pending = None
+        self.last_flush = time.monotonic()
+        if self.root.state() == 'iconic':
+            return
+        for name, (render, is_visible) in self.panels.items():
+            if name in self.dirty and (is_visible is None or is_visible()):
+                self.dirty.discard(name)
+                render()
@@ -0,0 +1,283 @@
+import argparse
+import io
+
+from snapshot import ProcessSnapshot
+
+# Compact binary encoding for memory sample streams.
+#
+# A stream is a 4-byte magic followed by length-prefixed records, so it can be
+# appended to and read back one record at a time. Inside a record:
+#   * timestamps (integer milliseconds) are stored as delta-of-delta, which is 0
+#     for a steady sampling interval,
+#   * memory values are zigzag varint deltas against the previous sample,
+#   * process names are dictionary-encoded: a name is spelled out the first time
+#     it is seen and referred to by its index after that.
+KERNEL_MAGIC = b"MTK1"
+PROCESS_MAGIC = b"MTP1"
+
+def zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+def unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+def write_varint(buf, n):
+    while n > 0x7F:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+def read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+class TimestampCodec:
+    def __init__(self):
+        self.prev = 0
+        self.prev_delta = 0
+
+    def encode(self, buf, timestamp_ms):
+        delta = timestamp_ms - self.prev
+        write_varint(buf, zigzag(delta - self.prev_delta))
+        self.prev = timestamp_ms
+        self.prev_delta = delta
+
+    def decode(self, data, pos):
+        dod, pos = read_varint(data, pos)
+        self.prev_delta += unzigzag(dod)
+        self.prev += self.prev_delta
+        return self.prev, pos
+
+def _write_record(stream, payload):
+    header = bytearray()
+    write_varint(header, len(payload))
+    stream.write(header)
+    stream.write(payload)
+
+def _read_records(stream, magic):
+    if stream.read(len(magic)) != magic:
+        raise ValueError("Not a sample stream of the expected kind")
+    while True:
+        length = 0
+        shift = 0
+        while True:
+            byte = stream.read(1)
+            if not byte:
+                if shift:
+                    raise ValueError("Truncated record header")
+                return
+            length |= (byte[0] & 0x7F) << shift
+            if byte[0] < 0x80:
+                break
+            shift += 7
+        payload = stream.read(length)
+        if len(payload) != length:
+            raise ValueError("Truncated record")
+        yield payload
+
+class KernelSeriesEncoder:
+    # Samples are (timestamp_ms, used_kb, total_kb)
+    def __init__(self, stream):
+        self.stream = stream
+        self.ts = TimestampCodec()
+        self.prev_used = 0
+        self.prev_total = 0
+        stream.write(KERNEL_MAGIC)
+
+    def write(self, timestamp_ms, used_kb, total_kb):
+        buf = bytearray()
+        self.ts.encode(buf, timestamp_ms)
+        write_varint(buf, zigzag(used_kb - self.prev_used))
+        write_varint(buf, zigzag(total_kb - self.prev_total))
+        self.prev_used = used_kb
+        self.prev_total = total_kb
+        _write_record(self.stream, buf)
+
+def decode_kernel_series(stream):
+    ts = TimestampCodec()
+    used = total = 0
+    for payload in _read_records(stream, KERNEL_MAGIC):
+        timestamp, pos = ts.decode(payload, 0)
+        d_used, pos = read_varint(payload, pos)
+        d_total, pos = read_varint(payload, pos)
+        used += unzigzag(d_used)
+        total += unzigzag(d_total)
+        yield timestamp, used, total
+
+class _ProcessTableEncoder:
+    # Processes as (pid, name, memory_kb). PIDs are written sorted and delta-encoded;
+    # RSS is a delta against the same PID in the previous table (or against 0 for a
+    # new PID).
+    def __init__(self):
+        self.names = {}
+        self.prev_rss = {}
+
+    def encode(self, buf, process_info):
+        if isinstance(process_info, ProcessSnapshot):
+            # Read the columns directly in pid order
+            snapshot = process_info
+            names = snapshot.names.names
+            order = sorted(range(len(snapshot)), key=snapshot.pids.__getitem__)
+            procs = [(snapshot.pids[i], names[snapshot.name_ids[i]], snapshot.rss[i]) for i in order]
+        else:
+            procs = sorted((proc['pid'], proc['name'], proc['memory_kb']) for proc in process_info)
+        write_varint(buf, len(procs))
+        prev_pid = 0
+        rss = {}
+        for pid, name, memory_kb in procs:
+            write_varint(buf, pid - prev_pid)
+            prev_pid = pid
+
+            name_id = self.names.get(name)
+            if name_id is None:
+                name_id = len(self.names)
+                self.names[name] = name_id
+                write_varint(buf, name_id)
+                encoded = name.encode("utf-8")
+                write_varint(buf, len(encoded))
+                buf += encoded
+            else:
+                write_varint(buf, name_id)
+
+            write_varint(buf, zigzag(memory_kb - self.prev_rss.get(pid, 0)))
+            rss[pid] = memory_kb
+        self.prev_rss = rss
+
+class _ProcessTableDecoder:
+    def __init__(self):
+        self.names = []
+        self.prev_rss = {}
+
+    def decode(self, payload, pos):
+        count, pos = read_varint(payload, pos)
+        pid = 0
+        rss = {}
+        process_info = []
+        for _ in range(count):
+            d_pid, pos = read_varint(payload, pos)
+            pid += d_pid
+            name_id, pos = read_varint(payload, pos)
+            if name_id == len(self.names):
+                length, pos = read_varint(payload, pos)
+                self.names.append(bytes(payload[pos:pos + length]).decode("utf-8"))
+                pos += length
+            d_rss, pos = read_varint(payload, pos)
+            memory_kb = self.prev_rss.get(pid, 0) + unzigzag(d_rss)
+            rss[pid] = memory_kb
+            process_info.append({"pid": pid, "name": self.names[name_id], "memory_kb": memory_kb})
+        self.prev_rss = rss
+        return process_info, pos
+
+class ProcessSeriesEncoder:
+    # One record per tick holding every process
+    def __init__(self, stream):
+        self.stream = stream
+        self.ts = TimestampCodec()
+        self.table = _ProcessTableEncoder()
+        stream.write(PROCESS_MAGIC)
+
+    def write(self, timestamp_ms, process_info):
+        buf = bytearray()
+        self.ts.encode(buf, timestamp_ms)
+        self.table.encode(buf, process_info)
+        _write_record(self.stream, buf)
+
+def decode_process_series(stream):
+    ts = TimestampCodec()
+    table = _ProcessTableDecoder()
+    for payload in _read_records(stream, PROCESS_MAGIC):
+        timestamp, pos = ts.decode(payload, 0)
+        process_info, pos = table.decode(payload, pos)
+        yield timestamp, process_info
+
+class HostSampleEncoder:
+    # Kernel totals and a process table in one record, for streaming over a socket.
+    # encode() returns the framed record; the magic is sent once by the caller.
+    def __init__(self):
+        self.ts = TimestampCodec()
+        self.prev_used = 0
+        self.prev_total = 0
+        self.table = _ProcessTableEncoder()
+
+    def encode(self, timestamp_ms, used_kb, total_kb, process_info):
+        buf = bytearray()
+        self.ts.encode(buf, timestamp_ms)
+        write_varint(buf, zigzag(used_kb - self.prev_used))
+        write_varint(buf, zigzag(total_kb - self.prev_total))
+        self.prev_used = used_kb
+        self.prev_total = total_kb
+        self.table.encode(buf, process_info)
+        record = bytearray()
+        write_varint(record, len(buf))
+        return bytes(record + buf)
+
+class HostSampleDecoder:
+    # Incremental decoder: feed() accepts arbitrary chunks as they arrive from a
+    # non-blocking socket and returns the samples completed by that chunk.
+    def __init__(self):
+        self.buffer = bytearray()
+        self.ts = TimestampCodec()
+        self.used = 0
+        self.total = 0
+        self.table = _ProcessTableDecoder()
+
+    def feed(self, data):
+        self.buffer += data
+        samples = []
+        pos = 0
+        while True:
+            try:
+                length, start = read_varint(self.buffer, pos)
+            except IndexError:
+                break
+            if start + length > len(self.buffer):
+                break
+            payload = memoryview(self.buffer)[start:start + length]
+            timestamp, p = self.ts.decode(payload, 0)
+            d_used, p = read_varint(payload, p)
+            d_total, p = read_varint(payload, p)
+            self.used += unzigzag(d_used)
+            self.total += unzigzag(d_total)
+            process_info, p = self.table.decode(payload, p)
+            payload.release()
+            samples.append((timestamp, self.used, self.total, process_info))
+            pos = start + length
+        del self.buffer[:pos]
+        return samples
+
+def main():
+    # Re-encode a capture.py recording and compare against a plain CSV export
+    from capture import ReplaySource
+    parser = argparse.ArgumentParser(description="Measure sample codec size against CSV")
+    parser.add_argument("capture")
+    args = parser.parse_args()
+
+    source = ReplaySource(args.capture)
+    kernel_out = io.BytesIO()
+    process_out = io.BytesIO()
+    kernel_enc = KernelSeriesEncoder(kernel_out)
+    process_enc = ProcessSeriesEncoder(process_out)
+    csv_size = 0
+    while source.advance():
+        timestamp_ms = int(source.timestamp * 1000)
+        used, total, _ = source.read_kernel_memory()
+        process_info = source.get_process_memory_info()
+        kernel_enc.write(timestamp_ms, used, total)
+        process_enc.write(timestamp_ms, process_info)
+        csv_size += len(f"{timestamp_ms},kernel,{used},{total}\n")
+        for proc in process_info:
+            csv_size += len(f"{timestamp_ms},{proc['pid']},{proc['name']},{proc['memory_kb']}\n")
+
+    encoded_size = kernel_out.tell() + process_out.tell()
+    ratio = csv_size / encoded_size if encoded_size else 0
+    print(f"CSV: {csv_size:,} bytes, encoded: {encoded_size:,} bytes ({ratio:.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
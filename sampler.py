@@ -0,0 +1,97 @@
+import time
+
+# Shared sampling for several views at once.
+#
+# One SharedSampler owns the data source and the tick. On every tick it reads each
+# topic that has at least one subscriber exactly once and publishes the result on an
+# EventBus; views only subscribe and never read /proc themselves. Opening a second
+# process table therefore costs one more Treeview update, not a second /proc scan,
+# and a topic nobody is looking at is not read at all.
+#
+# Topics and payloads:
+#   kernel    - [(timestamp, used_kb, total_kb, percent)], several per tick with the
+#               module's ring buffer, otherwise one
+#   processes - ProcessSnapshot
+#   cgroups   - [(cgroup path, usage_kb)], or None where cgroups are not available
+#   tick      - dict of per-topic read counts and timings, published last
+TOPICS = ("kernel", "processes", "cgroups")
+
+class EventBus:
+    def __init__(self):
+        # topic -> callbacks, called in subscription order
+        self.subscribers = {}
+
+    def subscribe(self, topic, callback):
+        self.subscribers.setdefault(topic, []).append(callback)
+        return topic, callback
+
+    def unsubscribe(self, token):
+        topic, callback = token
+        callbacks = self.subscribers.get(topic)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self.subscribers[topic]
+
+    def has_subscribers(self, topic):
+        return topic in self.subscribers
+
+    def subscriber_count(self, topic):
+        return len(self.subscribers.get(topic, ()))
+
+    def publish(self, topic, payload):
+        for callback in list(self.subscribers.get(topic, ())):
+            callback(payload)
+
+class SharedSampler:
+    def __init__(self, root, source, bus, fields=()):
+        self.root = root
+        self.source = source
+        self.bus = bus
+        # Optional process columns (snapshot.FIELDS) collected for every "processes"
+        # subscriber alike; set by the owner, not negotiated per view
+        self.fields = fields
+        self.readers = {
+            "kernel": self._read_kernel,
+            "processes": lambda: self.source.get_process_memory_info(fields=self.fields),
+            "cgroups": self.source.read_cgroup_memory,
+        }
+        self.reads = dict.fromkeys(TOPICS, 0)
+        self.ticks = 0
+        self.pending = None
+
+    def _read_kernel(self):
+        samples = self.source.read_kernel_samples()
+        if samples is None:
+            used, total, percent = self.source.read_kernel_memory()
+            samples = [(self.source.timestamp, used, total, percent)]
+        return samples
+
+    def start(self):
+        if self.pending is None:
+            self.pending = self.root.after(0, self.tick)
+
+    def stop(self):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+
+    def tick(self):
+        self.pending = None
+        if not self.source.advance():
+            # Replay reached the end of the capture
+            self.bus.publish("tick", None)
+            return
+        stats = {"tick": self.ticks, "timestamp": self.source.timestamp, "reads": {}, "ms": {}}
+        for topic in TOPICS:
+            if not self.bus.has_subscribers(topic):
+                continue
+            start = time.perf_counter()
+            payload = self.readers[topic]()
+            stats["ms"][topic] = (time.perf_counter() - start) * 1000
+            stats["reads"][topic] = 1
+            self.reads[topic] += 1
+            self.bus.publish(topic, payload)
+        self.ticks += 1
+        self.bus.publish("tick", stats)
+        self.pending = self.root.after(self.source.next_delay_ms(), self.tick)
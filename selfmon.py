@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from procread import ProcReader, field_int
+
+# Self-monitoring for the tracker: how long each stage of a tick takes, plus the
+# app's own RSS and CPU usage read from /proc/self.
+#
+# Stages can also carry pre/post hooks (see profiling.py). Hooks are looked up per
+# call, so a stage with none installed costs one empty dict lookup.
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+class SelfMonitor:
+    def __init__(self, window=120):
+        self.window = window
+        # name -> recent durations in seconds
+        self.spans = {}
+        # (wall time, rss_kb, cpu_percent) once per sample_process() call
+        self.process_log = deque(maxlen=window)
+        self.last_cpu = None
+        # name -> callbacks; pre(name) runs before a span, post(name, seconds) after it
+        self.pre_hooks = {}
+        self.post_hooks = {}
+        self.reader = ProcReader(pool_size=2, buffer_size=2048)
+
+    def add_hook(self, name, pre=None, post=None):
+        if pre is not None:
+            self.pre_hooks.setdefault(name, []).append(pre)
+        if post is not None:
+            self.post_hooks.setdefault(name, []).append(post)
+
+    def remove_hook(self, name, pre=None, post=None):
+        for hooks, callback in ((self.pre_hooks, pre), (self.post_hooks, post)):
+            if callback is not None and callback in hooks.get(name, ()):
+                hooks[name].remove(callback)
+                if not hooks[name]:
+                    del hooks[name]
+
+    @contextmanager
+    def span(self, name):
+        pre_hooks = self.pre_hooks.get(name)
+        if pre_hooks:
+            for hook in list(pre_hooks):
+                hook(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        log = self.spans.get(name)
+        if log is None:
+            log = self.spans[name] = deque(maxlen=self.window)
+        log.append(seconds)
+        post_hooks = self.post_hooks.get(name)
+        if post_hooks:
+            for hook in list(post_hooks):
+                hook(name, seconds)
+
+    def sample_process(self):
+        now = time.monotonic()
+        try:
+            buf, n = self.reader.read("/proc/self/stat")
+            fields = buf[buf.rindex(b")", 0, n) + 2:n].split()
+            cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+            rss_kb = field_int(*self.reader.read("/proc/self/status"), b"VmRSS:")
+        except (OSError, ValueError, IndexError):
+            return
+        cpu_percent = 0.0
+        if self.last_cpu is not None:
+            elapsed = now - self.last_cpu[0]
+            if elapsed > 0:
+                cpu_percent = (cpu_seconds - self.last_cpu[1]) / elapsed * 100
+        self.last_cpu = (now, cpu_seconds)
+        self.process_log.append((time.time(), rss_kb, cpu_percent))
+
+    def summary(self):
+        spans = {}
+        for name, log in self.spans.items():
+            if log:
+                spans[name] = {"last_ms": log[-1] * 1000,
+                               "avg_ms": sum(log) / len(log) * 1000,
+                               "max_ms": max(log) * 1000}
+        result = {"spans": spans}
+        if self.process_log:
+            _, rss_kb, cpu_percent = self.process_log[-1]
+            result["rss_kb"] = rss_kb
+            result["cpu_percent"] = cpu_percent
+        return result
+
+    def status_text(self):
+        summary = self.summary()
+        parts = [f"{name} {span['avg_ms']:.1f} ms" for name, span in summary["spans"].items()]
+        if "rss_kb" in summary:
+            parts.append(f"RSS {summary['rss_kb'] / 1024:.1f} MB")
+            parts.append(f"CPU {summary['cpu_percent']:.1f}%")
+        return "  |  ".join(parts)
+
+    def export(self, path):
+        data = {
+            "summary": self.summary(),
+            "spans_ms": {name: [s * 1000 for s in log] for name, log in self.spans.items()},
+            "process": [{"time": t, "rss_kb": rss, "cpu_percent": cpu} for t, rss, cpu in self.process_log],
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
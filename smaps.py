@@ -0,0 +1,195 @@
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import collector
+from procread import ProcReader, parse_stat
+
+# Per-process memory maps from /proc/<pid>/smaps, grouped for the Process tab's
+# detail pane.
+#
+# smaps is roughly 1 KB of text per mapping, so a process with 100k mappings (a JVM,
+# a database with many mmapped files) produces over 100 MB. SmapsLoader streams it in
+# CHUNK_SIZE reads on a background thread and folds each mapping into per-name
+# totals as it goes, so memory stays proportional to the distinct names, not the
+# mappings, and the UI only ever polls. Finished maps are kept in a MemoryMapCache
+# keyed by (pid, start_time): going back to a process is instant, and a reused PID
+# never shows its predecessor's maps.
+CHUNK_SIZE = 256 * 1024
+KINDS = ("heap", "stack", "anon", "file", "other")
+KIND_TITLES = {"heap": "Heap", "stack": "Stack", "anon": "Anonymous", "file": "Files",
+               "other": "Other ([vdso], [vvar], ...)"}
+
+def classify(name):
+    # Group for a mapping's pathname column
+    if not name or name.startswith("[anon"):
+        return "anon"
+    if name.startswith("/"):
+        return "file"
+    if name == "[heap]":
+        return "heap"
+    if name.startswith("[stack"):
+        return "stack"
+    return "other"
+
+class MemoryMap:
+    def __init__(self, pid, start_time, names, elapsed):
+        self.pid = pid
+        self.start_time = start_time
+        self.elapsed = elapsed
+        # kind -> [(name, mappings, rss_kb, pss_kb)], largest RSS first
+        self.groups = {kind: [] for kind in KINDS}
+        for name, (count, rss_kb, pss_kb) in names.items():
+            text = name.decode(errors="replace") if name else "[anon]"
+            self.groups[classify(text)].append((text, count, rss_kb, pss_kb))
+        for rows in self.groups.values():
+            rows.sort(key=lambda row: row[2], reverse=True)
+
+    def totals(self, kind):
+        # (mappings, rss_kb, pss_kb) for one group
+        rows = self.groups[kind]
+        return (sum(row[1] for row in rows), sum(row[2] for row in rows), sum(row[3] for row in rows))
+
+    @property
+    def mappings(self):
+        return sum(self.totals(kind)[0] for kind in KINDS)
+
+class SmapsParser:
+    # Incremental: feed() takes whatever bytes arrived, split anywhere
+    def __init__(self):
+        # pathname bytes -> [mappings, rss_kb, pss_kb]
+        self.names = {}
+        self.current = None
+        self.pending = b""
+        self.mappings = 0
+
+    def feed(self, data):
+        lines = (self.pending + data).split(b"\n")
+        self.pending = lines.pop()
+        self._parse(lines)
+
+    def finish(self):
+        if self.pending:
+            self._parse([self.pending])
+            self.pending = b""
+        return self.names
+
+    def _parse(self, lines):
+        names = self.names
+        current = self.current
+        for line in lines:
+            if not line:
+                continue
+            if 65 <= line[0] <= 90:
+                # "Rss:     12 kB"; field names start upper-case, addresses never do
+                if current is not None:
+                    if line.startswith(b"Rss:"):
+                        current[1] += int(line[4:-3])
+                    elif line.startswith(b"Pss:"):
+                        current[2] += int(line[4:-3])
+            else:
+                # "start-end perms offset dev inode [pathname]"
+                fields = line.split(None, 5)
+                name = fields[5] if len(fields) > 5 else b""
+                current = names.get(name)
+                if current is None:
+                    current = names[name] = [0, 0, 0]
+                current[0] += 1
+                self.mappings += 1
+        self.current = current
+
+class SmapsLoader(threading.Thread):
+    # Reads one process's smaps in the background. The UI polls `mappings` (parsed so
+    # far), `finished`, `result` and `error`; cancel() stops at the next chunk.
+    def __init__(self, pid, start_time):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.start_time = start_time
+        self.mappings = 0
+        self.result = None
+        self.error = None
+        self.finished = False
+        self.cancelled = False
+
+    @property
+    def key(self):
+        return self.pid, self.start_time
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        start = time.perf_counter()
+        parser = SmapsParser()
+        buf = bytearray(CHUNK_SIZE)
+        try:
+            fd = os.open(f"{collector.PROC_ROOT}/{self.pid}/smaps", os.O_RDONLY)
+            try:
+                while not self.cancelled:
+                    n = os.readv(fd, [buf])
+                    if n == 0:
+                        break
+                    parser.feed(bytes(buf[:n]))
+                    self.mappings = parser.mappings
+            finally:
+                os.close(fd)
+            if not self.cancelled:
+                names = parser.finish()
+                # procread is not thread-safe, so this thread has its own reader
+                _, start_time = parse_stat(*ProcReader(1).read(f"{collector.PROC_ROOT}/{self.pid}/stat"))
+                if start_time != self.start_time:
+                    raise ProcessLookupError(f"process {self.pid} exited while its maps were read")
+                self.result = MemoryMap(self.pid, self.start_time, names, time.perf_counter() - start)
+        except (OSError, ValueError, IndexError) as e:
+            self.error = e
+        finally:
+            self.finished = True
+
+class MemoryMapCache:
+    # Least recently used MemoryMaps, keyed by (pid, start_time)
+    def __init__(self, capacity=16):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        memory_map = self.entries.get(key)
+        if memory_map is not None:
+            self.entries.move_to_end(key)
+        return memory_map
+
+    def put(self, key, memory_map):
+        self.entries[key] = memory_map
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a process's memory maps from /proc/<pid>/smaps")
+    parser.add_argument("pid", type=int)
+    parser.add_argument("--top", type=int, default=10, help="names to list per group")
+    parser.add_argument("--proc-root", help="read this procfs tree instead of /proc")
+    args = parser.parse_args()
+
+    if args.proc_root:
+        collector.set_proc_root(args.proc_root)
+    start_time = collector.read_start_time(args.pid)
+    if start_time is None:
+        parser.error(f"no process {args.pid}")
+    loader = SmapsLoader(args.pid, start_time)
+    loader.run()
+    if loader.error:
+        parser.exit(1, f"Failed to read memory maps: {loader.error}\n")
+    memory_map = loader.result
+    for kind in KINDS:
+        count, rss_kb, pss_kb = memory_map.totals(kind)
+        if not count:
+            continue
+        print(f"{KIND_TITLES[kind]}: {count:,} mappings, RSS {rss_kb:,} KB, PSS {pss_kb:,} KB")
+        for name, count, rss_kb, pss_kb in memory_map.groups[kind][:args.top]:
+            print(f"  {rss_kb:>12,} {pss_kb:>12,}  {count:>6,}  {name}")
+    print(f"\n{memory_map.mappings:,} mappings read in {memory_map.elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
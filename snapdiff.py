@@ -0,0 +1,134 @@
+import argparse
+import heapq
+import time
+from datetime import datetime
+from itertools import repeat
+
+# Compares two process snapshots: which processes grew, which are new and which
+# exited in between.
+#
+# Processes are matched on (pid, start_time) with a hash join over the snapshots'
+# columns: one dict built from the earlier snapshot, one probe per process in the
+# later one. Without start times (live snapshots taken without that field, or old
+# captures) the key degrades to the PID alone.
+class SnapshotDiff:
+    def __init__(self, grown, new, exited, new_count, exited_count, total_delta_kb):
+        # Rows are (pid, name, before_kb, after_kb, delta_kb), largest first;
+        # before_kb is None for new processes and after_kb None for exited ones
+        self.grown = grown
+        self.new = new
+        self.exited = exited
+        self.new_count = new_count
+        self.exited_count = exited_count
+        self.total_delta_kb = total_delta_kb
+
+def _keys(snapshot):
+    starts = snapshot.start_time
+    if starts is None:
+        return zip(snapshot.pids)
+    return zip(snapshot.pids, starts)
+
+def diff_snapshots(before, after, top=20):
+    if (before.start_time is None) != (after.start_time is None):
+        raise ValueError("Both snapshots need start times, or neither")
+    # Build side: key -> row index in the earlier snapshot
+    index = dict(zip(_keys(before), range(len(before))))
+    before_rss = before.rss
+    after_rss = after.rss
+
+    # Probe side; matched rows are popped, so whatever is left afterwards has exited
+    matches = list(map(index.pop, _keys(after), repeat(None)))
+    changes = []
+    new_rows = []
+    for row, match in enumerate(matches):
+        if match is None:
+            new_rows.append(row)
+        else:
+            delta = after_rss[row] - before_rss[match]
+            if delta > 0:
+                changes.append((delta, row, match))
+    exited_rows = list(index.values())
+
+    grown = [(after.pids[row], after.name_of(row), before_rss[match], after_rss[row], delta)
+             for delta, row, match in heapq.nlargest(top, changes)]
+    new = [(after.pids[row], after.name_of(row), None, after_rss[row], after_rss[row])
+           for row in heapq.nlargest(top, new_rows, key=after_rss.__getitem__)]
+    exited = [(before.pids[row], before.name_of(row), before_rss[row], None, -before_rss[row])
+              for row in heapq.nlargest(top, exited_rows, key=before_rss.__getitem__)]
+    total_delta_kb = sum(after_rss) - sum(before_rss)
+    return SnapshotDiff(grown, new, exited, len(new_rows), len(exited_rows), total_delta_kb)
+
+def parse_when(text, reference):
+    # "+300" (seconds after reference), "14:05" / "14:05:30" (local time on the
+    # reference's day) or an epoch timestamp
+    if text.startswith("+"):
+        return reference + float(text[1:])
+    if ":" in text:
+        parts = [int(p) for p in text.split(":")]
+        if len(parts) == 2:
+            parts.append(0)
+        day = datetime.fromtimestamp(reference)
+        return day.replace(hour=parts[0], minute=parts[1], second=parts[2], microsecond=0).timestamp()
+    return float(text)
+
+def capture_snapshots(path, times, fields=("start_time",)):
+    # One pass over the capture: for each requested time, the snapshot of the first
+    # frame at or after it (or the last frame, if the capture ends first). Times may
+    # be given as parse_when() strings, resolved against the first frame.
+    from capture import CaptureReader, build_snapshot
+    from snapshot import NameTable
+    reader = CaptureReader(path)
+    names = NameTable()
+    results = [None] * len(times)
+    try:
+        targets = None
+        last = None
+        for timestamp, _, statuses in reader:
+            if targets is None:
+                targets = sorted((t if isinstance(t, (int, float)) else parse_when(t, timestamp), i)
+                                 for i, t in enumerate(times))
+            last = (timestamp, statuses, reader.start_times)
+            while targets and targets[0][0] <= timestamp:
+                _, i = targets.pop(0)
+                results[i] = (timestamp, build_snapshot(statuses, reader.start_times, names, fields))
+            if not targets:
+                break
+        else:
+            if last is None:
+                raise ValueError(f"{path} has no frames")
+            for _, i in targets:
+                results[i] = (last[0], build_snapshot(last[1], last[2], names, fields))
+    finally:
+        reader.close()
+    return results
+
+def format_diff(diff, before_time, after_time):
+    lines = [f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(before_time))} -> "
+             f"{time.strftime('%H:%M:%S', time.localtime(after_time))}: "
+             f"{diff.total_delta_kb:+,} KB total, {diff.new_count} new, {diff.exited_count} exited"]
+    for title, rows in (("Top growers", diff.grown), ("New", diff.new), ("Exited", diff.exited)):
+        lines.append("")
+        lines.append(title)
+        for pid, name, before_kb, after_kb, delta_kb in rows:
+            before_text = "-" if before_kb is None else f"{before_kb:,}"
+            after_text = "-" if after_kb is None else f"{after_kb:,}"
+            lines.append(f"  {pid:>7}  {name:20} {before_text:>12} -> {after_text:>12}  {delta_kb:+,} KB")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff process memory between two points of a capture")
+    parser.add_argument("capture")
+    parser.add_argument("start", help="HH:MM[:SS], +SECONDS from the first frame, or an epoch timestamp")
+    parser.add_argument("end")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    (before_time, before), (after_time, after) = capture_snapshots(args.capture, [args.start, args.end])
+    start = time.perf_counter()
+    diff = diff_snapshots(before, after, args.top)
+    elapsed = time.perf_counter() - start
+    print(format_diff(diff, before_time, after_time))
+    print(f"\n{len(before):,} vs {len(after):,} processes diffed in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import heapq
+from array import array
+
+# Columnar per-tick process snapshot.
+#
+# Instead of one dict per process, a snapshot holds parallel arrays (pid, name id,
+# RSS) and refers to names through a NameTable that lives as long as the source, so
+# each distinct name is stored once for the whole session. Callers that want a
+# record get a ProcessRow, a two-slot view into the columns; it also answers
+# row['pid'] / row['name'] / row['memory_kb'] like the old dicts did.
+#
+# The optional columns (swap, major faults, OOM score, start time) only exist when the
+# snapshot was created with that field; otherwise they are None and rows report None.
+# Start time (clock ticks since boot) tells a reused PID apart from the original.
+FIELDS = ("swap", "major_faults", "oom_score", "start_time")
+ROW_KEYS = ("pid", "name", "memory_kb", "swap_kb", "major_faults", "oom_score", "start_time")
+
+class NameTable:
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+class ProcessRow:
+    __slots__ = ("snapshot", "index")
+
+    def __init__(self, snapshot, index):
+        self.snapshot = snapshot
+        self.index = index
+
+    @property
+    def pid(self):
+        return self.snapshot.pids[self.index]
+
+    @property
+    def name(self):
+        return self.snapshot.names.names[self.snapshot.name_ids[self.index]]
+
+    @property
+    def memory_kb(self):
+        return self.snapshot.rss[self.index]
+
+    @property
+    def swap_kb(self):
+        column = self.snapshot.swap
+        return column[self.index] if column is not None else None
+
+    @property
+    def major_faults(self):
+        column = self.snapshot.major_faults
+        return column[self.index] if column is not None else None
+
+    @property
+    def oom_score(self):
+        column = self.snapshot.oom_score
+        return column[self.index] if column is not None else None
+
+    @property
+    def start_time(self):
+        column = self.snapshot.start_time
+        return column[self.index] if column is not None else None
+
+    def __getitem__(self, key):
+        if key in ROW_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __repr__(self):
+        return f"ProcessRow(pid={self.pid}, name={self.name!r}, memory_kb={self.memory_kb})"
+
+class ProcessSnapshot:
+    __slots__ = ("names", "pids", "name_ids", "rss", "swap", "major_faults", "oom_score", "start_time")
+
+    def __init__(self, names=None, fields=()):
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown process fields: {', '.join(sorted(unknown))}")
+        self.names = names if names is not None else NameTable()
+        self.pids = array('i')
+        self.name_ids = array('i')
+        self.rss = array('q')
+        self.swap = array('q') if "swap" in fields else None
+        self.major_faults = array('q') if "major_faults" in fields else None
+        self.oom_score = array('i') if "oom_score" in fields else None
+        self.start_time = array('Q') if "start_time" in fields else None
+
+    @property
+    def fields(self):
+        return tuple(field for field in FIELDS if getattr(self, field) is not None)
+
+    def append(self, pid, name, memory_kb, swap_kb=0, major_faults=0, oom_score=0, start_time=0):
+        # Values for fields the snapshot was not created with are ignored
+        self.pids.append(pid)
+        self.name_ids.append(self.names.intern(name))
+        self.rss.append(memory_kb)
+        if self.swap is not None:
+            self.swap.append(swap_kb)
+        if self.major_faults is not None:
+            self.major_faults.append(major_faults)
+        if self.oom_score is not None:
+            self.oom_score.append(oom_score)
+        if self.start_time is not None:
+            self.start_time.append(start_time)
+
+    def __len__(self):
+        return len(self.pids)
+
+    def __iter__(self):
+        for index in range(len(self.pids)):
+            yield ProcessRow(self, index)
+
+    def top_indices(self, k):
+        # O(n log k) selection straight off the RSS column, no full sort
+        return heapq.nlargest(k, range(len(self.rss)), key=self.rss.__getitem__)
+
+    def top(self, k):
+        return [ProcessRow(self, index) for index in self.top_indices(k)]
+
+    def name_of(self, index):
+        return self.names.names[self.name_ids[index]]
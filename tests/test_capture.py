@@ -0,0 +1,81 @@
+import gzip
+import json
+
+from capture import KEYFRAME_INTERVAL, CaptureReader, CaptureWriter, build_snapshot
+
+def status(name, rss_kb, swap_kb=0):
+    return f"Name:\t{name}\nState:\tS (sleeping)\nVmRSS:\t{rss_kb} kB\nVmSwap:\t{swap_kb} kB\n"
+
+def write_capture(path, frames):
+    with CaptureWriter(path) as writer:
+        for frame in frames:
+            writer.write_frame(*frame)
+
+def read_capture(path):
+    reader = CaptureReader(path)
+    try:
+        return [(t, kernel, dict(statuses), dict(reader.start_times)) for t, kernel, statuses in reader]
+    finally:
+        reader.close()
+
+def raw_frames(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f][1:]
+
+def test_round_trip_across_keyframes(tmp_path):
+    path = tmp_path / "run.cap.gz"
+    frames = []
+    for i in range(2 * KEYFRAME_INTERVAL + 5):
+        statuses = {1: status("init", 1000), 100 + i % 7: status("worker", 2000 + i)}
+        if i % 3:
+            statuses[42] = status("grower", 5000 + 10 * i)
+        start_times = {pid: pid * 10 for pid in statuses}
+        frames.append((1000.0 + i, f"used {i // 4}\n", statuses, start_times))
+    write_capture(path, frames)
+
+    assert read_capture(path) == [(t, kernel, statuses, starts) for t, kernel, statuses, starts in frames]
+    keyframes = [i for i, frame in enumerate(raw_frames(path)) if frame.get("key")]
+    assert keyframes == [0, KEYFRAME_INTERVAL, 2 * KEYFRAME_INTERVAL]
+
+def test_deltas_carry_only_changed_lines(tmp_path):
+    path = tmp_path / "run.cap.gz"
+    write_capture(path, [(0.0, "k", {7: status("a", 100)}, None),
+                         (1.0, "k", {7: status("a", 150)}, None)])
+    second = raw_frames(path)[1]
+    assert "k" not in second
+    assert second["p"] == {"7": {"2": "VmRSS:\t150 kB"}}
+    assert read_capture(path)[1][2] == {7: status("a", 150)}
+
+def test_empty_frames(tmp_path):
+    path = tmp_path / "run.cap.gz"
+    write_capture(path, [(0.0, None, {}, {}),
+                         (1.0, None, {5: status("a", 10)}, {5: 50}),
+                         (2.0, None, {}, {}),
+                         (3.0, None, {}, {})])
+    frames = read_capture(path)
+    assert [statuses for _, _, statuses, _ in frames] == [{}, {5: status("a", 10)}, {}, {}]
+    assert [starts for _, _, _, starts in frames] == [{}, {5: 50}, {}, {}]
+    assert raw_frames(path)[2]["x"] == [5]
+
+def test_pid_reuse_keeps_new_start_time(tmp_path):
+    path = tmp_path / "run.cap.gz"
+    write_capture(path, [(0.0, None, {9: status("old", 100)}, {9: 111}),
+                         (1.0, None, {9: status("new", 100)}, {9: 222})])
+    _, _, statuses, starts = read_capture(path)[1]
+    assert statuses == {9: status("new", 100)}
+    assert starts == {9: 222}
+
+def test_frames_without_start_times(tmp_path):
+    path = tmp_path / "run.cap.gz"
+    write_capture(path, [(0.0, None, {3: status("a", 10)}, None)])
+    assert "s" not in raw_frames(path)[0]
+    assert read_capture(path)[0][3] == {}
+
+def test_build_snapshot():
+    statuses = {3: status("a", 10, 4), 4: status("b c", 20, 0), 5: "State:\tZ (zombie)\n"}
+    snapshot = build_snapshot(statuses, {3: 30, 4: 40}, fields=("swap", "start_time", "oom_score"))
+    assert snapshot.fields == ("swap", "start_time")
+    assert [(row.pid, row.name, row.memory_kb, row.swap_kb, row.start_time) for row in snapshot] == [
+        (3, "a", 10, 4, 30), (4, "b c", 20, 0, 40)]
+    # Without recorded start times the column is left out rather than zero-filled
+    assert build_snapshot(statuses, None, fields=("start_time",)).fields == ()
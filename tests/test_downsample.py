@@ -0,0 +1,56 @@
+import numpy as np
+
+from downsample import minmax_downsample, viewport_points
+from history import RollupHistory
+
+def test_short_input_is_returned_unchanged():
+    x, y = minmax_downsample([0, 1, 2], [5, 6, 7], 10)
+    assert list(x) == [0, 1, 2] and list(y) == [5, 6, 7]
+
+def test_two_points_per_pixel_in_time_order():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 50)
+    out_x, out_y = minmax_downsample(x, y, 100)
+    assert len(out_x) == 200
+    assert np.all(np.diff(out_x) >= 0)
+    assert out_y.min() == y.min() and out_y.max() == y.max()
+
+def test_single_sample_spikes_survive():
+    x = np.arange(100000, dtype=float)
+    y = np.full(len(x), 1000.0)
+    y[12345] = 9000.0
+    y[67890] = -50.0
+    out_x, out_y = minmax_downsample(x, y, 50)
+    assert (12345.0, 9000.0) in zip(out_x, out_y)
+    assert (67890.0, -50.0) in zip(out_x, out_y)
+
+def test_zero_span_and_no_pixels():
+    x, y = minmax_downsample(np.zeros(10), np.arange(10.0), 2)
+    assert list(y) == [0.0, 9.0]
+    x, y = minmax_downsample(np.arange(10.0), np.arange(10.0), 0)
+    assert len(x) == 10
+
+def filled_history(seconds, spike_at):
+    history = RollupHistory()
+    for t in range(seconds):
+        history.add(float(t), 5000.0 if t == spike_at else 100.0)
+    return history
+
+def test_viewport_uses_raw_samples_when_zoomed_in():
+    history = filled_history(3600, spike_at=1800)
+    x, y = viewport_points(history, 1700.0, 1900.0, 400)
+    # Fewer samples than pixels: every raw sample in the window, plus one either side
+    assert list(x) == [float(t) for t in range(1699, 1902)]
+    assert y.max() == 5000.0
+
+def test_viewport_uses_tier_buckets_when_zoomed_out():
+    history = filled_history(6 * 3600, spike_at=10000)
+    x, y = viewport_points(history, 0.0, 6 * 3600.0, 200)
+    # 108 s per pixel: drawn from the 60 s tier, not from 21600 raw samples
+    assert len(x) <= 2 * 200
+    assert np.all(x % 60 == 0)
+    assert y.max() == 5000.0 and y.min() == 100.0
+
+def test_viewport_on_empty_history():
+    x, y = viewport_points(RollupHistory(), 0.0, 100.0, 100)
+    assert len(x) == 0 and len(y) == 0
@@ -0,0 +1,71 @@
+import pytest
+
+from export import KERNEL_COLUMNS, PROCESS_COLUMNS, ColumnarWriter, kernel_history_chunks, read_columnar
+from history import RollupHistory
+
+def filled_history(samples, raw_capacity):
+    history = RollupHistory(raw_capacity=raw_capacity)
+    for t in range(samples):
+        history.add(float(t), float(t) / 10)
+    return history
+
+def test_kernel_history_chunks():
+    history = filled_history(25, 100)
+    chunks = kernel_history_chunks(history, chunk_rows=10)
+    assert next(chunks) == 25
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+def test_kernel_history_ignores_rows_added_during_export():
+    history = filled_history(25, 100)
+    chunks = kernel_history_chunks(history, chunk_rows=10)
+    next(chunks)
+    first = next(chunks)
+    history.add(25.0, 2.5)
+    rows = first + [row for chunk in chunks for row in chunk]
+    assert rows == [(float(t), t / 10) for t in range(25)]
+
+def test_kernel_history_trimmed_during_export():
+    history = filled_history(199, 100)
+    chunks = kernel_history_chunks(history, chunk_rows=10)
+    assert next(chunks) == 199
+    first = next(chunks)
+    # Reaching twice the capacity trims the oldest 100 samples, past the export's position
+    history.add(199.0, 19.9)
+    assert history.raw.dropped == 100
+    rest = [row for chunk in chunks for row in chunk]
+    assert first == [(float(t), t / 10) for t in range(10)]
+    assert rest == [(float(t), t / 10) for t in range(100, 199)]
+
+def test_columnar_round_trip(tmp_path):
+    path = tmp_path / "out.mtc"
+    chunks = [
+        [(1000.0, 10, "init", 500), (1001.0, 11, "a b (c)", 400)],
+        # Negative deltas, a repeated name and a name first seen in a later chunk
+        [(1002.0, 3, "a b (c)", 0), (1002.5, 99999, "naïve", 2**40), (1001.25, 1, "init", -7)],
+        [],
+        [(1003.0, 11, "init", 400)],
+    ]
+    writer = ColumnarWriter(path, PROCESS_COLUMNS)
+    for rows in chunks:
+        writer.write_chunk(rows)
+    writer.close()
+    assert list(read_columnar(path)) == [row for rows in chunks for row in rows]
+
+def test_columnar_float_precision(tmp_path):
+    path = tmp_path / "out.mtc"
+    rows = [(1.0, 42.0), (2.0, 41.996), (3.0, 0.004), (4.0, 100.0), (5.0, -3.21), (6.0001, 12.346)]
+    writer = ColumnarWriter(path, KERNEL_COLUMNS)
+    writer.write_chunk(rows[:3])
+    writer.write_chunk(rows[3:])
+    writer.close()
+    decoded = list(read_columnar(path))
+    assert [t for t, _ in decoded] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    # Hundredths are all a float column keeps
+    assert [v for _, v in decoded] == [42.0, 42.0, 0.0, 100.0, -3.21, 12.35]
+    assert all(abs(v - expected) <= 0.005 + 1e-9 for (_, v), (_, expected) in zip(decoded, rows))
+
+def test_columnar_rejects_other_files(tmp_path):
+    path = tmp_path / "out.mtc"
+    path.write_bytes(b"time,percent\n")
+    with pytest.raises(ValueError):
+        list(read_columnar(path))
@@ -0,0 +1,108 @@
+import socket
+import threading
+import time
+
+import pytest
+
+import collector
+from agent import Agent
+from collector import LiveSource
+from fakeproc import NAMES, FakeProcTree
+from fleet import FleetCollector
+
+class StoppableSource(LiveSource):
+    # A live source whose advance() reports the end, so Agent.serve_forever returns
+    interval_ms = 50
+
+    def __init__(self):
+        super().__init__()
+        self.stopped = threading.Event()
+
+    def advance(self):
+        return not self.stopped.is_set() and super().advance()
+
+@pytest.fixture
+def fake_proc(tmp_path, monkeypatch):
+    tree = FakeProcTree(str(tmp_path / "proc"), processes=200, seed=1)
+    tree.build()
+    monkeypatch.setattr(collector, "PROC_ROOT", tree.root)
+    return tree
+
+@pytest.fixture
+def agents(fake_proc):
+    def serve(agent):
+        # As agent.main does once the source runs out
+        try:
+            agent.serve_forever()
+        finally:
+            agent.close()
+
+    started = []
+    for index in range(3):
+        agent = Agent("127.0.0.1", 0, StoppableSource(), top=5, hostname=f"agent-{index}")
+        thread = threading.Thread(target=serve, args=(agent,), daemon=True)
+        thread.start()
+        started.append((agent, thread))
+    yield [agent for agent, _ in started]
+    for agent, thread in started:
+        agent.source.stopped.set()
+        thread.join(5)
+
+def refused_port():
+    # Bound but never listening: connecting is refused
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def poll_until(fleet, done, seconds=10):
+    deadline = time.monotonic() + seconds
+    while not done() and time.monotonic() < deadline:
+        fleet.poll(0.05)
+    return done()
+
+def test_collects_from_several_agents(fake_proc, agents):
+    addresses = [("127.0.0.1", agent.listener.getsockname()[1]) for agent in agents]
+    addresses.append(("127.0.0.1", refused_port()))
+    fleet = FleetCollector(addresses)
+    try:
+        live, refused = fleet.hosts[:3], fleet.hosts[3]
+        assert poll_until(fleet, lambda: all(host.top for host in live) and refused.error)
+        assert [host.name for host in live] == ["agent-0", "agent-1", "agent-2"]
+        for host in live:
+            assert host.connected and host.error is None
+            assert host.used == fake_proc.used_kb()
+            assert host.total == fake_proc.total_kb
+            assert len(host.top) == 5
+            assert all(proc["name"] in NAMES for proc in host.top)
+            sizes = [proc["memory_kb"] for proc in host.top]
+            assert sizes == sorted(sizes, reverse=True)
+            assert sizes[0] == max(proc.rss_kb for proc in fake_proc.processes.values())
+        assert refused.error == "ECONNREFUSED"
+        assert not refused.connected
+
+        # Later samples follow the tree as it changes
+        fake_proc.step()
+        assert poll_until(fleet, lambda: all(host.used == fake_proc.used_kb() for host in live))
+    finally:
+        fleet.close()
+
+def test_agent_going_away(fake_proc, agents):
+    port = agents[0].listener.getsockname()[1]
+    fleet = FleetCollector([("127.0.0.1", port)])
+    try:
+        host = fleet.hosts[0]
+        assert poll_until(fleet, lambda: host.top)
+        agents[0].source.stopped.set()
+        assert poll_until(fleet, lambda: host.error == "connection closed")
+        assert host.sock is None
+    finally:
+        fleet.close()
+
+def test_unresolvable_host():
+    fleet = FleetCollector([("mem-tracker-agent.invalid", 7070)])
+    try:
+        host = fleet.hosts[0]
+        assert poll_until(fleet, lambda: host.error)
+        assert host.error.startswith("cannot resolve")
+    finally:
+        fleet.close()
@@ -0,0 +1,62 @@
+from history import RANGES, RawSeries, RollupHistory, RollupTier
+
+def test_tier_buckets_min_max_avg():
+    tier = RollupTier(10, 100)
+    for t, value in ((100, 5.0), (103, 1.0), (109.9, 9.0), (110, 4.0), (125, 6.0)):
+        tier.add(t, value)
+    assert list(tier.buckets) == [(100, 1.0, 9.0, 5.0), (110, 4.0, 4.0, 4.0)]
+    # The open bucket is included in points() but not yet closed
+    assert tier.points(0) == [(100, 1.0, 9.0, 5.0), (110, 4.0, 4.0, 4.0), (120, 6.0, 6.0, 6.0)]
+    assert tier.points(110) == [(110, 4.0, 4.0, 4.0), (120, 6.0, 6.0, 6.0)]
+
+def test_tier_skips_empty_buckets():
+    tier = RollupTier(1, 100)
+    tier.add(0.5, 1.0)
+    tier.add(7.2, 2.0)
+    assert [b[0] for b in tier.points(0)] == [0, 7.0]
+
+def test_tier_capacity_drops_oldest():
+    tier = RollupTier(1, 3)
+    for t in range(10):
+        tier.add(t, float(t))
+    assert [b[0] for b in tier.buckets] == [6, 7, 8]
+    assert tier.points(0)[-1] == (9, 9.0, 9.0, 9.0)
+
+def test_tier_close_is_idempotent():
+    tier = RollupTier(1, 10)
+    tier.close()
+    tier.add(0, 1.0)
+    tier.close()
+    tier.close()
+    assert list(tier.buckets) == [(0, 1.0, 1.0, 1.0)]
+    assert tier.points(0) == [(0, 1.0, 1.0, 1.0)]
+
+def test_raw_series_trims_in_blocks():
+    raw = RawSeries(capacity=4)
+    for t in range(7):
+        raw.add(float(t), float(t) * 2)
+    assert len(raw) == 7 and raw.dropped == 0 and raw.generation == 0
+    raw.add(7.0, 14.0)
+    assert list(raw.times) == [4.0, 5.0, 6.0, 7.0]
+    assert list(raw.values) == [8.0, 10.0, 12.0, 14.0]
+    assert raw.dropped == 4
+    # Even again once the trim is done, and changed so readers notice
+    assert raw.generation == 2
+
+def test_history_spike_survives_every_tier():
+    history = RollupHistory()
+    for t in range(0, 7200):
+        history.add(float(t), 8000.0 if t == 6000 else 1000.0)
+    for label in ("5 min", "1 h"):
+        points = history.query(label)
+        span, _ = RANGES[label]
+        assert points[0][0] >= history.latest - span
+    assert max(p[2] for p in history.query("1 h")) == 8000.0
+    assert max(p[2] for p in history.query("24 h")) == 8000.0
+    assert max(p[2] for p in history.query("5 min")) == 1000.0
+    assert min(p[1] for p in history.query("7 d")) == 1000.0
+
+def test_empty_history():
+    history = RollupHistory()
+    assert history.query("30 s") == []
+    assert len(history.raw) == 0
@@ -0,0 +1,94 @@
+import pytest
+
+from procread import ProcReader, field_int, field_text, parse_int, parse_stat, parse_status
+
+STATUS = (b"Name:\tweb server (1)\nUmask:\t0022\nState:\tS (sleeping)\nPid:\t4242\n"
+          b"VmPeak:\t  900000 kB\nVmRSS:\t  123456 kB\nRssAnon:\t  100000 kB\nVmSwap:\t     512 kB\n")
+
+def stat_line(comm, majflt=17, starttime=987654):
+    # Fields after comm: state is field 3, majflt field 12, starttime field 22
+    rest = ["S", "1", "4242", "4242", "0", "-1", "4194560", "100", "0", str(majflt),
+            "0", "5", "6", "0", "0", "20", "0", "1", "0", str(starttime), "1000", "250"]
+    return f"4242 ({comm}) {' '.join(rest)}\n".encode()
+
+def as_buffer(data, slack=64):
+    # Parsers get a reused buffer with stale bytes past n
+    return bytearray(data) + b"\xff" * slack, len(data)
+
+def test_parse_status():
+    buf, n = as_buffer(STATUS)
+    assert parse_status(buf, n) == ("web server (1)", 123456, 0)
+    assert parse_status(buf, n, swap=True) == ("web server (1)", 123456, 512)
+
+def test_parse_status_missing_fields():
+    # Kernel threads and zombies have no Vm* lines
+    buf, n = as_buffer(b"Name:\tkworker/0:1\nState:\tI (idle)\n")
+    assert parse_status(buf, n, swap=True) == ("kworker/0:1", 0, 0)
+
+def test_field_matches_only_at_line_start():
+    buf, n = as_buffer(b"Name:\tx\nRssVmRSS:\t5 kB\nVmRSS:\t7 kB\n")
+    assert field_int(buf, n, b"VmRSS:") == 7
+
+def test_field_at_end_without_newline():
+    buf, n = as_buffer(b"Name:\tx\nVmRSS:\t7 kB")
+    assert field_int(buf, n, b"VmRSS:") == 7
+    assert field_text(buf, n, b"Name:") == "x"
+
+def test_field_ignores_bytes_past_length():
+    buf = bytearray(b"Name:\tx\nVmRSS:\t7 kB\n")
+    n = buf.index(b"VmRSS")
+    assert field_int(buf, n, b"VmRSS:", default=-1) == -1
+    assert field_text(buf, n, b"VmRSS:") == ""
+
+@pytest.mark.parametrize("comm", ["bash", "tmux: server", "a b) (c", ")", "((()))", "x) 1 2 3 (y"])
+def test_parse_stat_with_awkward_comm(comm):
+    buf, n = as_buffer(stat_line(comm))
+    assert parse_stat(buf, n) == (17, 987654)
+
+def test_parse_stat_ignores_parenthesis_past_length():
+    buf = bytearray(stat_line("cat")) + b"junk) 1 2 3"
+    assert parse_stat(buf, len(stat_line("cat"))) == (17, 987654)
+
+def test_parse_int():
+    buf, n = as_buffer(b"-17\n")
+    assert parse_int(buf, n) == -17
+
+def test_reader_grows_buffer_for_large_files(tmp_path):
+    path = tmp_path / "big"
+    data = b"".join(b"line %d\n" % i for i in range(5000))
+    path.write_bytes(data)
+    reader = ProcReader(pool_size=1, buffer_size=64)
+    buf, n = reader.read(str(path))
+    assert bytes(buf[:n]) == data
+    # The grown buffer is kept for the next read
+    assert len(reader.pool.buffers[0]) >= len(data)
+
+def test_reader_exact_fit_and_empty_file(tmp_path):
+    exact = tmp_path / "exact"
+    exact.write_bytes(b"x" * 64)
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    reader = ProcReader(pool_size=2, buffer_size=64)
+    buf, n = reader.read(str(exact))
+    assert bytes(buf[:n]) == b"x" * 64
+    assert reader.read(str(empty))[1] == 0
+    assert reader.read_text(str(exact)) == "x" * 64
+
+def test_reader_pool_keeps_recent_reads(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}"
+        path.write_bytes(b"file %d" % i)
+        paths.append(str(path))
+    reader = ProcReader(pool_size=2)
+    first = reader.read(paths[0])
+    second = reader.read(paths[1])
+    assert bytes(first[0][:first[1]]) == b"file 0"
+    assert bytes(second[0][:second[1]]) == b"file 1"
+    # The third read reuses the first buffer
+    third = reader.read(paths[2])
+    assert third[0] is first[0]
+
+def test_reader_missing_file(tmp_path):
+    with pytest.raises(OSError):
+        ProcReader().read(str(tmp_path / "gone"))
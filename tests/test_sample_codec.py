@@ -0,0 +1,122 @@
+import io
+
+import pytest
+
+from sample_codec import (HostSampleDecoder, HostSampleEncoder, KernelSeriesEncoder, ProcessSeriesEncoder,
+                          TimestampCodec, decode_kernel_series, decode_process_series, read_varint,
+                          unzigzag, write_varint, zigzag)
+from snapshot import ProcessSnapshot
+
+EDGE_VALUES = [0, 1, -1, 63, -64, 64, -65, 127, 128, -128, 2**31 - 1, -2**31, 2**62, -2**63]
+
+@pytest.mark.parametrize("n", EDGE_VALUES)
+def test_zigzag_round_trip(n):
+    assert zigzag(n) >= 0
+    assert unzigzag(zigzag(n)) == n
+
+def test_zigzag_keeps_small_magnitudes_small():
+    assert [zigzag(n) for n in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 300, 16383, 16384, 2**63, 2**64 - 1])
+def test_varint_round_trip(n):
+    buf = bytearray(b"\xff")
+    write_varint(buf, n)
+    assert read_varint(buf, 1) == (n, len(buf))
+
+def test_varint_lengths():
+    for n, length in ((0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3)):
+        buf = bytearray()
+        write_varint(buf, n)
+        assert len(buf) == length
+
+def test_timestamps_with_jitter_and_going_backwards():
+    stamps = [1000, 2000, 3000, 4001, 4999, 4500, 10000, 10000]
+    buf = bytearray()
+    encoder = TimestampCodec()
+    for t in stamps:
+        encoder.encode(buf, t)
+    decoder = TimestampCodec()
+    pos = 0
+    decoded = []
+    while pos < len(buf):
+        t, pos = decoder.decode(buf, pos)
+        decoded.append(t)
+    assert decoded == stamps
+
+def test_steady_interval_costs_one_byte():
+    buf = bytearray()
+    codec = TimestampCodec()
+    for t in range(1000, 101000, 1000):
+        codec.encode(buf, t)
+    # First delta-of-delta is the interval itself, then zeros
+    assert len(buf) == 2 + 99
+
+def test_kernel_series_round_trip():
+    samples = [(1000, 500, 8000), (2000, 450, 8000), (3000, 0, 8000), (4000, 9000, 16000), (5000, 1, 1)]
+    stream = io.BytesIO()
+    encoder = KernelSeriesEncoder(stream)
+    for sample in samples:
+        encoder.write(*sample)
+    stream.seek(0)
+    assert list(decode_kernel_series(stream)) == samples
+
+def test_wrong_magic_and_truncation():
+    stream = io.BytesIO()
+    KernelSeriesEncoder(stream).write(1000, 1, 2)
+    data = stream.getvalue()
+    with pytest.raises(ValueError):
+        list(decode_process_series(io.BytesIO(data)))
+    with pytest.raises(ValueError):
+        list(decode_kernel_series(io.BytesIO(data[:-1])))
+
+def process_tables():
+    return [
+        [{"pid": 1, "name": "init", "memory_kb": 100}, {"pid": 50, "name": "a b (c)", "memory_kb": 400}],
+        # RSS drops, a PID exits and a new PID reuses a known name
+        [{"pid": 1, "name": "init", "memory_kb": 90}, {"pid": 70, "name": "a b (c)", "memory_kb": 10}],
+        [],
+        [{"pid": 1, "name": "init", "memory_kb": 0}, {"pid": 2, "name": "kthreadd ✓", "memory_kb": 2**40}],
+    ]
+
+def test_process_series_round_trip():
+    tables = process_tables()
+    stream = io.BytesIO()
+    encoder = ProcessSeriesEncoder(stream)
+    for i, table in enumerate(tables):
+        encoder.write(1000 * i, table)
+    stream.seek(0)
+    assert list(decode_process_series(stream)) == [(1000 * i, table) for i, table in enumerate(tables)]
+
+def test_process_series_from_snapshot():
+    snapshot = ProcessSnapshot()
+    snapshot.append(30, "b", 300)
+    snapshot.append(10, "a", 100)
+    stream = io.BytesIO()
+    ProcessSeriesEncoder(stream).write(0, snapshot)
+    stream.seek(0)
+    assert list(decode_process_series(stream)) == [
+        (0, [{"pid": 10, "name": "a", "memory_kb": 100}, {"pid": 30, "name": "b", "memory_kb": 300}])]
+
+def encode_host_samples():
+    encoder = HostSampleEncoder()
+    samples = [(1000 * i, 4000 - 100 * i, 8000, table) for i, table in enumerate(process_tables())]
+    return samples, b"".join(encoder.encode(*sample) for sample in samples)
+
+def test_host_samples_fed_whole():
+    samples, data = encode_host_samples()
+    assert HostSampleDecoder().feed(data) == samples
+
+def test_host_samples_fed_one_byte_at_a_time():
+    samples, data = encode_host_samples()
+    decoder = HostSampleDecoder()
+    decoded = []
+    for i in range(len(data)):
+        decoded += decoder.feed(data[i:i + 1])
+    assert decoded == samples
+    assert not decoder.buffer
+
+def test_host_samples_split_inside_a_record():
+    samples, data = encode_host_samples()
+    decoder = HostSampleDecoder()
+    assert decoder.feed(data[:3]) == []
+    assert decoder.feed(data[3:]) == samples
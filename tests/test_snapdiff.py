@@ -0,0 +1,75 @@
+import pytest
+
+from capture import CaptureWriter
+from snapdiff import capture_snapshots, diff_snapshots, parse_when
+from snapshot import NameTable, ProcessSnapshot
+
+def snapshot(rows, names=None, start_times=True):
+    # rows of (pid, name, rss_kb, start_time)
+    result = ProcessSnapshot(names, ("start_time",) if start_times else ())
+    for pid, name, rss_kb, start_time in rows:
+        result.append(pid, name, rss_kb, start_time=start_time)
+    return result
+
+def test_grown_new_and_exited():
+    names = NameTable()
+    before = snapshot([(1, "init", 100, 1), (2, "grows", 1000, 2), (3, "shrinks", 500, 3),
+                       (4, "exits", 300, 4)], names)
+    after = snapshot([(1, "init", 100, 1), (2, "grows", 1600, 2), (3, "shrinks", 200, 3),
+                      (5, "new", 700, 5)], names)
+    diff = diff_snapshots(before, after)
+    assert diff.grown == [(2, "grows", 1000, 1600, 600)]
+    assert diff.new == [(5, "new", None, 700, 700)]
+    assert diff.exited == [(4, "exits", 300, None, -300)]
+    assert (diff.new_count, diff.exited_count) == (1, 1)
+    assert diff.total_delta_kb == 2600 - 1900
+
+def test_reused_pid_is_exit_plus_new():
+    before = snapshot([(42, "old", 5000, 100)])
+    after = snapshot([(42, "new", 6000, 900)])
+    diff = diff_snapshots(before, after)
+    assert diff.grown == []
+    assert diff.new == [(42, "new", None, 6000, 6000)]
+    assert diff.exited == [(42, "old", 5000, None, -5000)]
+
+def test_without_start_times_pids_are_matched():
+    before = snapshot([(42, "old", 5000, 0)], start_times=False)
+    after = snapshot([(42, "new", 6000, 0)], start_times=False)
+    diff = diff_snapshots(before, after)
+    assert diff.grown == [(42, "new", 5000, 6000, 1000)]
+    assert diff.new == diff.exited == []
+
+def test_mixed_start_times_are_rejected():
+    with pytest.raises(ValueError):
+        diff_snapshots(snapshot([]), snapshot([], start_times=False))
+
+def test_top_limits_rows_but_not_counts():
+    before = snapshot([(pid, "p", 100, pid) for pid in range(1, 51)])
+    after = snapshot([(pid, "p", 100 + pid, pid) for pid in range(1, 51)]
+                     + [(pid, "q", pid, pid) for pid in range(100, 130)])
+    diff = diff_snapshots(before, after, top=3)
+    assert [row[0] for row in diff.grown] == [50, 49, 48]
+    assert [row[0] for row in diff.new] == [129, 128, 127]
+    assert diff.new_count == 30
+
+def test_empty_snapshots():
+    diff = diff_snapshots(snapshot([]), snapshot([]))
+    assert (diff.grown, diff.new, diff.exited, diff.total_delta_kb) == ([], [], [], 0)
+
+def test_parse_when():
+    assert parse_when("+90", 1000.0) == 1090.0
+    assert parse_when("1700000000.5", 0) == 1700000000.5
+
+def test_capture_snapshots(tmp_path):
+    path = tmp_path / "run.cap.gz"
+    with CaptureWriter(path) as writer:
+        for i in range(5):
+            statuses = {7: f"Name:\tworker\nVmRSS:\t{100 * (i + 1)} kB\n"}
+            writer.write_frame(1000.0 + i, None, statuses, {7: 70 + (i >= 3)})
+    (t0, before), (t1, after), (t2, last) = capture_snapshots(path, ["+1", 1002.5, "+60"])
+    assert (t0, t1, t2) == (1001.0, 1003.0, 1004.0)
+    assert list(before.rss) == [200] and list(before.start_time) == [70]
+    diff = diff_snapshots(before, after)
+    # The PID was reused between frames 2 and 3
+    assert diff.new_count == diff.exited_count == 1
+    assert list(last.rss) == [500]
@@ -0,0 +1,419 @@
+import argparse
+import heapq
+import json
+import selectors
+import socket
+import time
+from collections import deque
+from itertools import islice
+
+from collector import LiveSource
+from sampler import EventBus, SharedSampler
+
+# Browser dashboard: a small HTTP server that serves one static page and streams
+# updates to it over Server-Sent Events. It is fed by the same SharedSampler as
+# dashboard.py, with LoopTimers standing in for Tk's after() so no display is needed.
+#
+# Each tick, what the sampler published is turned into one "delta" event: the new
+# kernel samples, plus the top-process rows that changed or dropped out. The event is
+# JSON-encoded once, and the same bytes object is queued on every client. A client
+# that connects mid-stream first gets a "full" event with the current state, which
+# is also encoded at most once per tick however many clients join. Reading /proc and
+# encoding therefore cost the same with one browser or a thousand; an extra client
+# only adds its own socket writes. As in agent.py, a client that falls MAX_BACKLOG
+# bytes behind is dropped; EventSource reconnects and starts over from a full event.
+#
+#   python3 webdash.py --port 8080        then open http://localhost:8080/
+DEFAULT_PORT = 8080
+MAX_BACKLOG = 1 << 20
+# Kernel samples kept for the page's chart and for clients that join late
+HISTORY = 300
+MAX_REQUEST = 8192
+# Buffers handed to one sendmsg() call
+MAX_IOV = 64
+
+SSE_HEADER = (b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+              b"Connection: keep-alive\r\n\r\nretry: 2000\n\n")
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>System Memory Tracker</title>
+<style>
+  body { font-family: system-ui, sans-serif; background: #1e1e2e; color: #e0e0e0; margin: 2em auto; max-width: 960px; }
+  h1 { font-weight: 600; }
+  progress { width: 100%; height: 1.2em; accent-color: #4ecdc4; }
+  canvas { width: 100%; background: #2a2a3c; border-radius: 6px; margin: 1em 0; }
+  table { border-collapse: collapse; width: 100%; font-family: Consolas, monospace; }
+  th, td { padding: 4px 10px; border-bottom: 1px solid #3a3a4c; }
+  th { text-align: left; color: #4ecdc4; }
+  td.num { text-align: right; }
+  #status { color: #888; font-size: 0.9em; }
+</style>
+</head>
+<body>
+<h1>&#x1F9E0; System Memory</h1>
+<div id="usage">Waiting for data&hellip;</div>
+<progress id="bar" max="100" value="0"></progress>
+<canvas id="chart" width="900" height="220"></canvas>
+<h2>Top Processes</h2>
+<table>
+  <thead><tr><th>PID</th><th>Name</th><th>Memory (KB)</th></tr></thead>
+  <tbody id="rows"></tbody>
+</table>
+<p id="status"></p>
+<script>
+const HISTORY = 300;
+const kernel = [];          // [timestamp, used_kb, total_kb, percent]
+const rows = new Map();     // pid -> [pid, name, memory_kb]
+const usage = document.getElementById("usage");
+const bar = document.getElementById("bar");
+const chart = document.getElementById("chart");
+const tbody = document.getElementById("rows");
+const statusLine = document.getElementById("status");
+
+function addSamples(samples) {
+  kernel.push(...samples);
+  kernel.splice(0, Math.max(0, kernel.length - HISTORY));
+}
+
+function cell(text, numeric) {
+  const td = document.createElement("td");
+  td.textContent = text;
+  if (numeric) td.className = "num";
+  return td;
+}
+
+function render(tick) {
+  if (kernel.length) {
+    const [, used, total, percent] = kernel[kernel.length - 1];
+    usage.textContent = `Used: ${used.toLocaleString()} KB / Total: ${total.toLocaleString()} KB (${percent.toFixed(2)}%)`;
+    bar.value = percent;
+    // Last five minutes, newest on the right
+    const ctx = chart.getContext("2d");
+    const newest = kernel[kernel.length - 1][0];
+    ctx.clearRect(0, 0, chart.width, chart.height);
+    ctx.strokeStyle = "#ff6f61";
+    ctx.lineWidth = 2;
+    ctx.beginPath();
+    kernel.forEach(([t, , , p], i) => {
+      const x = chart.width * (1 - (newest - t) / 300);
+      const y = chart.height * (1 - p / 100);
+      i ? ctx.lineTo(x, y) : ctx.moveTo(x, y);
+    });
+    ctx.stroke();
+  }
+  const sorted = [...rows.values()].sort((a, b) => b[2] - a[2]);
+  tbody.replaceChildren(...sorted.map(([pid, name, memory]) => {
+    const tr = document.createElement("tr");
+    tr.append(cell(pid, false), cell(name, false), cell(memory.toLocaleString(), true));
+    return tr;
+  }));
+  statusLine.textContent = `tick ${tick}`;
+}
+
+const events = new EventSource("/events");
+events.addEventListener("full", (e) => {
+  const state = JSON.parse(e.data);
+  kernel.length = 0;
+  addSamples(state.kernel);
+  rows.clear();
+  for (const row of state.rows) rows.set(row[0], row);
+  render(state.tick);
+});
+events.addEventListener("delta", (e) => {
+  const delta = JSON.parse(e.data);
+  addSamples(delta.kernel);
+  for (const pid of delta.removed) rows.delete(pid);
+  for (const row of delta.changed) rows.set(row[0], row);
+  render(delta.tick);
+});
+events.onerror = () => { statusLine.textContent = "Disconnected, reconnecting…"; };
+</script>
+</body>
+</html>
+"""
+
+def http_response(status, content_type, body):
+    return (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+            f"Cache-Control: no-cache\r\nConnection: close\r\n\r\n").encode() + body
+
+def sse_event(name, tick, data):
+    return f"event: {name}\nid: {tick}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+class LoopTimers:
+    # The after()/after_cancel() part of a Tk root, run by WebDashboard's select loop
+    def __init__(self):
+        self.heap = []
+        self.count = 0
+        self.cancelled = set()
+
+    def after(self, ms, callback):
+        self.count += 1
+        heapq.heappush(self.heap, (time.monotonic() + ms / 1000, self.count, callback))
+        return self.count
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def timeout(self):
+        # Seconds until the next timer is due, or None if there is none
+        if not self.heap:
+            return None
+        return max(0.0, self.heap[0][0] - time.monotonic())
+
+    def run_due(self):
+        now = time.monotonic()
+        while self.heap and self.heap[0][0] <= now:
+            _, timer_id, callback = heapq.heappop(self.heap)
+            if timer_id in self.cancelled:
+                self.cancelled.discard(timer_id)
+                continue
+            callback()
+
+class _Client:
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.request = bytearray()
+        self.streaming = False
+        self.close_when_sent = False
+        # Encoded payloads waiting to go out, shared with the other clients; the
+        # first one has been sent up to `offset`
+        self.queue = deque()
+        self.offset = 0
+        self.backlog = 0
+
+class WebDashboard:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, source=None, top=20):
+        self.source = source or LiveSource()
+        self.top = top
+        self.timers = LoopTimers()
+        self.bus = EventBus()
+        self.sampler = SharedSampler(self.timers, self.source, self.bus)
+        self.bus.subscribe("kernel", self.on_kernel)
+        self.bus.subscribe("processes", self.on_processes)
+        self.bus.subscribe("tick", self.on_tick)
+
+        self.selector = selectors.DefaultSelector()
+        self.listener = socket.create_server((host, port))
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients = {}
+        self.page = http_response("200 OK", "text/html; charset=utf-8", PAGE.encode())
+
+        # Current state, and what changed during this tick
+        self.kernel = deque(maxlen=HISTORY)
+        self.rows = {}
+        self.new_samples = []
+        self.changed = []
+        self.removed = []
+        self.tick = 0
+        # "full" event for joining clients; built on demand, at most once per tick
+        self.full_event = None
+        self.running = True
+        # Per-tick cost, reported at /stats
+        self.stats = {"tick": 0, "clients": 0, "sample_ms": {}, "encode_ms": 0.0, "delta_bytes": 0,
+                      "fanout_ms": 0.0, "dropped": 0}
+
+    def on_kernel(self, samples):
+        for timestamp, used, total, percent in samples:
+            row = [round(timestamp, 3), used, total, round(percent, 2)]
+            self.kernel.append(row)
+            self.new_samples.append(row)
+
+    def on_processes(self, snapshot):
+        rows = {proc.pid: [proc.pid, proc.name, proc.memory_kb] for proc in snapshot.top(self.top)}
+        previous = self.rows
+        self.changed = [row for pid, row in rows.items() if previous.get(pid) != row]
+        self.removed = [pid for pid in previous if pid not in rows]
+        self.rows = rows
+
+    def on_tick(self, stats):
+        if stats is None:
+            # Replay reached the end of the capture
+            self.running = False
+            return
+        self.tick = stats["tick"]
+        start = time.perf_counter()
+        payload = sse_event("delta", self.tick, {"tick": self.tick, "kernel": self.new_samples,
+                                                 "changed": self.changed, "removed": self.removed})
+        self.new_samples = []
+        self.changed = []
+        self.removed = []
+        self.full_event = None
+        encoded = time.perf_counter()
+        for client in list(self.clients.values()):
+            if client.streaming:
+                self._send(client, payload)
+        self.stats.update(tick=self.tick, clients=self._streaming_count(), sample_ms=stats["ms"],
+                          encode_ms=(encoded - start) * 1000, delta_bytes=len(payload),
+                          fanout_ms=(time.perf_counter() - encoded) * 1000)
+
+    def _streaming_count(self):
+        return sum(1 for client in self.clients.values() if client.streaming)
+
+    def _full_event(self):
+        if self.full_event is None:
+            self.full_event = sse_event("full", self.tick, {"tick": self.tick, "kernel": list(self.kernel),
+                                                            "rows": list(self.rows.values())})
+        return self.full_event
+
+    def _accept(self):
+        try:
+            sock, address = self.listener.accept()
+        except OSError:
+            # Out of file descriptors, or the client already gave up
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _Client(sock, address)
+        self.clients[sock] = client
+        self.selector.register(sock, selectors.EVENT_READ)
+
+    def _drop(self, client):
+        self.selector.unregister(client.sock)
+        client.sock.close()
+        del self.clients[client.sock]
+
+    def _send(self, client, payload):
+        client.queue.append(payload)
+        client.backlog += len(payload)
+        if client.backlog > MAX_BACKLOG:
+            self.stats["dropped"] += 1
+            self._drop(client)
+        else:
+            self._flush(client)
+
+    def _flush(self, client):
+        if client.queue:
+            # Gather write straight from the shared payloads, no per-client copy
+            buffers = [memoryview(client.queue[0])[client.offset:]]
+            buffers.extend(islice(client.queue, 1, MAX_IOV))
+            try:
+                sent = client.sock.sendmsg(buffers)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self._drop(client)
+                return
+            client.backlog -= sent
+            while sent:
+                remaining = len(client.queue[0]) - client.offset
+                if sent < remaining:
+                    client.offset += sent
+                    break
+                sent -= remaining
+                client.queue.popleft()
+                client.offset = 0
+        if not client.queue and client.close_when_sent:
+            self._drop(client)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.queue else 0)
+        self.selector.modify(client.sock, events)
+
+    def _on_readable(self, client):
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+        if client.streaming or client.close_when_sent:
+            # Nothing more is expected once a request has been answered
+            return
+        client.request += data
+        end = client.request.find(b"\r\n\r\n")
+        if end < 0:
+            if len(client.request) > MAX_REQUEST:
+                self._respond(client, http_response("431 Request Header Fields Too Large", "text/plain", b""))
+            return
+        parts = client.request[:end].split(b"\r\n", 1)[0].decode("latin-1").split()
+        if len(parts) < 2:
+            self._respond(client, http_response("400 Bad Request", "text/plain", b"Bad request\n"))
+            return
+        method, path = parts[0], parts[1].split("?", 1)[0]
+        if method != "GET":
+            self._respond(client, http_response("405 Method Not Allowed", "text/plain", b"GET only\n"))
+        elif path == "/":
+            self._respond(client, self.page)
+        elif path == "/events":
+            client.streaming = True
+            client.queue.append(SSE_HEADER)
+            client.backlog += len(SSE_HEADER)
+            self._send(client, self._full_event())
+        elif path == "/stats":
+            stats = dict(self.stats, clients=self._streaming_count())
+            self._respond(client, http_response("200 OK", "application/json", json.dumps(stats).encode()))
+        else:
+            self._respond(client, http_response("404 Not Found", "text/plain", b"Not found\n"))
+
+    def _respond(self, client, response):
+        client.close_when_sent = True
+        self._send(client, response)
+
+    def serve_forever(self):
+        self.sampler.start()
+        while self.running:
+            for key, events in self.selector.select(self.timers.timeout()):
+                if key.fileobj is self.listener:
+                    self._accept()
+                    continue
+                client = self.clients.get(key.fileobj)
+                if client is None:
+                    continue
+                if events & selectors.EVENT_READ:
+                    self._on_readable(client)
+                    if key.fileobj not in self.clients:
+                        continue
+                if events & selectors.EVENT_WRITE:
+                    self._flush(client)
+            self.timers.run_due()
+
+    def close(self):
+        self.sampler.stop()
+        for client in list(self.clients.values()):
+            self._drop(client)
+        self.selector.unregister(self.listener)
+        self.listener.close()
+        self.selector.close()
+        self.source.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a live memory dashboard to web browsers")
+    parser.add_argument("--bind", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    parser.add_argument("--top", type=int, default=20, help="number of processes shown")
+    parser.add_argument("--replay", metavar="CAPTURE", help="serve a capture.py recording instead of /proc")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--proc-root", help="read this procfs tree instead of /proc (see fakeproc.py)")
+    parser.add_argument("--kernel-ring", action="store_true",
+                        help="drain high-rate samples from /proc/mem_tracker_samples instead of one read per tick")
+    args = parser.parse_args()
+
+    if args.proc_root:
+        from collector import set_proc_root
+        set_proc_root(args.proc_root)
+    if args.replay:
+        from capture import ReplaySource
+        source = ReplaySource(args.replay, args.speed)
+    else:
+        source = LiveSource(kernel_ring=args.kernel_ring)
+        source.interval_ms = int(args.interval * 1000)
+
+    server = WebDashboard(args.bind, args.port, source, args.top)
+    print(f"Serving on http://{args.bind}:{server.listener.getsockname()[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()